@@ -0,0 +1,38 @@
+"""add change_seq to locations for offline sync
+
+Revision ID: a4e1c7d2b9f0
+Revises: 9d4f3e5c6b7a
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4e1c7d2b9f0"
+down_revision = "9d4f3e5c6b7a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS location_change_seq")
+    # Volatile default: existing rows are backfilled with distinct sequence values
+    op.add_column(
+        "locations",
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('location_change_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_locations_change_seq", "locations", ["change_seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_locations_change_seq", table_name="locations")
+    op.drop_column("locations", "change_seq")
+    op.execute("DROP SEQUENCE IF EXISTS location_change_seq")
@@ -0,0 +1,28 @@
+"""stop drawing a change sequence value on location insert
+
+Revision ID: a8c4e2f6b1d3
+Revises: f3a9d1c5e8b2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a8c4e2f6b1d3"
+down_revision = "f3a9d1c5e8b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The change feed stamps the real value at the end of the writing transaction
+    op.alter_column("locations", "change_seq", server_default=sa.text("0"))
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "locations", "change_seq", server_default=sa.text("nextval('location_change_seq')")
+    )
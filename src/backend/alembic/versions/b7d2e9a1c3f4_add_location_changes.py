@@ -0,0 +1,46 @@
+"""add location_changes change log
+
+Revision ID: b7d2e9a1c3f4
+Revises: a4e1c7d2b9f0
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d2e9a1c3f4"
+down_revision = "a4e1c7d2b9f0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE location_change_op AS ENUM ('upsert', 'delete')")
+    op.create_table(
+        "location_changes",
+        sa.Column("seq", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("location_id", sa.Integer(), nullable=False, index=True),
+        sa.Column(
+            "op",
+            postgresql.ENUM("upsert", "delete", name="location_change_op", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+    # Seed the log with the current row versions so existing snapshots are consistent
+    op.execute(
+        "INSERT INTO location_changes (seq, location_id, op) "
+        "SELECT change_seq, id, 'upsert' FROM locations"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("location_changes")
+    op.execute("DROP TYPE IF EXISTS location_change_op")
@@ -0,0 +1,61 @@
+"""add districts boundaries and locations.district_id
+
+Revision ID: c3f8a2d4e6b1
+Revises: b7d2e9a1c3f4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import geoalchemy2
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3f8a2d4e6b1"
+down_revision = "b7d2e9a1c3f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "districts",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("slug", sa.String(100), nullable=False),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("city", sa.String(100), nullable=True),
+        sa.Column(
+            "geom",
+            geoalchemy2.types.Geometry(
+                geometry_type="MULTIPOLYGON", srid=4326, spatial_index=False
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index("ix_districts_slug", "districts", ["slug"], unique=True)
+    op.create_index("ix_districts_city", "districts", ["city"])
+    op.create_index("idx_districts_geom", "districts", ["geom"], postgresql_using="gist")
+
+    op.add_column(
+        "locations",
+        sa.Column(
+            "district_id",
+            sa.Integer(),
+            sa.ForeignKey("districts.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_locations_district_id", "locations", ["district_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_locations_district_id", table_name="locations")
+    op.drop_column("locations", "district_id")
+    op.drop_index("idx_districts_geom", table_name="districts")
+    op.drop_index("ix_districts_city", table_name="districts")
+    op.drop_index("ix_districts_slug", table_name="districts")
+    op.drop_table("districts")
@@ -0,0 +1,44 @@
+"""add moderation queue lease columns
+
+Revision ID: d5b8e3f1a7c2
+Revises: c3f8a2d4e6b1
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5b8e3f1a7c2"
+down_revision = "c3f8a2d4e6b1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "locations",
+        sa.Column(
+            "claimed_by",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "locations", sa.Column("claim_expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        "ix_locations_pending_queue",
+        "locations",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_locations_pending_queue", table_name="locations")
+    op.drop_column("locations", "claim_expires_at")
+    op.drop_column("locations", "claimed_by")
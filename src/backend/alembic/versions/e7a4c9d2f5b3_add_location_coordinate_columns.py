@@ -0,0 +1,67 @@
+"""add generated latitude/longitude and web-mercator columns to locations
+
+Revision ID: e7a4c9d2f5b3
+Revises: d5b8e3f1a7c2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+import geoalchemy2
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7a4c9d2f5b3"
+down_revision = "d5b8e3f1a7c2"
+branch_labels = None
+depends_on = None
+
+# Must match MERCATOR_MAX_LAT in src/models/location.py
+MERCATOR_MAX_LAT = 85.05112878
+
+
+def upgrade() -> None:
+    # Stored generated columns: computed once per write instead of per row read
+    op.add_column(
+        "locations",
+        sa.Column(
+            "latitude",
+            sa.Float(),
+            sa.Computed("ST_Y(geom::geometry)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "locations",
+        sa.Column(
+            "longitude",
+            sa.Float(),
+            sa.Computed("ST_X(geom::geometry)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "locations",
+        sa.Column(
+            "geom_3857",
+            geoalchemy2.types.Geometry(geometry_type="POINT", srid=3857, spatial_index=False),
+            sa.Computed(
+                "ST_Transform(ST_SetSRID(ST_MakePoint(ST_X(geom::geometry), "
+                f"LEAST(GREATEST(ST_Y(geom::geometry), -{MERCATOR_MAX_LAT}), {MERCATOR_MAX_LAT})"
+                "), 4326), 3857)",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "idx_locations_geom_3857", "locations", ["geom_3857"], postgresql_using="gist"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_locations_geom_3857", table_name="locations")
+    op.drop_column("locations", "geom_3857")
+    op.drop_column("locations", "longitude")
+    op.drop_column("locations", "latitude")
@@ -0,0 +1,33 @@
+"""add position columns to location_changes
+
+Revision ID: f3a9d1c5e8b2
+Revises: e7a4c9d2f5b3
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3a9d1c5e8b2"
+down_revision = "e7a4c9d2f5b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("location_changes", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("location_changes", sa.Column("longitude", sa.Float(), nullable=True))
+
+    # Best effort for existing rows: the current position (deleted locations stay NULL)
+    op.execute(
+        "UPDATE location_changes c SET latitude = l.latitude, longitude = l.longitude "
+        "FROM locations l WHERE l.id = c.location_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("location_changes", "longitude")
+    op.drop_column("location_changes", "latitude")
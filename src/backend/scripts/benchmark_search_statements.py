@@ -0,0 +1,100 @@
+"""
+Benchmark the Python-side cost of producing the search statements per request:
+the previous select() builder vs the cached lambda statements in SearchService.
+
+Measures what an execute() does before any I/O: build the statement, derive
+its cache key and fetch (or compile) the SQL from the compiled cache.
+No database is needed.
+Usage: python scripts/benchmark_search_statements.py [iterations]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from geoalchemy2.functions import ST_Distance, ST_MakePoint
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from sqlalchemy.orm import selectinload
+from sqlalchemy.util import LRUCache
+
+from src.models.location import Location, LocationCategory
+from src.schemas.location import LocationSearchParams
+from src.services.search_service import search_service
+
+
+def builder_statements(params: LocationSearchParams):
+    """The statements as built before lambda caching."""
+    stmt = select(Location).options(selectinload(Location.images))
+    stmt = search_service._apply_radius_filter(
+        stmt, params.latitude, params.longitude, params.radius
+    )
+    if params.category:
+        stmt = stmt.where(Location.category == params.category)
+    if params.status:
+        stmt = stmt.where(Location.status == params.status)
+    if params.query:
+        stmt = search_service._apply_text_filter(stmt, params.query)
+
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    center_point = func.ST_SetSRID(ST_MakePoint(params.longitude, params.latitude), 4326)
+    stmt = stmt.add_columns(ST_Distance(Location.geom, center_point).label("distance_meters"))
+    stmt = stmt.order_by("distance_meters").offset(params.skip).limit(params.limit)
+    return count_stmt, stmt
+
+
+def random_params() -> LocationSearchParams:
+    return LocationSearchParams(
+        latitude=21.0 + random.random() * 0.2,
+        longitude=105.8 + random.random() * 0.2,
+        radius=random.choice([1000, 5000, 10000]),
+        category=random.choice([None, *LocationCategory]),
+        query=random.choice([None, "pho", "cafe"]),
+        skip=random.choice([0, 20, 40]),
+    )
+
+
+def run(name, make_statements, requests, dialect, cache):
+    counts = {dialect.CACHE_HIT: 0, dialect.CACHE_MISS: 0, dialect.NO_CACHE_KEY: 0}
+
+    start = time.perf_counter()
+    for params in requests:
+        for stmt in make_statements(params):
+            # Same path Connection.execute takes before sending SQL
+            _, _, cache_hit = stmt._compile_w_cache(
+                dialect,
+                compiled_cache=cache,
+                column_keys=[],
+                for_executemany=False,
+                schema_translate_map=None,
+            )
+            counts[cache_hit] += 1
+    elapsed = time.perf_counter() - start
+
+    per_request_us = elapsed / len(requests) * 1e6
+    print(
+        f"{name:>8}: {per_request_us:8.1f} us/request | cache hits={counts[dialect.CACHE_HIT]} "
+        f"misses={counts[dialect.CACHE_MISS]} uncacheable={counts[dialect.NO_CACHE_KEY]} "
+        f"| shapes={len(cache)}"
+    )
+    return per_request_us
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    random.seed(42)
+    requests = [random_params() for _ in range(iterations)]
+    dialect = PGDialect_asyncpg()
+
+    builder_cache, lambda_cache = LRUCache(500), LRUCache(500)
+
+    # Warm up both caches so only steady-state cost is compared
+    run("warmup", builder_statements, requests[:200], dialect, builder_cache)
+    run("warmup", search_service._search_statements, requests[:200], dialect, lambda_cache)
+
+    builder = run("builder", builder_statements, requests, dialect, builder_cache)
+    cached = run("lambda", search_service._search_statements, requests, dialect, lambda_cache)
+    print(f"speedup: {builder / cached:.2f}x")
@@ -0,0 +1,112 @@
+"""
+Benchmark 100-row viewport fetches: coordinates cast from geom per row
+(the previous ST_Y/ST_X column_property, geography ST_Intersects) vs the
+stored latitude/longitude columns with the geom_3857 bounding-box filter.
+
+Needs a migrated database with seeded locations (DATABASE_URL, or the first
+argument); both variants run the same viewports through the same session.
+Usage: python scripts/benchmark_viewport_columns.py [database_url] [iterations]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from geoalchemy2 import Geometry
+from geoalchemy2.functions import ST_MakeEnvelope
+from sqlalchemy import cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.config import settings
+from src.models.location import MERCATOR_MAX_LAT, Location, LocationStatus
+
+_GEOM_3857 = Location.__table__.c.geom_3857
+
+# Everything LocationResponse needs, minus images (same for both variants)
+_COLUMNS = [c for c in Location.__table__.c if c.name not in ("geom", "geom_3857")]
+
+
+def cast_statement(box):
+    """Coordinates decoded per row, geodesic envelope test."""
+    columns = [c for c in _COLUMNS if c.name not in ("latitude", "longitude")]
+    as_geometry = cast(Location.geom, Geometry)
+    return (
+        select(
+            *columns,
+            func.ST_Y(as_geometry).label("latitude"),
+            func.ST_X(as_geometry).label("longitude"),
+        )
+        .where(
+            func.ST_Intersects(Location.geom, ST_MakeEnvelope(*box, 4326)),
+            Location.status == LocationStatus.approved,
+        )
+        .limit(100)
+    )
+
+
+def stored_statement(box):
+    """Generated columns, planar `&&` on the mercator copy."""
+    min_lng, min_lat, max_lng, max_lat = box
+    south, north = (max(-MERCATOR_MAX_LAT, min(MERCATOR_MAX_LAT, v)) for v in (min_lat, max_lat))
+    envelope = func.ST_Transform(ST_MakeEnvelope(min_lng, south, max_lng, north, 4326), 3857)
+    return (
+        select(*_COLUMNS)
+        .where(_GEOM_3857.intersects(envelope), Location.status == LocationStatus.approved)
+        .limit(100)
+    )
+
+
+async def random_viewports(session: AsyncSession, count: int) -> list[tuple]:
+    """Boxes (~0.05 degrees, a zoom-13 map) around random approved locations."""
+    rows = (
+        await session.execute(
+            select(Location.latitude, Location.longitude)
+            .where(Location.status == LocationStatus.approved)
+            .order_by(func.random())
+            .limit(count)
+        )
+    ).all()
+    half = 0.025
+    return [(lng - half, lat - half, lng + half, lat + half) for lat, lng in rows]
+
+
+async def run(name, make_statement, boxes, session) -> float:
+    timings, rows = [], 0
+    for box in boxes:
+        start = time.perf_counter()
+        rows += len((await session.execute(make_statement(box))).all())
+        timings.append(time.perf_counter() - start)
+    median_ms = statistics.median(timings) * 1000
+    p95_ms = statistics.quantiles(timings, n=20)[-1] * 1000
+    print(
+        f"{name:>7}: median {median_ms:6.2f} ms | p95 {p95_ms:6.2f} ms "
+        f"| {rows / len(boxes):.0f} rows/fetch"
+    )
+    return median_ms
+
+
+async def main(database_url: str, iterations: int) -> None:
+    engine = create_async_engine(database_url)
+    async with AsyncSession(engine) as session:
+        boxes = await random_viewports(session, iterations)
+        if not boxes:
+            sys.exit("No approved locations; seed the database first")
+
+        # Warm up caches and prepared statements for both shapes
+        await run("warmup", cast_statement, boxes[:20], session)
+        await run("warmup", stored_statement, boxes[:20], session)
+
+        before = await run("cast", cast_statement, boxes, session)
+        after = await run("stored", stored_statement, boxes, session)
+        print(f"speedup: {before / after:.2f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else settings.DATABASE_URL
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    asyncio.run(main(url, count))
@@ -0,0 +1,45 @@
+"""
+Build offline map bundles for every configured region and upload them to MinIO.
+Run periodically (e.g. cron) with: python scripts/build_offline_bundles.py [region ...]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from src.db.session import async_session_maker
+from src.services.offline_bundle_service import (
+    BUNDLE_CONTENT_TYPE,
+    BUNDLE_REGIONS,
+    offline_bundle_service,
+)
+from src.services.storage_service import storage_service
+
+
+async def build_bundles(regions: list[str]):
+    async with async_session_maker() as session:
+        for region in regions:
+            version, data = await offline_bundle_service.build_snapshot(session, region)
+
+            # Immutable versioned copy + short-lived `latest` alias
+            await storage_service.upload_bytes(
+                offline_bundle_service.bundle_key(region, version),
+                data,
+                BUNDLE_CONTENT_TYPE,
+                cache_control="public, max-age=31536000, immutable",
+            )
+            url = await storage_service.upload_bytes(
+                offline_bundle_service.bundle_key(region),
+                data,
+                BUNDLE_CONTENT_TYPE,
+                cache_control="public, max-age=300",
+            )
+            print(f"{region}: version={version} size={len(data)}B -> {url}")
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(build_bundles(sys.argv[1:] or list(BUNDLE_REGIONS)))
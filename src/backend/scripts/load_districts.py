@@ -0,0 +1,42 @@
+"""
+Load administrative district boundaries from a GeoJSON FeatureCollection and
+reassign every location to its district.
+Usage: python scripts/load_districts.py <file.geojson> [--city Hanoi] [--name-property name]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from src.db.session import async_session_maker
+from src.services.district_service import district_service
+
+
+async def load_districts(path: str, city: str | None, name_property: str):
+    with open(path, encoding="utf-8") as f:
+        feature_collection = json.load(f)
+
+    async with async_session_maker() as session:
+        loaded = await district_service.load_geojson(
+            session, feature_collection, city=city, name_property=name_property
+        )
+        assigned = await district_service.assign_locations(session)
+        await session.commit()
+
+    print(f"Loaded {loaded} districts, reassigned {assigned} locations")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="GeoJSON FeatureCollection of district polygons")
+    parser.add_argument("--city", default=None, help="City stored on each district")
+    parser.add_argument("--name-property", default="name", help="Feature property with the name")
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(load_districts(args.path, args.city, args.name_property))
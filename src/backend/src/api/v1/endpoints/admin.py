@@ -4,20 +4,34 @@ Admin API Endpoints
 
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.deps import get_current_active_user, get_db
+from src.core.deps import get_current_active_principal, get_db, get_read_db
+from src.core.principal import Principal
+from src.core.responses import ModelResponse
+from src.core.timing import TimedRoute
 from src.models.contact_message import ContactMessage
 from src.models.location import LocationStatus
-from src.models.user import User
 from src.schemas.contact import ContactMessageListResponse, ContactMessageResponse
 from src.schemas.location import LocationListResponse, LocationResponse
+from src.schemas.moderation import (
+    BulkModerationRequest,
+    BulkModerationResponse,
+    ModerationClaimResponse,
+    ModerationReleaseRequest,
+)
 from src.schemas.user import User as UserSchema
 from src.schemas.user import UserListResponse
-from src.services.location_service import location_service
+from src.services.dashboard_service import dashboard_service
+from src.services.location_service import (
+    LocationClaimedError,
+    LocationNotFoundError,
+    location_service,
+)
+from src.services.moderation_service import moderation_service
 from src.services.user_service import user_service
 
 
@@ -34,7 +48,7 @@ class DashboardResponse(BaseModel):
     recent_activity: list[LocationResponse]
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/locations", response_model=LocationListResponse)
@@ -42,18 +56,18 @@ async def list_locations(
     status: LocationStatus | None = None,
     skip: int = 0,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """
     List locations, optionally filtered by status (e.g. pending).
     Intended for admin dashboard.
     """
     if not current_user.is_superuser:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     items, total = await location_service.list_all(db, status, skip, limit)
 
-    return LocationListResponse(items=items, total=total, skip=skip, limit=limit)
+    return ModelResponse(LocationListResponse(items=items, total=total, skip=skip, limit=limit))
 
 
 @router.patch("/locations/{id}/status", response_model=LocationResponse)
@@ -62,28 +76,96 @@ async def update_location_status(
     status: Annotated[LocationStatus, Body(embed=True)],
     reason: Annotated[str | None, Body(embed=True)] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """
     Update location moderation status (Approve/Reject).
     """
     if not current_user.is_superuser:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    try:
+        return await location_service.update_status(
+            db,
+            id,
+            status,
+            reason=reason,
+            moderator_id=str(current_user.id),
+            moderator_ip="127.0.0.1",
+        )
+    except LocationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LocationClaimedError as e:
+        # Same rule as bulk moderation, which skips rows leased to someone else
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/moderation/claim", response_model=ModerationClaimResponse)
+async def claim_moderation_items(
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+):
+    """
+    Lease the oldest pending locations to the calling moderator.
+
+    Concurrent moderators get disjoint batches. Items not decided before the
+    lease expires go back to the queue; claiming again renews the caller's lease.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    items, lease_expires_at = await moderation_service.claim(db, current_user.id, limit)
+    return ModerationClaimResponse(items=items, lease_expires_at=lease_expires_at)
+
+
+@router.post("/moderation/release")
+async def release_moderation_items(
+    body: ModerationReleaseRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+):
+    """
+    Hand claimed items back to the queue.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    released = await moderation_service.release(db, current_user.id, body.location_ids)
+    return {"released": released}
+
+
+@router.post("/locations/bulk-status", response_model=BulkModerationResponse)
+async def bulk_update_location_status(
+    body: BulkModerationRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+):
+    """
+    Approve or reject many locations in one transaction.
 
-    return await location_service.update_status(
+    Locations already in the target status, missing, or claimed by another
+    moderator are returned in `skipped`.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    result = await moderation_service.bulk_update_status(
         db,
-        id,
-        status,
-        reason=reason,
-        moderator_id=str(current_user.id),
-        moderator_ip="127.0.0.1",
+        body.location_ids,
+        body.status,
+        moderator_id=current_user.id,
+        reason=body.reason,
+        moderator_ip=request.client.host if request.client else None,
     )
+    return BulkModerationResponse(updated=result.updated, skipped=result.skipped)
 
 
 @router.get("/dashboard/stats", response_model=DashboardResponse)
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """
     Get dashboard statistics.
@@ -91,37 +173,21 @@ async def get_dashboard_stats(
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    total_locations = await location_service.count(db)
-    pending_locations = await location_service.count(db, LocationStatus.pending)
-    approved_locations = await location_service.count(db, LocationStatus.approved)
-    rejected_locations = await location_service.count(db, LocationStatus.rejected)
-
-    # Count users (using direct query here or service if available)
-    # We need to expose count in user_service or use list_all(limit=0)
-    # Since we defined list_all returning tuple(items, total), we can use that with limit=1
-    _, total_users = await user_service.list_all(db, limit=1)
+    # One grouped count query, cached per worker and adjusted by moderation
+    stats = await dashboard_service.get_counts(db)
 
     # Recent activity (latest 5 locations)
-    recent_locations, _ = await location_service.list_all(db, limit=5)
+    recent_locations = await dashboard_service.recent_locations(db, limit=5)
 
-    return {
-        "stats": {
-            "total_locations": total_locations,
-            "pending_locations": pending_locations,
-            "approved_locations": approved_locations,
-            "rejected_locations": rejected_locations,
-            "total_users": total_users,
-        },
-        "recent_activity": recent_locations,
-    }
+    return {"stats": stats, "recent_activity": recent_locations}
 
 
 @router.get("/users", response_model=UserListResponse)
 async def list_users(
     skip: int = 0,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """
     List users.
@@ -138,7 +204,7 @@ async def update_user_status(
     id: int,
     is_active: Annotated[bool, Body(embed=True)],
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """
     Ban/Unban user.
@@ -161,8 +227,8 @@ async def list_contact_messages(
     limit: int = 20,
     is_read: bool | None = Query(None),
     is_archived: bool | None = Query(None),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """List contact messages for admin."""
     if not current_user.is_superuser:
@@ -195,7 +261,7 @@ async def update_contact_message(
     is_read: Annotated[bool | None, Body(embed=True)] = None,
     is_archived: Annotated[bool | None, Body(embed=True)] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     """Update contact message status (mark read / archive)."""
     if not current_user.is_superuser:
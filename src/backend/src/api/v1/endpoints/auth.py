@@ -14,6 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core import security
 from src.core.config import settings
 from src.core.deps import get_current_active_user, get_db
+from src.core.principal import principal_cache
+from src.core.timing import TimedRoute
 from src.models.user import User
 from src.schemas.user import (
     ChangePasswordRequest,
@@ -24,9 +26,10 @@ from src.schemas.user import (
     UserProfileUpdate,
 )
 from src.schemas.user import User as UserSchema
+from src.services.dashboard_service import dashboard_service
 from src.services.email import send_password_reset_email, send_verification_email
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/signup", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
@@ -55,8 +58,7 @@ async def create_user(
         )
 
     # Create new user
-    # Create new user
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.hash_password(user_in.password)
 
     # Generate verification code
     verification_code = secrets.token_hex(3).upper()  # 6 chars
@@ -76,6 +78,7 @@ async def create_user(
         verification_code_expires_at=verification_code_expires_at,
     )
     db.add(db_user)
+    await dashboard_service.user_created(db)
     await db.commit()
     await db.refresh(db_user)
 
@@ -130,6 +133,7 @@ async def verify_email(
 
     db.add(user)
     await db.commit()
+    principal_cache.invalidate(user.id)
 
     return {"message": "Email verified successfully"}
 
@@ -201,8 +205,7 @@ async def reset_password(
         )
 
     # Update password
-    hashed_password = security.get_password_hash(body.new_password)
-    user.hashed_password = hashed_password
+    user.hashed_password = await security.hash_password(body.new_password)
 
     # Clear code
     user.verification_code = None
@@ -213,10 +216,35 @@ async def reset_password(
 
     db.add(user)
     await db.commit()
+    principal_cache.invalidate(user.id)
 
     return {"message": "Password reset successfully"}
 
 
+async def _authenticate(db: AsyncSession, username_or_email: str, password: str) -> User | None:
+    """
+    Look up a user by username or email and check the password.
+
+    A correct password stored with outdated hash parameters is rehashed
+    and saved, so cost changes roll out as users log in.
+    """
+    stmt = select(User).where(
+        or_(User.email == username_or_email, User.username == username_or_email)
+    )
+    result = await db.execute(stmt)
+    user = result.scalars().first()
+    if not user:
+        return None
+
+    verified, new_hash = await security.verify_and_update_password(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    return user
+
+
 @router.post("/login/access-token")
 async def login_access_token(
     db: AsyncSession = Depends(get_db),
@@ -227,13 +255,8 @@ async def login_access_token(
     Supports login by username OR email.
     """
     # Try to authenticate by username or email
-    stmt = select(User).where(
-        or_(User.email == form_data.username, User.username == form_data.username)
-    )
-    result = await db.execute(stmt)
-    user = result.scalars().first()
-
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await _authenticate(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email/username or password",
@@ -261,13 +284,8 @@ async def login(
     """
     JSON body login.
     """
-    stmt = select(User).where(
-        or_(User.email == user_in.username_or_email, User.username == user_in.username_or_email)
-    )
-    result = await db.execute(stmt)
-    user = result.scalars().first()
-
-    if not user or not security.verify_password(user_in.password, user.hashed_password):
+    user = await _authenticate(db, user_in.username_or_email, user_in.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email/username or password",
@@ -386,6 +404,7 @@ async def update_profile(
 
     db.add(current_user)
     await db.commit()
+    principal_cache.invalidate(current_user.id)
     await db.refresh(current_user)
     return current_user
 
@@ -400,14 +419,18 @@ async def change_password(
     """
     Change current user password. Requires current password verification.
     """
-    if not security.verify_password(body.current_password, current_user.hashed_password):
+    verified, _ = await security.verify_and_update_password(
+        body.current_password, current_user.hashed_password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
-    current_user.hashed_password = security.get_password_hash(body.new_password)
+    current_user.hashed_password = await security.hash_password(body.new_password)
     db.add(current_user)
     await db.commit()
+    principal_cache.invalidate(current_user.id)
 
     return {"message": "Password changed successfully"}
@@ -6,11 +6,13 @@ Public endpoint for submitting contact messages.
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.deps import get_current_user, get_db
+from src.core.deps import get_current_principal, get_db
+from src.core.principal import Principal
+from src.core.timing import TimedRoute
 from src.models.contact_message import ContactMessage
 from src.schemas.contact import ContactMessageCreate, ContactMessageResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/", response_model=ContactMessageResponse, status_code=201)
@@ -38,7 +40,7 @@ async def create_contact_message(
 async def create_contact_message_authed(
     data: ContactMessageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Submit a contact message as an authenticated user.
@@ -5,9 +5,10 @@ Images API Endpoints
 from fastapi import APIRouter, File, HTTPException, Request, UploadFile, status
 
 from src.core.rate_limit import limiter
+from src.core.timing import TimedRoute
 from src.services.storage_service import FileTooLargeError, InvalidFileTypeError, storage_service
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
@@ -2,25 +2,55 @@
 Locations API Endpoints
 """
 
+import asyncio
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.deps import get_db
+from src.core import http_cache
+from src.core.config import settings
+from src.core.deps import get_db, get_read_db
+from src.core.polyline import decode_polyline
 from src.core.rate_limit import limiter
+from src.core.responses import ModelResponse
 from src.core.security import sanitize_input
+from src.core.timing import TimedRoute
+from src.db.routing import is_sticky
 from src.models.location import LocationCategory
+from src.schemas.district import DistrictResponse
 from src.schemas.location import (
+    BatchSearchHit,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    CorridorHit,
+    CorridorSearchResponse,
+    LocationChangesResponse,
     LocationCreate,
     LocationListResponse,
     LocationResponse,
     LocationSearchParams,
+    OfflineBundleDelta,
+    OfflineBundleInfo,
+    PointDistance,
 )
-from src.services.location_service import location_service
+from src.services.change_feed_service import change_feed_service
+from src.services.district_service import DistrictNotFoundError, district_service
+from src.services.location_service import LocationNotFoundError, location_service
+from src.services.offline_bundle_service import (
+    BUNDLE_REGIONS,
+    UnknownRegionError,
+    offline_bundle_service,
+)
+from src.services.realtime_service import realtime_service
 from src.services.search_service import search_service
+from src.services.storage_service import storage_service
+
+router = APIRouter(route_class=TimedRoute)
 
-router = APIRouter()
+_location_list = TypeAdapter(list[LocationResponse])
 
 
 @router.post("/", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
@@ -51,34 +81,139 @@ async def create_location(
 @limiter.limit("100/minute")
 async def search_locations(
     request: Request,
-    latitude: Annotated[float, Query(..., ge=-90, le=90)],
-    longitude: Annotated[float, Query(..., ge=-180, le=180)],
+    latitude: Annotated[float | None, Query(ge=-90, le=90)] = None,
+    longitude: Annotated[float | None, Query(ge=-180, le=180)] = None,
     radius: Annotated[int, Query(ge=500, le=50000)] = 5000,
+    district: Annotated[str | None, Query(max_length=100, description="District slug")] = None,
     query: Annotated[str | None, Query(max_length=100)] = None,
     category: LocationCategory | None = None,
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Search locations within a radius with optional text and category filters.
+
+    With `district`, results are limited to that district; the center point is
+    then optional (without it, results are newest first).
     """
     if query:
         query = sanitize_input(query)
 
-    params = LocationSearchParams(
-        latitude=latitude,
-        longitude=longitude,
-        radius=radius,
-        query=query,
-        category=category,
-        skip=skip,
-        limit=limit,
+    district_id = None
+    if district:
+        try:
+            district_id = await district_service.get_id_by_slug(db, district)
+        except DistrictNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    try:
+        params = LocationSearchParams(
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            district_id=district_id,
+            query=query,
+            category=category,
+            skip=skip,
+            limit=limit,
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False),
+        )
+
+    # Clients that just wrote read their own session (the primary), not shared pages
+    items, total = await search_service.search_shared(params, db if is_sticky(request) else None)
+
+    return ModelResponse(LocationListResponse(items=items, total=total, skip=skip, limit=limit))
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+@limiter.limit("30/minute")
+async def search_locations_batch(
+    request: Request,
+    body: BatchSearchRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Search around many centre points in one request.
+
+    Results are deduplicated across centres; each hit keeps its distance to
+    every centre it was found near and is ranked by the nearest one.
+    """
+    results = await search_service.search_batch(
+        db,
+        [(point.latitude, point.longitude) for point in body.points],
+        radius_meters=body.radius,
+        category=body.category,
+        limit_per_point=body.limit_per_point,
     )
 
-    items, total = await search_service.search(db, params)
+    items = [
+        BatchSearchHit(
+            location=location,
+            distance_meters=min(per_point.values()),
+            distances=[
+                PointDistance(point_index=idx, distance_meters=distance)
+                for idx, distance in sorted(per_point.items())
+            ],
+        )
+        for location, per_point in results
+    ]
+    return BatchSearchResponse(items=items, total=len(items))
 
-    return LocationListResponse(items=items, total=total, skip=skip, limit=limit)
+
+MAX_CORRIDOR_POINTS = 2000
+
+
+@router.get("/search/corridor", response_model=CorridorSearchResponse)
+@limiter.limit("60/minute")
+async def search_locations_corridor(
+    request: Request,
+    polyline: Annotated[str, Query(min_length=4, max_length=16000)],
+    buffer: Annotated[int, Query(ge=50, le=5000, description="Corridor half-width (m)")] = 200,
+    precision: Annotated[int, Query(ge=5, le=6)] = 5,
+    category: LocationCategory | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Search locations along a route (encoded polyline), in route order.
+
+    Pass `next_cursor` from a response as `cursor` to fetch the next stretch
+    of the route.
+    """
+    try:
+        points = decode_polyline(polyline, precision)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not 2 <= len(points) <= MAX_CORRIDOR_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Route must have between 2 and {MAX_CORRIDOR_POINTS} points",
+        )
+
+    after = None
+    if cursor:
+        try:
+            fraction, loc_id = cursor.split(":")
+            after = (float(fraction), int(loc_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    results, next_after = await search_service.search_corridor(
+        db, points, buffer_meters=buffer, category=category, limit=limit, after=after
+    )
+    return CorridorSearchResponse(
+        items=[
+            CorridorHit(location=location, route_fraction=fraction, distance_meters=distance)
+            for location, fraction, distance in results
+        ],
+        next_cursor=f"{next_after[0]!r}:{next_after[1]}" if next_after else None,
+    )
 
 
 @router.get("/viewport", response_model=list[LocationResponse])
@@ -91,16 +226,163 @@ async def search_viewport(
     max_lat: float,
     category: LocationCategory | None = None,
     limit: Annotated[int, Query(le=100)] = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Search locations within a map viewport (bounding box).
     Used for lazy loading markers on the map.
     """
-    locations = await search_service.search_viewport(
-        db, min_lng, min_lat, max_lng, max_lat, category, limit=limit
+    # The session only connects if used (sticky clients)
+    items = await search_service.search_viewport_shared(
+        min_lng,
+        min_lat,
+        max_lng,
+        max_lat,
+        category,
+        limit=limit,
+        db=db if is_sticky(request) else None,
     )
-    return locations
+    return ModelResponse(items, adapter=_location_list)
+
+
+@router.get("/stream")
+async def stream_location_events(
+    request: Request,
+    min_lng: Annotated[float, Query(ge=-180, le=180)],
+    min_lat: Annotated[float, Query(ge=-90, le=90)],
+    max_lng: Annotated[float, Query(ge=-180, le=180)],
+    max_lat: Annotated[float, Query(ge=-90, le=90)],
+):
+    """
+    Server-Sent Events stream of approved/edited/deleted locations in a viewport.
+
+    Replaces polling `/viewport`: the client opens one stream per viewport and
+    re-subscribes when the map moves. Each event's `data` is a JSON
+    `LocationEvent`; comment lines are heartbeats.
+    """
+    if min_lng > max_lng or min_lat > max_lat:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid bounding box")
+    if len(realtime_service.grid) >= settings.REALTIME_MAX_SUBSCRIBERS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live subscribers, fall back to polling",
+        )
+
+    async def event_source():
+        async with realtime_service.subscribe((min_lng, min_lat, max_lng, max_lat)) as sub:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        sub.queue.get(), timeout=settings.REALTIME_HEARTBEAT_SECONDS
+                    )
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event.type.value}\ndata: {event.to_json()}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/changes", response_model=LocationChangesResponse)
+@limiter.limit("60/minute")
+async def get_location_changes(
+    request: Request,
+    since: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=5000)] = 1000,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Incremental change feed of public locations.
+
+    Returns upserts (current state of approved locations) and tombstones for
+    everything that changed after `since`. Clients keep `next_since` and poll
+    again; `has_more` means another page is immediately available.
+    """
+    upserts, deleted, next_since, has_more = await change_feed_service.get_changes(
+        db, since, limit
+    )
+    return LocationChangesResponse(
+        since=since,
+        next_since=next_since,
+        has_more=has_more,
+        upserts=upserts,
+        deleted=deleted,
+    )
+
+
+@router.get("/bundles", response_model=list[OfflineBundleInfo])
+async def list_offline_bundles():
+    """
+    List offline bundle regions and the URL of their latest snapshot.
+
+    Snapshots are precomputed by `scripts/build_offline_bundles.py`.
+    """
+    return [
+        OfflineBundleInfo(
+            region=region,
+            bounds=bounds,
+            url=storage_service.public_url(offline_bundle_service.bundle_key(region)),
+        )
+        for region, bounds in BUNDLE_REGIONS.items()
+    ]
+
+
+@router.get("/bundles/{region}/delta", response_model=OfflineBundleDelta)
+@limiter.limit("60/minute")
+async def get_offline_bundle_delta(
+    request: Request,
+    region: str,
+    since: Annotated[int, Query(ge=0)],
+    limit: Annotated[int, Query(ge=1, le=5000)] = 1000,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get changes in a bundle region after the client's bundle version.
+    """
+    try:
+        upserts, removed, version, has_more = await offline_bundle_service.get_delta(
+            db, region, since, limit
+        )
+    except UnknownRegionError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return OfflineBundleDelta(
+        region=region,
+        since=since,
+        version=version,
+        upserts=upserts,
+        removed=removed,
+        has_more=has_more,
+    )
+
+
+@router.get("/districts", response_model=list[DistrictResponse])
+@limiter.limit("60/minute")
+async def list_districts(
+    request: Request,
+    city: Annotated[str | None, Query(max_length=100)] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List districts with approved-location counts per category.
+    """
+    districts = await district_service.list_with_counts(db, city)
+    return [
+        DistrictResponse(
+            id=district.id,
+            slug=district.slug,
+            name=district.name,
+            city=district.city,
+            total=sum(counts.values()),
+            category_counts=counts,
+        )
+        for district, counts in districts
+    ]
 
 
 @router.get("/{id}", response_model=LocationResponse)
@@ -108,9 +390,27 @@ async def search_viewport(
 async def get_location(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get location details by ID.
+
+    Supports conditional requests: a matching If-None-Match (or a current
+    If-Modified-Since) gets a 304 after one version query.
     """
-    return await location_service.get_by_id(db, id)
+    if http_cache.is_conditional(request):
+        version = await location_service.get_version(db, id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+        if http_cache.is_not_modified(request, version):
+            return http_cache.not_modified_response(version)
+
+    try:
+        location = await location_service.get_by_id(db, id)
+    except LocationNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return ModelResponse(
+        LocationResponse.model_validate(location),
+        headers=http_cache.cache_headers(location_service.version_of(location)),
+    )
@@ -6,13 +6,17 @@ Full CRUD for community posts with likes, comments, image uploads.
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from sqlalchemy import desc, func, select
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from sqlalchemy import desc, func, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.core import http_cache
 from src.core.config import settings
-from src.core.deps import get_current_active_user, get_db, get_s3_client
+from src.core.deps import get_current_active_principal, get_db, get_read_db, get_s3_client
+from src.core.principal import Principal
+from src.core.responses import ModelResponse
+from src.core.timing import TimedRoute
 from src.models.post import Post, PostComment, PostImage, PostLike
 from src.models.user import User
 from src.schemas.post import (
@@ -26,7 +30,7 @@ from src.schemas.post import (
     PostUpdate,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def _post_to_response(post: Post, current_user_id: int | None = None) -> PostResponse:
@@ -50,13 +54,114 @@ def _post_to_response(post: Post, current_user_id: int | None = None) -> PostRes
     )
 
 
+def _post_version(post: Post) -> http_cache.ResourceVersion:
+    """Version of a loaded post (likes, comments with users, images, author loaded)."""
+    likes, comments, images = post.likes, post.comments, post.images
+    # Author and commenter profiles (name, avatar) are rendered in the body
+    profiles_at = max(
+        (post.author.updated_at, *(comment.user.updated_at for comment in comments))
+    )
+    return http_cache.ResourceVersion(
+        last_modified=http_cache.latest(
+            post.updated_at,
+            profiles_at,
+            *(like.created_at for like in likes),
+            *(comment.updated_at for comment in comments),
+        ),
+        has_children=True,
+        fingerprint=(
+            profiles_at,
+            post.updated_at,
+            len(likes),
+            max((like.id for like in likes), default=None),
+            len(comments),
+            max((comment.id for comment in comments), default=None),
+            max((comment.updated_at for comment in comments), default=None),
+            len(images),
+            max((image.id for image in images), default=None),
+        ),
+    )
+
+
+async def _get_post_version(
+    db: AsyncSession, post_id: int
+) -> tuple[http_cache.ResourceVersion, bool] | None:
+    """Same version as `_post_version` from one aggregate query, plus is_published."""
+    likes = (
+        select(
+            func.count(PostLike.id).label("count"),
+            func.max(PostLike.id).label("last_id"),
+            func.max(PostLike.created_at).label("last_at"),
+        )
+        .where(PostLike.post_id == post_id)
+        .subquery()
+    )
+    comments = (
+        select(
+            func.count(PostComment.id).label("count"),
+            func.max(PostComment.id).label("last_id"),
+            func.max(PostComment.updated_at).label("last_at"),
+        )
+        .where(PostComment.post_id == post_id)
+        .subquery()
+    )
+    images = (
+        select(func.count(PostImage.id).label("count"), func.max(PostImage.id).label("last_id"))
+        .where(PostImage.post_id == post_id)
+        .subquery()
+    )
+    profiles = (
+        select(func.max(User.updated_at).label("last_at"))
+        .where(
+            or_(
+                User.id == select(Post.author_id).where(Post.id == post_id).scalar_subquery(),
+                User.id.in_(select(PostComment.user_id).where(PostComment.post_id == post_id)),
+            )
+        )
+        .subquery()
+    )
+    stmt = (
+        select(Post.updated_at, Post.is_published, likes, comments, images, profiles)
+        .select_from(Post)
+        .join(likes, true())
+        .join(comments, true())
+        .join(images, true())
+        .join(profiles, true())
+        .where(Post.id == post_id)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        return None
+    updated_at, is_published, *stats = row
+    like_count, last_like_id, last_like_at = stats[0:3]
+    comment_count, last_comment_id, last_comment_at = stats[3:6]
+    image_count, last_image_id = stats[6:8]
+    profiles_at = stats[8]
+    version = http_cache.ResourceVersion(
+        last_modified=http_cache.latest(updated_at, profiles_at, last_like_at, last_comment_at),
+        has_children=True,
+        fingerprint=(
+            profiles_at,
+            updated_at,
+            like_count,
+            last_like_id,
+            comment_count,
+            last_comment_id,
+            last_comment_at,
+            image_count,
+            last_image_id,
+        ),
+    )
+    return version, is_published
+
+
 # ---------- Posts CRUD ----------
 
 
 @router.get("", response_model=PostListResponse)
 async def list_posts(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
 ) -> Any:
@@ -83,19 +188,21 @@ async def list_posts(
     posts = result.scalars().unique().all()
 
     # Try to get current user for is_liked (optional auth)
-    return PostListResponse(
-        items=[_post_to_response(p) for p in posts],
-        total=total,
-        skip=skip,
-        limit=limit,
+    return ModelResponse(
+        PostListResponse(
+            items=[_post_to_response(p) for p in posts],
+            total=total,
+            skip=skip,
+            limit=limit,
+        )
     )
 
 
 @router.get("/me", response_model=PostListResponse)
 async def list_my_posts(
     *,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
 ) -> Any:
@@ -119,21 +226,37 @@ async def list_my_posts(
     result = await db.execute(stmt)
     posts = result.scalars().unique().all()
 
-    return PostListResponse(
-        items=[_post_to_response(p, current_user.id) for p in posts],
-        total=total,
-        skip=skip,
-        limit=limit,
+    return ModelResponse(
+        PostListResponse(
+            items=[_post_to_response(p, current_user.id) for p in posts],
+            total=total,
+            skip=skip,
+            limit=limit,
+        )
     )
 
 
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
     *,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     post_id: int,
 ) -> Any:
-    """Get a single post by ID."""
+    """
+    Get a single post by ID.
+
+    Supports conditional requests (ETag / Last-Modified); drafts are not
+    cacheable by shared caches.
+    """
+    if http_cache.is_conditional(request):
+        current = await _get_post_version(db, post_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        version, is_published = current
+        if http_cache.is_not_modified(request, version):
+            return http_cache.not_modified_response(version, public=is_published)
+
     stmt = (
         select(Post)
         .where(Post.id == post_id)
@@ -150,14 +273,17 @@ async def get_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return _post_to_response(post)
+    return ModelResponse(
+        _post_to_response(post),
+        headers=http_cache.cache_headers(_post_version(post), public=post.is_published),
+    )
 
 
 @router.post("", response_model=PostResponse, status_code=201)
 async def create_post(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_in: PostCreate,
 ) -> Any:
     """Create a new post."""
@@ -178,7 +304,7 @@ async def create_post(
 async def update_post(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
     post_in: PostUpdate,
 ) -> Any:
@@ -216,7 +342,7 @@ async def update_post(
 async def delete_post(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
 ) -> None:
     """Delete own post."""
@@ -241,7 +367,7 @@ async def upload_post_image(
     *,
     db: AsyncSession = Depends(get_db),
     s3=Depends(get_s3_client),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
     file: UploadFile = File(...),
     caption: str | None = None,
@@ -302,7 +428,7 @@ async def upload_post_image(
 async def toggle_like(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
 ) -> dict:
     """Toggle like on a post. Returns new like state."""
@@ -337,7 +463,7 @@ async def toggle_like(
 async def create_comment(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
     comment_in: CommentCreate,
 ) -> Any:
@@ -363,7 +489,7 @@ async def create_comment(
 async def delete_comment(
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     post_id: int,
     comment_id: int,
 ) -> None:
@@ -0,0 +1,149 @@
+"""
+SatVach In-Process Cache
+Small TTL caches for per-worker memoization of cheap-to-stale values.
+
+Each worker process holds its own copy; callers that need cross-worker
+freshness must keep the TTL short or accept per-worker drift.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries expire `ttl` seconds after being set.
+
+    Not thread-safe; meant for use from the event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class CoalescingCache:
+    """
+    Async memoizer with single-flight loads and stale-while-revalidate.
+
+    - Concurrent misses for one key share a single in-flight load (one DB
+      round trip, one result) instead of each running their own.
+    - Entries are fresh for `ttl` seconds, then served stale for up to
+      `stale_ttl` more while one background refresh replaces them.
+    - `clear()` drops entries and detaches in-flight loads, so nothing read
+      before an invalidation is stored or handed to later callers.
+
+    A shared load is shielded: a caller that is cancelled leaves it running
+    for the others. Not thread-safe; meant for use from the event loop.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 5.0, stale_ttl: float = 30.0, clock=time.monotonic
+    ):
+        self.ttl = ttl
+        self._clock = clock
+        # Values are (fresh until, result); kept until the stale window ends
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl, clock=clock)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[Any]],
+        refresh: Callable[[], Awaitable[Any]] | None = None,
+    ) -> tuple[Any, str]:
+        """
+        Cached value for `key`, loading it at most once at a time.
+
+        Args:
+            key: Hashable cache key
+            load: Coroutine factory run on a miss (e.g. with the caller's session)
+            refresh: Coroutine factory for background revalidation of a stale
+                entry; without it a stale entry counts as a miss
+
+        Returns:
+            Tuple of (value, outcome) where outcome is "hit", "stale",
+            "coalesced" (joined another caller's load) or "miss"
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if self._clock() < fresh_until:
+                return value, "hit"
+            if refresh is not None:
+                if key not in self._inflight:
+                    self._start(key, refresh).add_done_callback(_log_refresh_error)
+                return value, "stale"
+
+        task = self._inflight.get(key)
+        outcome = "coalesced" if task is not None else "miss"
+        if task is None:
+            task = self._start(key, load)
+        return await asyncio.shield(task), outcome
+
+    def _start(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, load, self._generation))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]], generation: int):
+        try:
+            value = await load()
+            if generation == self._generation:
+                self._entries.set(key, (self._clock() + self.ttl, value))
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background cache refresh failed: {task.exception()!r}")
@@ -0,0 +1,141 @@
+"""
+SatVach Adaptive Concurrency Limiting
+Per-worker cap on in-flight API requests that follows observed latency.
+
+When Postgres slows down, extra concurrency only lengthens the queue for pool
+connections until clients time out. The limit is AIMD-controlled: it grows
+by about one per limit's worth of requests that finish within
+LOAD_SHED_LATENCY_SECONDS (while the limit is actually in use), and is cut by
+LOAD_SHED_BACKOFF when a request is slower or fails, at most once per latency
+window so one slow burst counts once. Requests over the limit are rejected at
+once with 503 + Retry-After instead of queueing.
+
+Priority classes reserve headroom: critical traffic (admin, auth) may use the
+whole limit, cacheable reads (GET/HEAD) most of it, and other requests
+(writes) are shed first.
+"""
+
+import math
+import time
+from collections.abc import Callable
+from enum import IntEnum
+
+from src.core.config import settings
+from src.core.metrics import Gauge, registry
+
+
+class Priority(IntEnum):
+    """Request classes, shed lowest first."""
+
+    normal = 0
+    cacheable = 1
+    critical = 2
+
+
+# Share of the current limit each class may fill
+PRIORITY_SHARES: dict[Priority, float] = {
+    Priority.critical: 1.0,
+    Priority.cacheable: 0.9,
+    Priority.normal: 0.7,
+}
+
+
+class AIMDLimit:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Args:
+        initial: Starting limit
+        min_limit: Floor (the limit never drops below it)
+        max_limit: Ceiling
+        latency_threshold: Requests slower than this (seconds) signal overload
+        backoff: Factor applied to the limit on overload
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_threshold: float,
+        backoff: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.backoff = backoff
+        self._clock = clock
+        self._last_decrease = -math.inf
+
+    def on_sample(self, latency: float, inflight: int, dropped: bool = False) -> None:
+        """
+        Adjust the limit after a request completes.
+
+        Args:
+            latency: Request duration in seconds
+            inflight: Requests in flight when it completed (itself included)
+            dropped: Whether the request failed
+        """
+        if dropped or latency > self.latency_threshold:
+            now = self._clock()
+            if now - self._last_decrease >= self.latency_threshold:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+        elif inflight * 2 >= self.limit:
+            # Grow only when the limit is what bounds concurrency
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+
+class ConcurrencyLimiter:
+    """
+    In-flight request counter gated by an adaptive limit and priority shares.
+
+    Not thread-safe; meant for use from the event loop.
+    """
+
+    def __init__(self, limit: AIMDLimit, shares: dict[Priority, float] = PRIORITY_SHARES):
+        self.limit = limit
+        self.shares = shares
+        self.inflight = 0
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Take a slot if `priority` still has room under the current limit."""
+        if self.inflight >= max(1, int(self.limit.limit * self.shares[priority])):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, latency: float, dropped: bool = False) -> None:
+        self.limit.on_sample(latency, self.inflight, dropped)
+        self.inflight -= 1
+
+
+# Singleton instance
+concurrency_limiter = ConcurrencyLimiter(
+    AIMDLimit(
+        initial=settings.LOAD_SHED_INITIAL_LIMIT,
+        min_limit=settings.LOAD_SHED_MIN_LIMIT,
+        max_limit=settings.LOAD_SHED_MAX_LIMIT,
+        latency_threshold=settings.LOAD_SHED_LATENCY_SECONDS,
+        backoff=settings.LOAD_SHED_BACKOFF,
+    )
+)
+
+registry.register(
+    Gauge(
+        "satvach_concurrency_limit",
+        "Current adaptive limit on in-flight API requests.",
+        (),
+        lambda: [((), concurrency_limiter.limit.limit)],
+    )
+)
+registry.register(
+    Gauge(
+        "satvach_concurrency_inflight",
+        "API requests in flight under the concurrency limit.",
+        (),
+        lambda: [((), concurrency_limiter.inflight)],
+    )
+)
@@ -23,6 +23,25 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = ""  # MUST be set via env var
+    # Read replicas for search/list traffic (JSON list in env); empty = primary only
+    DATABASE_READ_URLS: list[str] = []
+    # After a write, the client's reads stay on the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Database pool (per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds; -1 keeps connections forever
+    # Pre-ping costs a round trip per checkout; with recycle below the server /
+    # proxy idle timeout it can usually be turned off
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False  # LIFO lets surplus idle connections age out
+
+    # asyncpg connection options
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements per connection (0 = off)
+    DB_JIT: bool = False  # Postgres JIT; off suits short OLTP queries
+    DB_SERVER_SETTINGS: dict[str, str] = {}  # Extra server_settings (JSON in env)
 
     # MinIO / S3
     S3_ENDPOINT: str = "http://minio:9000"
@@ -31,6 +50,82 @@ class Settings(BaseSettings):
     S3_SECRET_KEY: str = ""  # MUST be set via env var
     S3_BUCKET: str = "satvach-items"
 
+    # Authenticated principals cached per worker (ban/role changes on other
+    # workers take effect within this many seconds)
+    AUTH_CACHE_SECONDS: int = 30
+    AUTH_CACHE_SIZE: int = 10000
+
+    # Password hashing (pbkdf2_sha256, off the event loop)
+    PASSWORD_HASH_ROUNDS: int = 29000  # Stored hashes with other rounds are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 2  # Hashing threads per worker process
+    PASSWORD_HASH_MAX_WAITING: int = 64  # Queued hash requests beyond this are rejected (503)
+
+    # Rate limiting (turn off only for load tests and benchmarks)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE: str = "shared"  # "shared" (all workers on the host) or "memory"
+    RATE_LIMIT_SHARED_PATH: str = ""  # Bucket table file; default /dev/shm or the temp dir
+    RATE_LIMIT_SLOTS: int = 65536  # Max tracked (endpoint, client) buckets
+
+    # Adaptive concurrency limit on API requests (per worker; excess gets 503)
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_INITIAL_LIMIT: int = 15  # DB_POOL_SIZE + DB_MAX_OVERFLOW
+    LOAD_SHED_MIN_LIMIT: int = 4
+    LOAD_SHED_MAX_LIMIT: int = 200
+    LOAD_SHED_LATENCY_SECONDS: float = 1.0  # Slower requests shrink the limit
+    LOAD_SHED_BACKOFF: float = 0.9  # Limit multiplier on overload
+    # Not limited: long-lived streams and uploads that barely touch the database
+    LOAD_SHED_EXEMPT_PATHS: list[str] = [
+        "/locations/stream",
+        "/images/upload",
+        "/auth/me/avatar",
+    ]
+
+    # Response compression (gzip, or brotli when the client accepts it)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Smaller bodies are sent as is
+    COMPRESSION_THREAD_THRESHOLD: int = 65536  # Larger bodies compress off the event loop
+    COMPRESSION_CACHE_BYTES: int = 16 * 1024 * 1024  # Compressed hot payloads (0 = off)
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
+
+    # HTTP caching of public detail responses (ETag / Last-Modified always sent)
+    HTTP_CACHE_MAX_AGE: int = 30  # Browsers revalidate after this
+    HTTP_CACHE_SHARED_MAX_AGE: int = 60  # CDN / shared cache lifetime
+
+    # Observability
+    METRICS_ENABLED: bool = True  # Prometheus text format on /metrics
+    SERVER_TIMING_ENABLED: bool = True  # Per-phase Server-Timing response header
+    SLOW_QUERY_MS: int = 200  # Log SQL statements slower than this
+
+    # Public search/viewport results (per worker; location writes invalidate).
+    # Identical concurrent queries always share one DB execution.
+    SEARCH_CACHE_SECONDS: float = 5  # Served as fresh
+    SEARCH_STALE_SECONDS: float = 30  # Then served stale while one refresh runs
+    SEARCH_CACHE_SIZE: int = 1024
+
+    # District slug -> id lookups (per worker; district imports run elsewhere)
+    DISTRICT_CACHE_SECONDS: int = 300
+
+    # Admin dashboard aggregates (per worker; moderation adjusts them in place)
+    DASHBOARD_CACHE_SECONDS: int = 60
+
+    # Moderation queue
+    MODERATION_LEASE_SECONDS: int = 600  # Claimed items return to the queue after this
+
+    # Realtime (SSE push of location events via Postgres LISTEN/NOTIFY)
+    REALTIME_ENABLED: bool = True
+    REALTIME_MAX_SUBSCRIBERS: int = 1000  # Per worker
+    REALTIME_HEARTBEAT_SECONDS: int = 15
+
+    # In-process spatial index (optional replica of approved locations)
+    SPATIAL_INDEX_ENABLED: bool = False
+    SPATIAL_INDEX_SYNC_SECONDS: int = 30  # Change-feed catch-up interval
+    SPATIAL_INDEX_CELL_DEGREES: float = 0.01  # ~1.1km grid cells
+
+    # Viewport queries: planar bbox test on locations.geom_3857 (web mercator,
+    # like the map) instead of a geography ST_Intersects
+    VIEWPORT_PLANAR_FILTER: bool = True
+
     # Email
     MAIL_USERNAME: str = ""
     MAIL_PASSWORD: str = ""
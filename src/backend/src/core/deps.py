@@ -7,31 +7,53 @@ from collections.abc import AsyncGenerator
 from typing import Annotated
 
 import aioboto3
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
+from src.core.principal import Principal, principal_cache
+from src.db.routing import choose_read_session_maker, replicas_enabled, track_writes
 from src.db.session import async_session_maker
 from src.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(response: Response) -> AsyncGenerator[AsyncSession, None]:
     """
-    Database session dependency.
+    Database session dependency (primary).
     Yields an async database session and ensures proper cleanup.
     """
     async with async_session_maker() as session:
+        if replicas_enabled():
+            # Writes pin the client's reads to the primary for a short window
+            track_writes(session, response)
         try:
             yield session
         finally:
             await session.close()
 
 
+async def _get_routed_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only database session dependency (with replicas).
+    Uses a read replica, except for clients that wrote recently.
+    """
+    async with choose_read_session_maker(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+# Without replicas, reads share the request's primary session, so an endpoint
+# that also authenticates (principal cache miss) holds one connection, not two
+get_read_db = _get_routed_read_db if replicas_enabled() else get_db
+
+
 async def get_s3_client():
     """
     S3/MinIO client dependency.
@@ -47,30 +69,37 @@ async def get_s3_client():
         yield client
 
 
+_credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _token_user_id(token: str) -> int:
+    """User ID from a valid access token, else 401."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            raise _credentials_exception
+        return int(user_id)
+    except (JWTError, ValueError):
+        raise _credentials_exception
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Get current user from JWT token.
+    Loads the full row; prefer `get_current_principal` for authorization checks.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(select(User).where(User.id == _token_user_id(token)))
     user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception
     return user
 
 
@@ -83,3 +112,27 @@ async def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Get the current user's principal from JWT token (cached, usually no query).
+    """
+    principal = await principal_cache.get(db, _token_user_id(token))
+    if principal is None:
+        raise _credentials_exception
+    return principal
+
+
+async def get_current_active_principal(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    """
+    Get current active user's principal (not disabled).
+    """
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
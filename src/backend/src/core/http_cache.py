@@ -0,0 +1,114 @@
+"""
+SatVach HTTP Caching
+Validators (ETag / Last-Modified) and Cache-Control for detail endpoints.
+
+A resource's version is its own `updated_at` plus a fingerprint of the child
+rows rendered with it (counts and newest IDs/timestamps of images, likes,
+comments). Services compute it either from a loaded object or with a small
+aggregate query, so a conditional request can be answered with 304 without
+loading and serializing the body.
+
+Deleting or reordering children changes the fingerprint but not the newest
+timestamp, so for resources with children only If-None-Match is trusted;
+If-Modified-Since would answer 304 with the old body.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from src.core.config import settings
+
+
+@dataclass(frozen=True)
+class ResourceVersion:
+    """What a response body depends on."""
+
+    last_modified: datetime
+    fingerprint: tuple
+    # Body includes child rows: last_modified can't see deletes, ignore If-Modified-Since
+    has_children: bool = False
+
+    @property
+    def etag(self) -> str:
+        # Timestamps as epoch seconds so the tzinfo a driver attaches doesn't matter
+        parts = tuple(p.timestamp() if isinstance(p, datetime) else p for p in self.fingerprint)
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+        return f'W/"{digest}"'
+
+    @property
+    def last_modified_header(self) -> str:
+        return format_datetime(self.last_modified.astimezone(UTC), usegmt=True)
+
+
+def latest(*timestamps: datetime | None) -> datetime:
+    """Newest of the given timestamps (None entries are ignored)."""
+    return max(ts for ts in timestamps if ts is not None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list."""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """
+    Whether the client's cached copy is current (RFC 9110 section 13.2.2).
+
+    If-None-Match takes precedence; If-Modified-Since is compared at
+    one-second precision, like the header itself, and only for resources
+    without children.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, version.etag)
+    if version.has_children:
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return version.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def cache_headers(version: ResourceVersion, public: bool = True) -> dict[str, str]:
+    """
+    Validator and Cache-Control headers for a response.
+
+    Public responses may be stored by shared caches (CDN) for
+    HTTP_CACHE_SHARED_MAX_AGE; browsers revalidate after HTTP_CACHE_MAX_AGE.
+    """
+    if public:
+        cache_control = (
+            f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, "
+            f"s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE}"
+        )
+    else:
+        cache_control = "private, no-cache"
+    return {
+        "ETag": version.etag,
+        "Last-Modified": version.last_modified_header,
+        "Cache-Control": cache_control,
+    }
+
+
+def not_modified_response(version: ResourceVersion, public: bool = True) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(version, public)
+    )
@@ -0,0 +1,215 @@
+"""
+SatVach Metrics
+Minimal in-process Prometheus registry (text exposition format 0.0.4).
+
+Metrics are per worker process; scrape every worker (or aggregate with the
+usual Prometheus relabelling) when running several.
+"""
+
+import math
+import threading
+from collections.abc import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with optional labels."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (bucket counts, sum, count)
+        self._values: dict[LabelValues, tuple[list[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts, total, count = self._values.get(labels) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[labels] = (counts, total + value, count + 1)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                le = _format_labels((*self.labelnames, "le"), (*labels, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{le} {bucket_count}")
+            inf = _format_labels((*self.labelnames, "le"), (*labels, "+Inf"))
+            lines.append(f"{self.name}_bucket{inf} {count}")
+            base = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Metric whose samples are read from a callback at scrape time.
+
+    `type_name="counter"` exposes values that are cumulative at the source.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        type_name: str = "gauge",
+    ):
+        self.type_name = type_name
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._collect = collect
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._collect()
+        ]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for a Prometheus scrape."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram | Gauge] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton registry and application metrics
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter(
+        "satvach_http_requests_total",
+        "HTTP requests by route template, method and status.",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "satvach_http_request_duration_seconds",
+        "Time to response headers by route template.",
+        ("method", "route"),
+    )
+)
+request_phase_seconds_total = registry.register(
+    Counter(
+        "satvach_request_phase_seconds_total",
+        "Cumulative time per request phase (db, pool, app, serialize) by route template.",
+        ("route", "phase"),
+    )
+)
+db_queries_total = registry.register(
+    Counter(
+        "satvach_db_queries_total",
+        "SQL statements executed by route template.",
+        ("route",),
+    )
+)
+db_slow_queries_total = registry.register(
+    Counter("satvach_db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+)
+
+load_shed_total = registry.register(
+    Counter(
+        "satvach_load_shed_total",
+        "API requests rejected by the concurrency limit, by priority class.",
+        ("priority",),
+    )
+)
+search_cache_requests_total = registry.register(
+    Counter(
+        "satvach_search_cache_requests_total",
+        "Public search/viewport lookups by outcome (hit, stale, coalesced, miss, bypass).",
+        ("endpoint", "outcome"),
+    )
+)
+
+PASSWORD_HASH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+password_hash_wait_seconds = registry.register(
+    Histogram(
+        "satvach_password_hash_wait_seconds",
+        "Time hash requests waited for a hashing thread.",
+        ("operation",),
+        buckets=PASSWORD_HASH_BUCKETS,
+    )
+)
+password_hash_duration_seconds = registry.register(
+    Histogram(
+        "satvach_password_hash_duration_seconds",
+        "Time spent hashing or verifying a password.",
+        ("operation",),
+        buckets=PASSWORD_HASH_BUCKETS,
+    )
+)
+password_hash_rejected_total = registry.register(
+    Counter("satvach_password_hash_rejected_total", "Hash requests rejected with a full queue.")
+)
@@ -0,0 +1,331 @@
+"""
+SatVach ASGI Middleware
+Pure ASGI middleware for response headers, request timings, compression and
+load shedding.
+
+Unlike `@app.middleware("http")` (Starlette's BaseHTTPMiddleware), these wrap
+`send` instead of running the app in a separate task behind a memory stream,
+so they add no per-request task switch and leave streaming responses intact.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.concurrency import ConcurrencyLimiter, Priority, concurrency_limiter
+from src.core.config import settings
+from src.core.metrics import load_shed_total
+from src.core.timing import record_request_metrics, server_timing_header, start_request_timings
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# (SEC-1.3) Encoded once; appended to every HTTP response start message
+SECURITY_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (
+        b"content-security-policy",
+        b"default-src 'self'; img-src 'self' data: blob: *; style-src 'self' 'unsafe-inline'; "
+        b"script-src 'self' 'unsafe-inline' 'unsafe-eval';",
+    ),
+)
+
+
+class SecurityHeadersMiddleware:
+    """Add security headers to all HTTP responses."""
+
+    def __init__(self, app: ASGIApp, headers: tuple[tuple[bytes, bytes], ...] = SECURITY_HEADERS):
+        self.app = app
+        self.headers = list(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *self.headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class RequestTimingMiddleware:
+    """
+    Collect per-phase timings for each request and export them.
+
+    Totals are taken when the response headers are sent; the route template
+    is read from the scope, where the router stores the matched route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.metrics_enabled = settings.METRICS_ENABLED
+        self.server_timing_enabled = settings.SERVER_TIMING_ENABLED
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - timings.start
+                if self.metrics_enabled:
+                    route = scope.get("route")
+                    route_path = route.path if route is not None else "unmatched"
+                    record_request_metrics(
+                        scope["method"], route_path, message["status"], timings, total
+                    )
+                if self.server_timing_enabled:
+                    value = server_timing_header(timings, total).encode("latin-1")
+                    message["headers"] = [*message.get("headers", ()), (b"server-timing", value)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_timings)
+
+
+# =============================================================================
+# Compression
+# =============================================================================
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0 keeps output deterministic, so equal bodies compress identically
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by (encoding, body digest), bounded in bytes.
+
+    Hot payloads (the same viewport or search page served to many clients)
+    are compressed once; hashing a body costs far less than compressing it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+        return compressed
+
+    def set(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli response compression negotiated from Accept-Encoding.
+
+    Only complete bodies of compressible types at or above `minimum_size` are
+    compressed; streamed responses (SSE, file downloads) pass through as is.
+    Bodies of `thread_threshold` bytes or more are compressed on a worker
+    thread (zlib and brotli release the GIL) to keep the event loop free.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        thread_threshold: int = 64 * 1024,
+        cache_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_threshold = thread_threshold
+        self.cache = CompressedBodyCache(cache_bytes) if cache_bytes > 0 else None
+        self.compressors = {"gzip": _gzip}
+        if brotli is not None:
+            self.compressors = {"br": _brotli, **self.compressors}  # Preferred when accepted
+
+    def negotiate(self, accept_encoding: str) -> str | None:
+        """Best supported encoding the client accepts (q > 0), if any."""
+        accepted: dict[str, float] = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip().lower()] = q
+        for encoding in self.compressors:
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                pending_start = message  # Held until the body shows whether to compress
+                return
+            if pending_start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if not content_type.startswith(COMPRESSIBLE_TYPES) or "content-encoding" in headers:
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = await self.compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def compress(self, encoding: str, body: bytes) -> bytes:
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(encoding, body)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        compressor = self.compressors[encoding]
+        if len(body) >= self.thread_threshold:
+            compressed = await asyncio.get_running_loop().run_in_executor(None, compressor, body)
+        else:
+            compressed = compressor(body)
+
+        if key is not None:
+            self.cache.set(key, compressed)
+        return compressed
+
+
+# =============================================================================
+# Load shedding
+# =============================================================================
+_BUSY_BODY = b'{"detail":"Server busy, please retry"}'
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Reject API requests beyond the adaptive concurrency limit with 503.
+
+    Requests under `prefix` are classified as critical (`critical_prefixes`),
+    cacheable (GET/HEAD) or normal; `exempt_paths` (streams, uploads) and
+    everything outside `prefix` pass through unlimited. Each admitted
+    request's duration feeds the limit; 5xx responses and unhandled errors
+    count as drops.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: ConcurrencyLimiter = concurrency_limiter,
+        prefix: str = "/api/v1",
+        critical_prefixes: tuple[str, ...] = ("/admin", "/auth"),
+        exempt_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.prefix = prefix
+        self.critical_prefixes = tuple(prefix + p for p in critical_prefixes)
+        self.exempt_paths = frozenset(prefix + p for p in exempt_paths)
+
+    def classify(self, scope: Scope) -> Priority | None:
+        """Priority class of a request, or None if it is not limited."""
+        path = scope["path"]
+        if not path.startswith(self.prefix) or path.rstrip("/") in self.exempt_paths:
+            return None
+        if path.startswith(self.critical_prefixes):
+            return Priority.critical
+        if scope["method"] in ("GET", "HEAD"):
+            return Priority.cacheable
+        return Priority.normal
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        priority = self.classify(scope) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire(priority):
+            load_shed_total.inc(1, priority.name)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(_BUSY_BODY)).encode()),
+                        (b"retry-after", b"1"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": _BUSY_BODY})
+            return
+
+        start = time.perf_counter()
+        dropped = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal dropped
+            if message["type"] == "http.response.start" and message["status"] >= 500:
+                dropped = True  # Handled errors and timeouts count as overload too
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            dropped = True
+            raise
+        finally:
+            self.limiter.release(time.perf_counter() - start, dropped)
@@ -0,0 +1,50 @@
+"""
+SatVach Polyline Utilities
+Decoder for the Google encoded polyline format used by routing clients.
+"""
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> list[tuple[float, float]]:
+    """
+    Decode an encoded polyline into (latitude, longitude) pairs.
+
+    Args:
+        encoded: Encoded polyline string
+        precision: Coordinate precision (5 for Google, 6 for OSRM/Valhalla `polyline6`)
+
+    Returns:
+        List of (latitude, longitude) tuples
+
+    Raises:
+        ValueError: If the string is truncated or decodes to invalid coordinates
+    """
+    factor = 10**precision
+    coords: list[tuple[float, float]] = []
+    index = lat = lng = 0
+    length = len(encoded)
+
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                if index >= length:
+                    raise ValueError("Truncated polyline")
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if byte < 0 or byte > 63:
+                    raise ValueError("Invalid polyline character")
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+
+        lat += deltas[0]
+        lng += deltas[1]
+        point = (lat / factor, lng / factor)
+        if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+            raise ValueError("Polyline coordinate out of range")
+        coords.append(point)
+
+    return coords
@@ -0,0 +1,66 @@
+"""
+SatVach Authenticated Principals
+Compact, cached view of the authenticated user for authorization checks.
+
+Most authenticated endpoints only need the user's ID and flags, so they depend
+on a `Principal` instead of a `User` row. Principals are cached per worker for
+AUTH_CACHE_SECONDS; writes that change the flags invalidate the local entry,
+other workers pick the change up when their entry expires.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as seen by authorization checks (not an ORM instance)."""
+
+    id: int
+    is_active: bool
+    is_superuser: bool
+
+
+class PrincipalCache:
+    """Per-worker TTL cache of principals keyed by user ID."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, db: AsyncSession, user_id: int) -> Principal | None:
+        """
+        Principal for a user, loading only the columns it needs on a miss.
+
+        Args:
+            db: Database session (used on a cache miss)
+            user_id: User ID from the access token
+
+        Returns:
+            Principal, or None if the user no longer exists
+        """
+        principal = self._cache.get(user_id)
+        if principal is None:
+            stmt = select(User.id, User.is_active, User.is_superuser).where(User.id == user_id)
+            row = (await db.execute(stmt)).one_or_none()
+            if row is None:
+                return None
+            principal = Principal(id=row.id, is_active=row.is_active, is_superuser=row.is_superuser)
+            self._cache.set(user_id, principal)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget a user's principal (call after changing the user)."""
+        self._cache.pop(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+# Singleton instance
+principal_cache = PrincipalCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_SECONDS)
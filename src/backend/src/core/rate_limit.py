@@ -1,5 +1,317 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+SatVach Rate Limiting
+Per-client token buckets shared by every worker on the host.
+
+Each (endpoint, client IP) pair gets a bucket holding up to N tokens that
+refills at N per period; a request spends one token. A check is O(1): one
+hash, one locked read-modify-write of a 24-byte slot.
+
+Storage backends:
+- "shared" (default): a fixed-size table in a memory-mapped file (tmpfs), so
+  all uvicorn workers enforce one limit instead of one each. Slots are grouped
+  into small sets guarded by byte-range locks; a full set evicts its least
+  recently touched bucket, so memory stays fixed however many clients appear.
+  Checks run on the event loop, so a set lock is only tried for a bounded
+  moment (non-blocking, short spin); if another worker holds it longer, the
+  request is let through rather than stalling this worker.
+- "memory": a bounded LRU dict in this process (tests, single worker). Also
+  used where `fcntl` is unavailable (Windows).
+"""
+
+import errno
+import functools
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from src.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no byte-range locks, memory store only
+    fcntl = None
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_PERIOD_NAMES = {seconds: name for name, seconds in _PERIODS.items()}
+# How long a check may spin on a busy set lock before failing open
+_LOCK_WAIT_SECONDS = 0.002
+
+
+class RateLimitExceeded(HTTPException):
+    """429 with a Retry-After hint (body via `rate_limit_exceeded_handler`)."""
+
+    def __init__(self, limit: "RateLimit", retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(limit),
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """Same 429 body as slowapi's handler (`{"error": ...}`), which clients parse."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": f"Rate limit exceeded: {exc.detail}"},
+        headers=exc.headers,
+    )
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Bucket capacity and refill period, e.g. "10/minute"."""
+
+    amount: int
+    period: int  # seconds
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        amount, _, period = value.partition("/")
+        return cls(amount=int(amount), period=_PERIODS[period.strip().rstrip("s")])
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.amount / self.period
+
+    def __str__(self) -> str:
+        # slowapi's wording, e.g. "10 per 1 minute"
+        name = _PERIOD_NAMES.get(self.period)
+        if name is None:
+            return f"{self.amount} per {self.period} seconds"
+        return f"{self.amount} per 1 {name}"
+
+
+def _refill(tokens: float, updated: float, now: float, limit: RateLimit) -> float:
+    return min(float(limit.amount), tokens + max(0.0, now - updated) * limit.rate)
+
+
+def _take(tokens: float, limit: RateLimit) -> tuple[bool, float, float]:
+    """Spend a token if there is one: (allowed, tokens left, retry after)."""
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / limit.rate
+
+
+# =============================================================================
+# Storage
+# =============================================================================
+class MemoryBucketStore:
+    """Token buckets in a bounded LRU dict (one process)."""
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str, limit: RateLimit) -> tuple[bool, float]:
+        """
+        Spend one token from `key`'s bucket.
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        now = self._clock()
+        state = self._buckets.get(key)
+        tokens = float(limit.amount) if state is None else _refill(*state, now, limit)
+        allowed, tokens, retry_after = _take(tokens, limit)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+
+class SharedBucketStore:
+    """
+    Token buckets in a memory-mapped file shared by processes on one host.
+
+    Layout: `slots` records of (key hash u64, tokens f64, updated f64),
+    grouped into sets of `ways`. A key hashes to one set; the set is locked
+    with `lockf` on its byte range while its slots are read and written.
+    A set that stays locked past `_LOCK_WAIT_SECONDS` is skipped (fail open).
+    """
+
+    _SLOT = struct.Struct("<Qdd")
+
+    def __init__(
+        self, path: str, slots: int, ways: int = 8, clock: Callable[[], float] = time.time
+    ):
+        if fcntl is None:
+            raise RuntimeError("SharedBucketStore needs fcntl (POSIX); use the memory store")
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self._set_bytes = ways * self._SLOT.size
+        self._clock = clock
+        size = self.sets * self._set_bytes
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1  # 0 marks an empty slot
+
+    def hit(self, key: str, limit: RateLimit) -> tuple[bool, float]:
+        """
+        Spend one token from `key`'s bucket.
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        key_hash = self._hash(key)
+        base = (key_hash % self.sets) * self._set_bytes
+        slot = self._SLOT
+        if not self._try_lock(base):
+            return True, 0.0  # Another worker is stuck holding the set: don't stall
+        try:
+            now = self._clock()
+            target, tokens = None, float(limit.amount)
+            oldest, oldest_updated = base, math.inf
+            for offset in range(base, base + self._set_bytes, slot.size):
+                stored_hash, stored_tokens, updated = slot.unpack_from(self._map, offset)
+                if stored_hash == key_hash:
+                    target, tokens = offset, _refill(stored_tokens, updated, now, limit)
+                    break
+                if updated < oldest_updated:  # Empty slots have updated == 0
+                    oldest, oldest_updated = offset, updated
+            if target is None:
+                target = oldest  # Evict the least recently touched bucket
+            allowed, tokens, retry_after = _take(tokens, limit)
+            slot.pack_into(self._map, target, key_hash, tokens, now)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._set_bytes, base)
+        return allowed, retry_after
+
+    def _try_lock(self, base: int) -> bool:
+        """Lock a set without blocking the event loop; False if it stays busy."""
+        deadline = time.perf_counter() + _LOCK_WAIT_SECONDS
+        while True:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, self._set_bytes, base)
+                return True
+            except OSError as e:
+                if e.errno not in (errno.EACCES, errno.EAGAIN):
+                    raise
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0)
+
+    def reset(self) -> None:
+        # Blocking is fine here: tests and maintenance only, never per request
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            self._map[:] = bytes(len(self._map))
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+# =============================================================================
+# Limiter
+# =============================================================================
+def get_remote_address(request: Request) -> str:
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class Limiter:
+    """
+    Endpoint decorator enforcing per-client limits.
+
+    Usage (the endpoint must take `request: Request`):
+
+        @router.get("/search")
+        @limiter.limit("100/minute")
+        async def search(request: Request, ...): ...
+    """
+
+    def __init__(
+        self,
+        key_func: Callable[[Request], str] = get_remote_address,
+        enabled: bool = True,
+        storage_factory: Callable[[], MemoryBucketStore | SharedBucketStore] | None = None,
+    ):
+        self.key_func = key_func
+        self.enabled = enabled
+        self._storage_factory = storage_factory or (lambda: MemoryBucketStore(maxsize=10000))
+        self._storage = None
+
+    @property
+    def storage(self) -> MemoryBucketStore | SharedBucketStore:
+        # Opened on first use so each worker maps the table after the fork
+        if self._storage is None:
+            self._storage = self._storage_factory()
+        return self._storage
+
+    def check(self, request: Request, scope: str, limit: RateLimit) -> None:
+        """
+        Spend a token for this client on `scope`.
+
+        Raises:
+            RateLimitExceeded: If the bucket is empty
+        """
+        allowed, retry_after = self.storage.hit(f"{scope}:{self.key_func(request)}", limit)
+        if not allowed:
+            raise RateLimitExceeded(limit, retry_after)
+
+    def limit(self, value: str):
+        """Decorate an async endpoint with a limit like "10/minute"."""
+        limit = RateLimit.parse(value)
+
+        def decorator(func):
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.enabled:
+                    self.check(kwargs["request"], scope, limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        if self._storage is not None:
+            self._storage.reset()
+
+
+def _default_storage() -> MemoryBucketStore | SharedBucketStore:
+    if settings.RATE_LIMIT_STORAGE == "shared" and fcntl is not None:
+        path = settings.RATE_LIMIT_SHARED_PATH or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+            "satvach-rate-limit",
+        )
+        return SharedBucketStore(path, slots=settings.RATE_LIMIT_SLOTS)
+    return MemoryBucketStore(maxsize=settings.RATE_LIMIT_SLOTS)
+
 
 # Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=settings.RATE_LIMIT_ENABLED,
+    storage_factory=_default_storage,
+)
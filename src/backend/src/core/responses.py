@@ -0,0 +1,50 @@
+"""
+SatVach Response Classes
+JSON responses that skip FastAPI's generic encoding pipeline.
+
+By default FastAPI validates an endpoint's return value against its
+`response_model` (again, if it already is that model), converts it to plain
+Python with `jsonable_encoder`, then `json.dumps` it. Endpoints that already
+hold validated schemas can return `ModelResponse` instead: pydantic's Rust
+serializer writes the JSON bytes in one pass and FastAPI passes the response
+through untouched. Keep `response_model` on the route for the OpenAPI schema.
+
+Routes that still go through the encoder render with orjson
+(`ORJSONResponse` is the app's default response class).
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    """
+    JSON response rendered straight from a pydantic model or adapter.
+
+    Args:
+        content: A model instance, or any value `adapter` can serialize
+        adapter: TypeAdapter for non-model content (e.g. `list[Schema]`)
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter | None = None,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, headers=headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        if self.adapter is not None:
+            return self.adapter.dump_json(content)
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        raise TypeError(f"ModelResponse needs a model or an adapter, got {type(content).__name__}")
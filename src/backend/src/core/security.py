@@ -3,14 +3,27 @@ SatVach Security Utilities.
 Handles input sanitization, password hashing, and token generation.
 """
 
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 import bleach
 from jose import jwt
 from passlib.context import CryptContext
 
 from src.core.config import settings
+from src.core.metrics import (
+    Gauge,
+    password_hash_duration_seconds,
+    password_hash_rejected_total,
+    password_hash_wait_seconds,
+    registry,
+)
+
+T = TypeVar("T")
 
 # Allowed HTML tags for description field (if we allow rich text later)
 # For now, we strip mostly everything to be safe.
@@ -18,8 +31,16 @@ ALLOWED_TAGS = []  # No HTML allowed by default
 ALLOWED_ATTRIBUTES = {}
 
 # Password context
-# Using pbkdf2_sha256 to avoid bcrypt build issues in some environments
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Using pbkdf2_sha256 to avoid bcrypt build issues in some environments.
+# Pinning min/max to the configured rounds makes `needs_update` true for hashes
+# made with any other cost, so they are upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 
 def sanitize_input(text: str) -> str:
@@ -53,6 +74,137 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# =============================================================================
+# Password hashing off the event loop
+# =============================================================================
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash requests are already queued."""
+
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a small dedicated thread pool.
+
+    At most `workers` hashes run at once (hashlib's PBKDF2 releases the GIL,
+    so they run in parallel with the event loop); up to `max_waiting` more
+    wait their turn, and anything beyond that fails fast with
+    `PasswordHasherBusy` instead of growing an unbounded backlog.
+    """
+
+    def __init__(self, workers: int, max_waiting: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.running = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _ensure_started(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+            self._slots = asyncio.Semaphore(self.workers)
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run `func(*args)` on the hashing pool.
+
+        Args:
+            operation: Metrics label ("hash" or "verify")
+            func: Blocking callable
+            *args: Arguments for `func`
+
+        Returns:
+            The callable's result
+
+        Raises:
+            PasswordHasherBusy: If the wait queue is full
+        """
+        self._ensure_started()
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            password_hash_rejected_total.inc()
+            raise PasswordHasherBusy()
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        password_hash_wait_seconds.observe(started_at - queued_at, operation)
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self._slots.release()
+            password_hash_duration_seconds.observe(time.perf_counter() - started_at, operation)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_WAITING)
+
+registry.register(
+    Gauge(
+        "satvach_password_hash_queue_depth",
+        "Hash requests waiting for a hashing thread.",
+        (),
+        lambda: [((), password_hasher.waiting)],
+    )
+)
+registry.register(
+    Gauge(
+        "satvach_password_hash_running",
+        "Hash requests currently running.",
+        (),
+        lambda: [((), password_hasher.running)],
+    )
+)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password on the hashing pool.
+
+    Raises:
+        PasswordHasherBusy: If the wait queue is full
+    """
+    return await password_hasher.run("hash", pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password on the hashing pool, rehashing outdated hashes.
+
+    Args:
+        plain_password: Submitted password
+        hashed_password: Stored hash
+
+    Returns:
+        Tuple of (matches, replacement hash or None). A replacement is
+        returned only for a correct password whose hash uses other parameters.
+
+    Raises:
+        PasswordHasherBusy: If the wait queue is full
+    """
+    return await password_hasher.run(
+        "verify", pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(subject: int | str, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT access token.
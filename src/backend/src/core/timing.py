@@ -0,0 +1,179 @@
+"""
+SatVach Request Timing
+Per-request phase timings (SQL, pool wait, endpoint, serialization) collected
+through a context variable, for `Server-Timing` headers and `/metrics`.
+
+Phases:
+    db         time inside cursor.execute (count in `db_queries`)
+    pool       time waiting for a pooled connection
+    app        endpoint function, including its db/pool time and rate limiting
+    serialize  response model validation and rendering (plus dependency teardown)
+    total      whole request, up to the response headers
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import request_response
+
+from src.core.config import settings
+from src.core.metrics import (
+    db_queries_total,
+    db_slow_queries_total,
+    http_request_duration_seconds,
+    http_requests_total,
+    request_phase_seconds_total,
+)
+
+logger = logging.getLogger(__name__)
+
+_QUERY_START_KEY = "query_start"
+
+
+@dataclass
+class RequestTimings:
+    """Accumulated timings for one request (seconds)."""
+
+    start: float = field(default_factory=time.perf_counter)
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    pool_seconds: float = 0.0
+    app_seconds: float = 0.0
+    app_end: float = 0.0  # When the endpoint function returned
+    serialize_seconds: float = 0.0
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """Begin collecting timings for the current request context."""
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> RequestTimings | None:
+    """Timings of the request being served, if any (None in scripts and jobs)."""
+    return _current_timings.get()
+
+
+def server_timing_header(timings: RequestTimings, total: float) -> str:
+    """Format timings as a `Server-Timing` header value (durations in ms)."""
+    return ", ".join(
+        [
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"',
+            f"pool;dur={timings.pool_seconds * 1000:.1f}",
+            f"app;dur={timings.app_seconds * 1000:.1f}",
+            f"serialize;dur={timings.serialize_seconds * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+    )
+
+
+def record_request_metrics(
+    method: str, route: str, status_code: int, timings: RequestTimings, total: float
+) -> None:
+    """Add a finished request to the Prometheus metrics."""
+    http_requests_total.inc(1, method, route, str(status_code))
+    http_request_duration_seconds.observe(total, method, route)
+    request_phase_seconds_total.inc(timings.db_seconds, route, "db")
+    request_phase_seconds_total.inc(timings.pool_seconds, route, "pool")
+    request_phase_seconds_total.inc(timings.app_seconds, route, "app")
+    request_phase_seconds_total.inc(timings.serialize_seconds, route, "serialize")
+    db_queries_total.inc(timings.db_queries, route)
+
+
+# =============================================================================
+# SQL timing (all engines)
+# =============================================================================
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_QUERY_START_KEY].pop()
+
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_seconds += elapsed
+        timings.db_queries += 1
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        db_slow_queries_total.inc()
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement[:1000]}")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_QUERY_START_KEY):
+        conn.info[_QUERY_START_KEY].pop()
+
+
+# =============================================================================
+# Endpoint / serialization timing
+# =============================================================================
+class TimedRoute(APIRoute):
+    """
+    APIRoute that splits handler time into the endpoint call and what follows
+    it (response model validation, serialization, dependency teardown).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dependant.call = self._timed(self.dependant.call)
+        self.app = request_response(self.get_route_handler())
+
+    @staticmethod
+    def _timed(call):
+        if asyncio.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            async def timed_endpoint(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    _record_app(start)
+
+        else:
+
+            @functools.wraps(call)
+            def timed_endpoint(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    _record_app(start)
+
+        return timed_endpoint
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current_timings.get()
+            if timings is not None and timings.app_end:
+                timings.serialize_seconds = time.perf_counter() - timings.app_end
+            return response
+
+        return timed_handler
+
+
+def _record_app(start: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        end = time.perf_counter()
+        timings.app_seconds += end - start
+        timings.app_end = end
@@ -0,0 +1,119 @@
+"""
+SatVach Database Pool Instrumentation
+Queue pool subclass that records checkout wait time, plus pool gauges.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from src.core.metrics import Gauge, registry
+from src.core.timing import current_timings
+
+
+@dataclass
+class PoolMetrics:
+    """Cumulative checkout statistics for one pool."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times how long each checkout waits.
+
+    The time covers queueing for a free connection and, for overflow
+    checkouts, opening a new one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        elapsed = time.perf_counter() - start
+        self.metrics.record_wait(elapsed)
+        timings = current_timings()
+        if timings is not None:
+            timings.pool_seconds += elapsed
+        return entry
+
+
+def pool_status(pool: Pool) -> dict:
+    """
+    Gauges and checkout statistics for a pool.
+
+    Returns:
+        Dict of size, in-use, idle and overflow gauges plus wait statistics
+    """
+    status = {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),  # Negative until the pool is full
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_total=round(metrics.wait_seconds_total, 6),
+            wait_seconds_avg=round(metrics.wait_seconds_avg, 6),
+            wait_seconds_max=round(metrics.wait_seconds_max, 6),
+        )
+    return status
+
+
+def register_pool_gauges(engines: Callable[[], list[tuple[str, AsyncEngine]]]) -> None:
+    """Expose `pool_status` of the named engines on /metrics."""
+
+    def collector(key: str):
+        def collect():
+            for name, engine in engines():
+                value = pool_status(engine.pool).get(key)
+                if value is not None:
+                    yield (name,), value
+
+        return collect
+
+    for key, type_name, documentation in (
+        ("size", "gauge", "Configured pool size."),
+        ("in_use", "gauge", "Connections checked out."),
+        ("idle", "gauge", "Connections idle in the pool."),
+        ("overflow", "gauge", "Overflow connections open beyond the pool size."),
+        ("checkouts", "counter", "Connection checkouts."),
+        ("timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+        ("wait_seconds_total", "counter", "Cumulative time waiting for a connection."),
+    ):
+        registry.register(
+            Gauge(
+                f"satvach_db_pool_{key}",
+                documentation,
+                ("pool",),
+                collector(key),
+                type_name=type_name,
+            )
+        )
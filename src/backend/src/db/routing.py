@@ -0,0 +1,100 @@
+"""
+SatVach Read/Write Routing
+Chooses the primary or a read replica per request, with read-your-writes
+stickiness.
+
+A request whose session writes (ORM flush or INSERT/UPDATE/DELETE statement)
+gets a short-lived cookie and an `X-Primary-Until` header (unix deadline);
+while the cookie is present, or the client echoes the header back before the
+deadline, its reads go to the primary so it sees its own changes despite
+replica lag. The header covers Bearer-token clients (cross-origin SPA, mobile)
+that do not send cookies. The window should exceed typical replication lag
+(`READ_YOUR_WRITES_SECONDS`).
+"""
+
+import itertools
+import math
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.core.config import settings
+from src.db.session import async_session_maker, read_session_makers
+
+PRIMARY_STICKY_COOKIE = "sv_primary"
+PRIMARY_STICKY_HEADER = "X-Primary-Until"
+_STICKY_RESPONSE_KEY = "sticky_response"
+
+_replica_cycle = itertools.cycle(read_session_makers) if read_session_makers else None
+
+
+def replicas_enabled() -> bool:
+    return _replica_cycle is not None
+
+
+def next_read_session_maker() -> async_sessionmaker[AsyncSession]:
+    """The next replica, or the primary without replicas (reads not tied to a client)."""
+    if _replica_cycle is None:
+        return async_session_maker
+    return next(_replica_cycle)
+
+
+def primary_session_maker() -> async_sessionmaker[AsyncSession]:
+    """The primary (reads that must not lag behind writes)."""
+    return async_session_maker
+
+
+def is_sticky(request: Request) -> bool:
+    """Whether the client wrote recently and must read from the primary."""
+    return bool(request.cookies.get(PRIMARY_STICKY_COOKIE)) or _sticky_header(request)
+
+
+def choose_read_session_maker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """Primary for sticky clients (or without replicas), otherwise the next replica."""
+    if is_sticky(request):
+        return async_session_maker
+    return next_read_session_maker()
+
+
+def _sticky_header(request: Request) -> bool:
+    """Whether the echoed deadline is still running (and no further out than we issue)."""
+    try:
+        deadline = float(request.headers.get(PRIMARY_STICKY_HEADER, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < deadline <= now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def track_writes(session: AsyncSession, response: Response) -> None:
+    """Set the stickiness cookie and header on `response` if `session` writes."""
+    session.info[_STICKY_RESPONSE_KEY] = response
+
+
+def _mark_written(session: Session) -> None:
+    response = session.info.pop(_STICKY_RESPONSE_KEY, None)
+    if response is not None:
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+        response.headers[PRIMARY_STICKY_HEADER] = str(
+            math.floor(time.time()) + settings.READ_YOUR_WRITES_SECONDS
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    _mark_written(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session)
@@ -3,24 +3,69 @@ SatVach Database Session
 Async SQLAlchemy session factory for PostgreSQL + PostGIS.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from src.core.config import settings
+from src.db.pool import InstrumentedAsyncQueuePool, register_pool_gauges
+
+
+def _connect_args() -> dict:
+    """asyncpg connection options from settings."""
+    server_settings = dict(settings.DB_SERVER_SETTINGS)
+    if not settings.DB_JIT:
+        # JIT compilation only pays off for long analytic queries
+        server_settings.setdefault("jit", "off")
+    return {
+        # SQLAlchemy's per-connection prepared statement LRU (0 disables, e.g. for PgBouncer)
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+    }
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the configured pool and asyncpg options."""
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        connect_args=_connect_args(),
+    )
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
+engine = build_engine(settings.DATABASE_URL)
+
+
+def build_session_maker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Session factory with the app's session options."""
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
 # Session factory
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+async_session_maker = build_session_maker(engine)
+
+# Read replicas (optional): read-only traffic is spread round-robin over them
+read_engines = [build_engine(url) for url in settings.DATABASE_READ_URLS]
+read_session_makers = [build_session_maker(read_engine) for read_engine in read_engines]
+
+register_pool_gauges(
+    lambda: [("primary", engine)]
+    + [(f"replica{i}", read_engine) for i, read_engine in enumerate(read_engines)]
 )
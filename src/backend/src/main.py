@@ -8,13 +8,20 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
 from src.api.v1.router import router as api_router
 from src.core.config import settings
-from src.core.rate_limit import limiter
+from src.core.metrics import registry
+from src.core.middleware import (
+    CompressionMiddleware,
+    ConcurrencyLimitMiddleware,
+    RequestTimingMiddleware,
+    SecurityHeadersMiddleware,
+)
+from src.core.rate_limit import RateLimitExceeded, rate_limit_exceeded_handler
+from src.core.security import PasswordHasherBusy, password_hasher
+from src.db.routing import PRIMARY_STICKY_HEADER
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -36,8 +43,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize storage: {e}")
 
+    # Realtime location events (LISTEN connection per worker)
+    from src.services.dashboard_service import DASHBOARD_EVENTS_CHANNEL, dashboard_service
+    from src.services.realtime_service import realtime_service
+
+    # Dashboard count deltas reach every worker's cache the same way
+    realtime_service.listen(DASHBOARD_EVENTS_CHANNEL, dashboard_service.apply_notification)
+
+    if settings.REALTIME_ENABLED:
+        await realtime_service.start()
+
+    # Shared search results are dropped when any worker commits a visible change
+    from src.services.search_service import search_service
+
+    realtime_service.add_handler(search_service.apply_event)
+
+    # Optional in-memory replica for spatial searches
+    from src.db.session import async_session_maker
+    from src.services.spatial_index import spatial_replica
+
+    if settings.SPATIAL_INDEX_ENABLED:
+        realtime_service.add_handler(spatial_replica.apply_event)
+        await spatial_replica.start(async_session_maker)
+
     yield
     logger.info("Shutting down SatVach API...")
+    await spatial_replica.stop()
+    await realtime_service.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -45,39 +78,49 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
-# Connect rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Middleware (pure ASGI; the last added runs first)
+# 5. Adaptive concurrency limit (503 + Retry-After under overload), innermost
+if settings.LOAD_SHED_ENABLED:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        prefix=settings.API_V1_STR,
+        exempt_paths=tuple(settings.LOAD_SHED_EXEMPT_PATHS),
+    )
+
+# 4. Request timings (Server-Timing header + /metrics)
+app.add_middleware(RequestTimingMiddleware)
+
+# 3. Security Headers (SEC-1.3)
+app.add_middleware(SecurityHeadersMiddleware)
+
+# 2. Compression of complete JSON/text bodies (after headers are final)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+        cache_bytes=settings.COMPRESSION_CACHE_BYTES,
+    )
 
-# Security Middleware (SEC-1.2, SEC-1.3)
-# 1. CORS
+# 1. CORS (SEC-1.2), outermost so preflight requests are answered before the rest
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read-your-writes deadline, echoed back by clients that do not send cookies
+    expose_headers=[PRIMARY_STICKY_HEADER],
 )
 
 
-# 2. Security Headers (SEC-1.3)
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    """Add security headers to all responses."""
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; img-src 'self' data: blob: *; style-src 'self' 'unsafe-inline'; script-src 'self' 'unsafe-inline' 'unsafe-eval';"
-    )
-    return response
-
-
 # Rate limiting middleware - apply global limit if needed
 # For now, limits are applied per-endpoint via decorators (SEC-1.1)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 # Routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -89,6 +132,26 @@ async def health_check():
     return {"status": "ok", "version": "1.0.0"}
 
 
+@app.get("/health/pool", tags=["health"])
+async def pool_health():
+    """Database connection pool gauges and checkout wait statistics."""
+    from src.db.pool import pool_status
+    from src.db.session import engine, read_engines
+
+    return {
+        "primary": pool_status(engine.pool),
+        "replicas": [pool_status(read_engine.pool) for read_engine in read_engines],
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process."""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("", status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global error handler."""
@@ -99,6 +162,16 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed login/signup load when the hashing queue is full."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Log validation errors for debugging."""
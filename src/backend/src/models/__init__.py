@@ -4,8 +4,10 @@ Exports all SQLAlchemy models.
 """
 
 from src.models.contact_message import ContactMessage, ContactSubject
+from src.models.district import District
 from src.models.image import Image
 from src.models.location import Location, LocationCategory, LocationStatus
+from src.models.location_change import LocationChange, LocationChangeOp
 from src.models.moderation_log import ModerationAction, ModerationLog
 from src.models.post import Post, PostComment, PostImage, PostLike
 from src.models.user import User
@@ -13,9 +15,12 @@ from src.models.user import User
 __all__ = [
     "ContactMessage",
     "ContactSubject",
+    "District",
     "Location",
     "LocationCategory",
     "LocationStatus",
+    "LocationChange",
+    "LocationChangeOp",
     "Image",
     "ModerationLog",
     "ModerationAction",
@@ -0,0 +1,46 @@
+"""
+SatVach District Model
+Administrative boundaries (e.g. Hanoi districts) loaded from GeoJSON.
+"""
+
+from datetime import datetime
+
+from geoalchemy2 import Geometry
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class District(Base):
+    """
+    Administrative district boundary.
+
+    Stored as planar geometry (SRID 4326) so `ST_Covers` point-in-polygon
+    tests use the GIST index; locations cache their district in
+    `locations.district_id` at write time.
+    """
+
+    __tablename__ = "districts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    slug: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    city: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+
+    # Deferred: polygons can be large and are only needed inside SQL predicates
+    geom: Mapped[Geometry] = mapped_column(
+        Geometry(geometry_type="MULTIPOLYGON", srid=4326, spatial_index=True),
+        nullable=False,
+        deferred=True,
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"<District(id={self.id}, slug='{self.slug}')>"
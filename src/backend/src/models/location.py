@@ -9,17 +9,23 @@ from typing import TYPE_CHECKING
 
 from geoalchemy2 import Geography, Geometry
 from sqlalchemy import (
+    BigInteger,
+    Computed,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
+    Sequence,
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy import (
     Enum as SQLEnum,
 )
-from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.base import Base
 
@@ -29,6 +35,13 @@ if TYPE_CHECKING:
     from src.models.user import User
 
 
+# Web-mercator latitude limit; points beyond it are clamped in the projected column
+MERCATOR_MAX_LAT = 85.05112878
+
+# Monotonic change sequence shared by all location writes (offline sync versioning)
+location_change_seq = Sequence("location_change_seq", metadata=Base.metadata)
+
+
 class LocationStatus(str, Enum):
     """Status of a location listing."""
 
@@ -58,6 +71,21 @@ class Location(Base):
     """
 
     __tablename__ = "locations"
+    __table_args__ = (
+        # Moderation queue: oldest pending first
+        Index(
+            "ix_locations_pending_queue",
+            "created_at",
+            postgresql_where="status = 'pending'",
+        ),
+    )
+    __mapper_args__ = {
+        # Generated columns come back in INSERT/UPDATE ... RETURNING instead of
+        # being expired (and lazily reloaded) after each flush
+        "eager_defaults": True,
+        # Query-only column (see geom_3857 below); use `Location.__table__.c.geom_3857`
+        "exclude_properties": ["geom_3857"],
+    }
 
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -81,10 +109,34 @@ class Location(Base):
         index=True,
     )
 
-    # PostGIS Geography column (POINT, SRID 4326 = WGS84)
+    # PostGIS Geography column (POINT, SRID 4326 = WGS84). Written, filtered on,
+    # never read back (coordinates come from latitude/longitude), so deferred
     geom: Mapped[Geography] = mapped_column(
         Geography(geometry_type="POINT", srid=4326, spatial_index=True),
         nullable=False,
+        deferred=True,
+    )
+
+    # Coordinates generated from geom on write, so reads need no per-row
+    # geography -> geometry casts
+    latitude: Mapped[float] = mapped_column(
+        Float, Computed("ST_Y(geom::geometry)", persisted=True), nullable=False
+    )
+    longitude: Mapped[float] = mapped_column(
+        Float, Computed("ST_X(geom::geometry)", persisted=True), nullable=False
+    )
+
+    # Planar copy in web mercator (EPSG:3857) for bounding-box filters on the
+    # map's own projection: `&&` against a GiST index, no geodesic math
+    geom_3857: Mapped[Geometry] = mapped_column(
+        Geometry(geometry_type="POINT", srid=3857, spatial_index=True),
+        Computed(
+            "ST_Transform(ST_SetSRID(ST_MakePoint(ST_X(geom::geometry), "
+            f"LEAST(GREATEST(ST_Y(geom::geometry), -{MERCATOR_MAX_LAT}), {MERCATOR_MAX_LAT})"
+            "), 4326), 3857)",
+            persisted=True,
+        ),
+        nullable=False,
     )
 
     # Contact info (optional)
@@ -105,11 +157,37 @@ class Location(Base):
         onupdate=func.now(),
     )
 
+    # Change sequence: bumped on every write so clients can sync incrementally.
+    # Stamped by the change feed at the end of the writing transaction; an
+    # insert starts at 0 instead of burning a sequence value.
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("0"),
+        index=True,
+    )
+
+    # Administrative district, resolved with ST_Covers on write
+    district_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("districts.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
+    # Moderation queue lease: the moderator working on it, until it expires
+    claimed_by: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    claim_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # Relationships
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id"), nullable=False, index=True
     )
-    user: Mapped["User"] = relationship("User", back_populates="locations", lazy="selectin")
+    # Owner: no response renders it; load with selectinload(Location.user) where needed
+    user: Mapped["User"] = relationship(
+        "User", back_populates="locations", foreign_keys=[user_id], lazy="raise_on_sql"
+    )
 
     images: Mapped[list["Image"]] = relationship(
         "Image",
@@ -117,16 +195,14 @@ class Location(Base):
         cascade="all, delete-orphan",
         lazy="selectin",
     )
+    # Audit trail: never eager-loaded; rows go with the location via ON DELETE CASCADE
     moderation_logs: Mapped[list["ModerationLog"]] = relationship(
         "ModerationLog",
         back_populates="location",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
 
-    # Computed fields for Pydantic serialization
-    latitude: Mapped[float] = column_property(func.ST_Y(func.cast(geom, Geometry)))
-    longitude: Mapped[float] = column_property(func.ST_X(func.cast(geom, Geometry)))
-
     def __repr__(self) -> str:
         return f"<Location(id={self.id}, title='{self.title}', status={self.status.value})>"
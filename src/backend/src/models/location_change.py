@@ -0,0 +1,54 @@
+"""
+SatVach LocationChange Model
+Append-only change log of location writes, used for incremental (delta) sync.
+"""
+
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, func
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class LocationChangeOp(str, Enum):
+    """Kinds of change recorded in the log."""
+
+    upsert = "upsert"
+    delete = "delete"
+
+
+class LocationChange(Base):
+    """
+    One row per location write.
+
+    `seq` comes from `location_change_seq` and matches the `change_seq` stamped
+    on the location row. There is deliberately no FK to locations so that
+    tombstones survive the delete. `latitude`/`longitude` are the position
+    after the change (NULL for rows logged before they were recorded), so
+    region deltas can tell which locations a region ever contained.
+    """
+
+    __tablename__ = "location_changes"
+
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    location_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    op: Mapped[LocationChangeOp] = mapped_column(
+        SQLEnum(LocationChangeOp, name="location_change_op"),
+        nullable=False,
+    )
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<LocationChange(seq={self.seq}, location_id={self.location_id}, "
+            f"op={self.op.value})>"
+        )
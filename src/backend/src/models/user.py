@@ -63,8 +63,12 @@ class User(Base):
     )
 
     # Relationships
+    # Not eager-loaded: every user load (auth, post authors) would pull all their locations
     locations: Mapped[list["Location"]] = relationship(
-        "Location", back_populates="user", lazy="selectin"
+        "Location",
+        back_populates="user",
+        foreign_keys="Location.user_id",
+        lazy="raise_on_sql",
     )
 
     def __repr__(self) -> str:
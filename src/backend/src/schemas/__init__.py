@@ -3,6 +3,7 @@ SatVach Schemas Package
 Exports all Pydantic schemas.
 """
 
+from src.schemas.district import DistrictResponse
 from src.schemas.image import (
     BulkImageUploadResponse,
     ImageDeleteResponse,
@@ -10,17 +11,31 @@ from src.schemas.image import (
     ImageUploadResponse,
 )
 from src.schemas.location import (
+    BatchSearchHit,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    BundlePointResponse,
+    CorridorHit,
+    CorridorSearchResponse,
     ImageResponse,
+    LocationChangesResponse,
     LocationCreate,
     LocationInDB,
     LocationListResponse,
     LocationResponse,
     LocationSearchParams,
     LocationUpdate,
+    OfflineBundleDelta,
+    OfflineBundleInfo,
+    PointDistance,
 )
 from src.schemas.moderation import (
+    BulkModerationRequest,
+    BulkModerationResponse,
+    ModerationClaimResponse,
     ModerationLogListResponse,
     ModerationLogResponse,
+    ModerationReleaseRequest,
     ModerationStatusUpdate,
 )
 
@@ -32,7 +47,19 @@ __all__ = [
     "LocationResponse",
     "LocationSearchParams",
     "LocationListResponse",
+    "LocationChangesResponse",
+    "BatchSearchRequest",
+    "BatchSearchHit",
+    "BatchSearchResponse",
+    "PointDistance",
+    "CorridorHit",
+    "CorridorSearchResponse",
     "ImageResponse",
+    "BundlePointResponse",
+    "OfflineBundleInfo",
+    "OfflineBundleDelta",
+    # District schemas
+    "DistrictResponse",
     # Image schemas
     "ImageUploadResponse",
     "ImageUploadError",
@@ -42,4 +69,8 @@ __all__ = [
     "ModerationStatusUpdate",
     "ModerationLogResponse",
     "ModerationLogListResponse",
+    "ModerationClaimResponse",
+    "ModerationReleaseRequest",
+    "BulkModerationRequest",
+    "BulkModerationResponse",
 ]
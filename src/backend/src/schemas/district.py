@@ -0,0 +1,21 @@
+"""
+SatVach District Schemas
+Pydantic schemas for district (administrative boundary) endpoints.
+"""
+
+from pydantic import BaseModel, ConfigDict
+
+from src.models.location import LocationCategory
+
+
+class DistrictResponse(BaseModel):
+    """District with approved-location counts per category."""
+
+    id: int
+    slug: str
+    name: str
+    city: str | None = None
+    total: int = 0
+    category_counts: dict[LocationCategory, int] = {}
+
+    model_config = ConfigDict(from_attributes=True)
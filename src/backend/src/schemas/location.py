@@ -6,7 +6,7 @@ Pydantic schemas for Location API endpoints.
 from datetime import datetime
 from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from src.models.location import LocationCategory, LocationStatus
 
@@ -96,6 +96,7 @@ class LocationInDB(LocationBase):
     status: LocationStatus
     latitude: float
     longitude: float
+    district_id: int | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -125,9 +126,12 @@ class LocationResponse(LocationInDB):
 class LocationSearchParams(BaseModel):
     """Query parameters for location search."""
 
-    # Center point for radius search
-    latitude: float = Field(..., ge=-90, le=90, description="Center latitude")
-    longitude: float = Field(..., ge=-180, le=180, description="Center longitude")
+    # Center point for radius search (optional when searching a district)
+    latitude: float | None = Field(None, ge=-90, le=90, description="Center latitude")
+    longitude: float | None = Field(None, ge=-180, le=180, description="Center longitude")
+
+    # District mode: restrict to one administrative district
+    district_id: int | None = None
 
     # Search radius in meters (500m to 50km)
     radius: int = Field(
@@ -148,13 +152,29 @@ class LocationSearchParams(BaseModel):
 
     @field_validator("latitude")
     @classmethod
-    def validate_lat(cls, v: float) -> float:
-        return validate_latitude(v)
+    def validate_lat(cls, v: float | None) -> float | None:
+        if v is not None:
+            return validate_latitude(v)
+        return v
 
     @field_validator("longitude")
     @classmethod
-    def validate_lng(cls, v: float) -> float:
-        return validate_longitude(v)
+    def validate_lng(cls, v: float | None) -> float | None:
+        if v is not None:
+            return validate_longitude(v)
+        return v
+
+    @model_validator(mode="after")
+    def validate_area(self) -> "LocationSearchParams":
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        if self.latitude is None and self.district_id is None:
+            raise ValueError("Either a center point or a district is required")
+        return self
+
+    @property
+    def has_center(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
 
 
 class LocationListResponse(BaseModel):
@@ -164,3 +184,97 @@ class LocationListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class SearchPoint(BaseModel):
+    """A centre point for batch search."""
+
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+class BatchSearchRequest(BaseModel):
+    """Search around many centre points at once (saved spots, route stops)."""
+
+    points: list[SearchPoint] = Field(..., min_length=1, max_length=50)
+    radius: int = Field(default=1000, ge=100, le=50000, description="Radius per point (m)")
+    category: LocationCategory | None = None
+    limit_per_point: int = Field(default=10, ge=1, le=50)
+
+
+class PointDistance(BaseModel):
+    """Distance from a location to one of the request's centre points."""
+
+    point_index: int
+    distance_meters: float
+
+
+class BatchSearchHit(BaseModel):
+    """A deduplicated batch search result with per-centre distances."""
+
+    location: LocationResponse
+    distance_meters: float  # To the nearest centre
+    distances: list[PointDistance]
+
+
+class BatchSearchResponse(BaseModel):
+    """Batch search results, nearest first."""
+
+    items: list[BatchSearchHit]
+    total: int
+
+
+class CorridorHit(BaseModel):
+    """A location found along a route corridor."""
+
+    location: LocationResponse
+    route_fraction: float  # Position along the route, 0 (start) to 1 (end)
+    distance_meters: float  # Distance from the route
+
+
+class CorridorSearchResponse(BaseModel):
+    """Page of corridor search results in route order."""
+
+    items: list[CorridorHit]
+    next_cursor: str | None = None  # Pass as `cursor` for the next page
+
+
+class LocationChangesResponse(BaseModel):
+    """Page of the location change feed (upserts and tombstones)."""
+
+    since: int
+    next_since: int  # Pass as `since` on the next call
+    has_more: bool
+    upserts: list[LocationResponse]
+    deleted: list[int]  # Tombstones: deleted or no longer approved
+
+
+class BundlePointResponse(BaseModel):
+    """Compact location record used by offline bundles and deltas."""
+
+    id: int
+    latitude: float
+    longitude: float
+    category: LocationCategory
+    title: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OfflineBundleInfo(BaseModel):
+    """Offline bundle region descriptor."""
+
+    region: str
+    bounds: tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+    url: str
+
+
+class OfflineBundleDelta(BaseModel):
+    """Changes in a bundle region since a client's version."""
+
+    region: str
+    since: int
+    version: int
+    upserts: list[BundlePointResponse]
+    removed: list[int]
+    has_more: bool
@@ -5,10 +5,11 @@ Pydantic schemas for moderation API endpoints.
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from src.models.location import LocationStatus
 from src.models.moderation_log import ModerationAction
+from src.schemas.location import LocationResponse
 
 
 class ModerationStatusUpdate(BaseModel):
@@ -38,3 +39,38 @@ class ModerationLogListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class ModerationClaimResponse(BaseModel):
+    """Locations leased to the calling moderator from the pending queue."""
+
+    items: list[LocationResponse]
+    lease_expires_at: datetime | None  # None when the queue had nothing available
+
+
+class ModerationReleaseRequest(BaseModel):
+    """Claims to hand back to the queue (all of the caller's claims if omitted)."""
+
+    location_ids: list[int] | None = Field(None, max_length=500)
+
+
+class BulkModerationRequest(BaseModel):
+    """Approve or reject many locations at once."""
+
+    location_ids: list[int] = Field(..., min_length=1, max_length=500)
+    status: LocationStatus
+    reason: str | None = Field(None, max_length=1000)
+
+    @field_validator("status")
+    @classmethod
+    def validate_status(cls, v: LocationStatus) -> LocationStatus:
+        if v == LocationStatus.pending:
+            raise ValueError("Bulk moderation can only approve or reject")
+        return v
+
+
+class BulkModerationResponse(BaseModel):
+    """Result of a bulk moderation request."""
+
+    updated: list[int]
+    skipped: list[int]  # Missing, already in that status, or claimed by another moderator
@@ -1,12 +1,24 @@
 """SatVach Services Package."""
 
+from src.services.change_feed_service import ChangeFeedService, change_feed_service
+from src.services.dashboard_service import DashboardService, dashboard_service
+from src.services.district_service import DistrictService, district_service
 from src.services.location_service import LocationService, location_service
+from src.services.moderation_service import ModerationService, moderation_service
 from src.services.search_service import SearchService, search_service
 from src.services.storage_service import StorageService, storage_service
 
 __all__ = [
+    "ChangeFeedService",
+    "change_feed_service",
+    "DashboardService",
+    "dashboard_service",
+    "DistrictService",
+    "district_service",
     "LocationService",
     "location_service",
+    "ModerationService",
+    "moderation_service",
     "SearchService",
     "search_service",
     "StorageService",
@@ -0,0 +1,221 @@
+"""
+SatVach Change Feed Service
+Monotonic change log of location writes for incremental sync
+(frontend cache, CDN and offline bundles).
+
+Readers page with `seq > since`, which is only safe if sequence values become
+visible in order. A plain `nextval` does not guarantee that: a transaction can
+take seq 10, another take 11 and commit first, and a client that reads
+next_since=11 would never see 10. Writers therefore draw their seq under a
+transaction-level advisory lock, so seqs are handed out in commit order.
+
+The lock is held from the seq to the commit, so it is taken as late as
+possible: the lock, the seq(s) and the log row(s) are one statement, issued
+as the write's last statement before its NOTIFYs and commit, after every row
+lock of the transaction (so single and bulk writers cannot deadlock).
+"""
+
+import logging
+
+from sqlalchemy import Float, Integer, any_, bindparam, func, insert, literal, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.models.location import Location, LocationStatus, location_change_seq
+from src.models.location_change import LocationChange, LocationChangeOp
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serializing change-feed writers ("SVCF")
+CHANGE_FEED_LOCK_KEY = 0x53564346
+
+
+def _writer_lock():
+    """
+    One-row FROM item that takes the writer lock.
+
+    A FROM subquery calling a volatile function is evaluated before the rows it
+    is joined with, so `nextval` in the same statement runs under the lock.
+    """
+    call = select(func.pg_advisory_xact_lock(CHANGE_FEED_LOCK_KEY).label("lock")).subquery()
+    return select(true().label("locked")).select_from(call).subquery("writer_lock")
+
+
+class ChangeFeedService:
+    """Service for recording and reading the location change log."""
+
+    async def record(
+        self,
+        db: AsyncSession,
+        location: Location | int,
+        op: LocationChangeOp = LocationChangeOp.upsert,
+        position: tuple[float, float] | None = None,
+    ) -> int:
+        """
+        Record a change for a location in the caller's transaction.
+
+        Stamps `location.change_seq` (for upserts) with the same sequence value
+        as the log row, so row version and log position always agree. Call it
+        after the write's own statements (pending changes are flushed first):
+        the writer lock it takes is held until commit.
+
+        Args:
+            db: Database session (not committed here)
+            location: Location object (or just its ID)
+            op: Kind of change
+            position: (latitude, longitude) after the change; defaults to the
+                loaded location's (pass it when the write moves or creates it)
+
+        Returns:
+            Sequence number of the change
+        """
+        if isinstance(location, Location):
+            location_id = location.id
+            if position is None:
+                position = (location.latitude, location.longitude)
+        else:
+            location_id = location
+        latitude, longitude = position or (None, None)
+
+        lock = _writer_lock()
+        values = select(
+            location_change_seq.next_value(),
+            literal(location_id, Integer),
+            literal(op, LocationChange.op.type),
+            literal(latitude, Float),
+            literal(longitude, Float),
+        ).where(lock.c.locked)
+        stmt = (
+            insert(LocationChange)
+            .from_select(["seq", "location_id", "op", "latitude", "longitude"], values)
+            .returning(LocationChange.seq)
+        )
+        seq = await db.scalar(stmt)
+
+        if isinstance(location, Location) and op == LocationChangeOp.upsert:
+            location.change_seq = seq  # Row already locked; flushed with the commit
+        return seq
+
+    async def record_many(self, db: AsyncSession, location_ids: list[int]) -> dict[int, int]:
+        """
+        Stamp new sequence values on many locations and log them (upserts) in
+        one statement (set-based writes; call after their own statements).
+
+        Args:
+            db: Database session (not committed here)
+            location_ids: Locations the write changed
+
+        Returns:
+            Dict of location_id -> sequence number
+        """
+        if not location_ids:
+            return {}
+        lock = _writer_lock()
+        stamped = (
+            update(Location.__table__)
+            .where(
+                Location.id == any_(bindparam("stamp_ids", location_ids, type_=ARRAY(Integer))),
+                lock.c.locked,
+            )
+            .values(change_seq=location_change_seq.next_value())
+            .returning(Location.id, Location.change_seq, Location.latitude, Location.longitude)
+            .cte("stamped")
+        )
+        values = select(
+            stamped.c.change_seq,
+            stamped.c.id,
+            literal(LocationChangeOp.upsert, LocationChange.op.type),
+            stamped.c.latitude,
+            stamped.c.longitude,
+        )
+        stmt = (
+            insert(LocationChange)
+            .from_select(["seq", "location_id", "op", "latitude", "longitude"], values)
+            .returning(LocationChange.location_id, LocationChange.seq)
+        )
+        return {row.location_id: row.seq for row in (await db.execute(stmt)).all()}
+
+    async def current_version(self, db: AsyncSession) -> int:
+        """Highest recorded change sequence (0 if the log is empty)."""
+        return await db.scalar(select(func.max(LocationChange.seq))) or 0
+
+    async def read(
+        self,
+        db: AsyncSession,
+        since: int,
+        limit: int = 1000,
+    ) -> tuple[dict[int, LocationChangeOp], int, bool]:
+        """
+        Read a page of the log after `since`, collapsed to the latest op per location.
+
+        Args:
+            db: Database session
+            since: Last sequence the client has applied
+            limit: Max log rows to scan
+
+        Returns:
+            Tuple of (location_id -> latest op, next_since, has_more)
+        """
+        stmt = (
+            select(LocationChange.seq, LocationChange.location_id, LocationChange.op)
+            .where(LocationChange.seq > since)
+            .order_by(LocationChange.seq)
+            .limit(limit + 1)
+        )
+        rows = (await db.execute(stmt)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        latest: dict[int, LocationChangeOp] = {}
+        for row in rows:
+            latest[row.location_id] = row.op
+
+        next_since = rows[-1].seq if rows else since
+        return latest, next_since, has_more
+
+    async def get_changes(
+        self,
+        db: AsyncSession,
+        since: int,
+        limit: int = 1000,
+    ) -> tuple[list[Location], list[int], int, bool]:
+        """
+        Resolve a page of the log into upserts and tombstones.
+
+        Upserts are the current state of approved locations; anything deleted or
+        no longer approved becomes a tombstone (the client drops it if present).
+
+        Args:
+            db: Database session
+            since: Last sequence the client has applied
+            limit: Max log rows to scan
+
+        Returns:
+            Tuple of (upserted locations, tombstone ids, next_since, has_more)
+        """
+        latest, next_since, has_more = await self.read(db, since, limit)
+
+        upsert_ids = [loc_id for loc_id, op in latest.items() if op == LocationChangeOp.upsert]
+        upserts: list[Location] = []
+        if upsert_ids:
+            stmt = (
+                select(Location)
+                .options(selectinload(Location.images))
+                .where(Location.id.in_(upsert_ids), Location.status == LocationStatus.approved)
+                .order_by(Location.change_seq)
+            )
+            upserts = list((await db.execute(stmt)).scalars().all())
+
+        visible = {location.id for location in upserts}
+        deleted = [loc_id for loc_id in latest if loc_id not in visible]
+
+        logger.info(
+            f"Change feed: since={since} next={next_since} "
+            f"upserts={len(upserts)} tombstones={len(deleted)}"
+        )
+        return upserts, deleted, next_since, has_more
+
+
+# Singleton instance
+change_feed_service = ChangeFeedService()
@@ -0,0 +1,163 @@
+"""
+SatVach Dashboard Service
+Admin dashboard aggregates: one grouped count query, cached per worker.
+
+Writes queue a change notice with Postgres NOTIFY in the writing transaction;
+every worker (the writer included) drops the affected cache entries from its
+realtime LISTEN connection, so no worker keeps counts that predate a commit.
+Counts are recomputed rather than adjusted in place: a worker may have cached
+counts that already include the write before the notice arrives. Reads come
+from a replica, so for READ_YOUR_WRITES_SECONDS after a notice results are not
+cached (they may still lag the write). Without the listener, a write just
+drops the local cache.
+"""
+
+import json
+import logging
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.models.location import Location, LocationStatus
+from src.models.user import User
+from src.schemas.location import LocationResponse
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_EVENTS_CHANNEL = "dashboard_events"
+_COUNTS_KEY = "counts"
+_RECENT_KEY = "recent"
+_STATUS_FIELDS = {
+    LocationStatus.pending: "pending_locations",
+    LocationStatus.approved: "approved_locations",
+    LocationStatus.rejected: "rejected_locations",
+}
+
+
+def _counts_statement():
+    """All dashboard counts in one round trip (one scan of locations)."""
+    status_counts = [
+        func.count().filter(Location.status == status).label(name)
+        for status, name in _STATUS_FIELDS.items()
+    ]
+    return select(
+        func.count().label("total_locations"),
+        *status_counts,
+        select(func.count(User.id)).scalar_subquery().label("total_users"),
+    ).select_from(Location)
+
+
+class DashboardService:
+    """Cached admin dashboard statistics."""
+
+    def __init__(self):
+        self._cache = TTLCache(maxsize=4, ttl=settings.DASHBOARD_CACHE_SECONDS)
+        # Reads are not cached until then (replicas may not have the last write)
+        self._settle_until = 0.0
+
+    # =========================================================================
+    # Reads
+    # =========================================================================
+    async def get_counts(self, db: AsyncSession) -> dict[str, int]:
+        """
+        Location counts by status and the user count.
+
+        Returns:
+            Dict keyed like `DashboardStats` fields
+        """
+        counts = self._cache.get(_COUNTS_KEY)
+        if counts is None:
+            row = (await db.execute(_counts_statement())).one()
+            counts = dict(row._mapping)
+            if self._settled():
+                self._cache.set(_COUNTS_KEY, counts)
+        return dict(counts)
+
+    async def recent_locations(self, db: AsyncSession, limit: int = 5) -> list[LocationResponse]:
+        """Latest submissions with their images (owner not loaded)."""
+        cached_limit, recent = self._cache.get(_RECENT_KEY, (0, None))
+        if recent is None or cached_limit < limit:
+            stmt = (
+                select(Location)
+                .options(selectinload(Location.images))
+                .order_by(Location.created_at.desc())
+                .limit(limit)
+            )
+            recent = [
+                LocationResponse.model_validate(location)
+                for location in (await db.execute(stmt)).scalars()
+            ]
+            if self._settled():
+                self._cache.set(_RECENT_KEY, (limit, recent))
+        return recent[:limit]
+
+    def _settled(self) -> bool:
+        return time.monotonic() >= self._settle_until
+
+    # =========================================================================
+    # Change notices (queued in the writing transaction)
+    # =========================================================================
+    async def _notify(self, db: AsyncSession, counts: bool = True, recent: bool = True) -> None:
+        """
+        Queue a change notice for every worker; delivered only if `db` commits.
+
+        Args:
+            db: Session of the writing transaction
+            counts: Whether the counts are affected
+            recent: Whether the recent submissions list is affected
+        """
+        if not settings.REALTIME_ENABLED:
+            self.invalidate()
+            return
+        payload = json.dumps({"counts": counts, "recent": recent})
+        await db.execute(select(func.pg_notify(DASHBOARD_EVENTS_CHANNEL, payload)))
+
+    def apply_notification(self, payload: str) -> None:
+        """Drop what a committed change affects (realtime listener callback)."""
+        try:
+            change = json.loads(payload)
+            counts, recent = change["counts"], change["recent"]
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Malformed dashboard event, dropping all: {e}")
+            counts = recent = True
+        if counts:
+            self._cache.pop(_COUNTS_KEY)
+        if recent:
+            self._cache.pop(_RECENT_KEY)
+        self._settle_until = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+    async def location_created(self, db: AsyncSession) -> None:
+        await self._notify(db)
+
+    async def location_edited(self, db: AsyncSession) -> None:
+        await self._notify(db, counts=False)
+
+    async def location_status_changed(
+        self, db: AsyncSession, old: LocationStatus, new: LocationStatus
+    ) -> None:
+        await self.location_statuses_changed(db, [(old, new)])
+
+    async def location_statuses_changed(
+        self, db: AsyncSession, changes: Iterable[tuple[LocationStatus, LocationStatus]]
+    ) -> None:
+        """Queue one notice for several status transitions (bulk moderation)."""
+        await self._notify(db, counts=any(old != new for old, new in changes))
+
+    async def location_deleted(self, db: AsyncSession) -> None:
+        await self._notify(db)
+
+    async def user_created(self, db: AsyncSession) -> None:
+        await self._notify(db, recent=False)
+
+    def invalidate(self) -> None:
+        """Drop cached aggregates (bulk writes, tests)."""
+        self._cache.clear()
+
+
+# Singleton instance
+dashboard_service = DashboardService()
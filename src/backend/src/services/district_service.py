@@ -0,0 +1,210 @@
+"""
+SatVach District Service
+Administrative boundary lookups, district assignment and per-district stats.
+
+Each location caches the district covering it in `locations.district_id`
+(resolved with `ST_Covers` when it is written), so district filtering is an
+integer equality on an indexed column rather than a polygon test per query.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from typing import Any
+
+from geoalchemy2.functions import ST_MakePoint
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.models.district import District
+from src.models.location import Location, LocationCategory, LocationStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DistrictNotFoundError(Exception):
+    """Raised when a district slug is unknown."""
+
+    pass
+
+
+def district_slug(name: str) -> str:
+    """
+    URL slug for a district name, with Vietnamese diacritics removed.
+
+    Example: "Hoàn Kiếm" -> "hoan-kiem", "Đống Đa" -> "dong-da"
+    """
+    name = name.replace("đ", "d").replace("Đ", "D")
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-")
+
+
+class DistrictService:
+    """Service for district boundaries and district-scoped queries."""
+
+    def __init__(self):
+        # Boundaries change only when a GeoJSON file is (re)loaded, usually by
+        # scripts/load_districts.py in another process, so entries expire
+        self._slug_ids = TTLCache(maxsize=1024, ttl=settings.DISTRICT_CACHE_SECONDS)
+
+    # =========================================================================
+    # Point -> district resolution
+    # =========================================================================
+    def _covering_district(self, point):
+        """Scalar subquery: id of the district covering a geometry point (or NULL)."""
+        return (
+            select(District.id)
+            .where(func.ST_Covers(District.geom, point))
+            .order_by(District.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    def district_id_expr(self, latitude: float, longitude: float):
+        """
+        SQL expression resolving the district of a coordinate.
+
+        Assign it to `Location.district_id` so the lookup runs inside the
+        INSERT/UPDATE instead of costing a separate round trip.
+        """
+        return self._covering_district(
+            func.ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+        )
+
+    async def get_id_by_slug(self, db: AsyncSession, slug: str) -> int:
+        """
+        Resolve a district slug to its id (cached).
+
+        Raises:
+            DistrictNotFoundError: If no district has this slug
+        """
+        district_id = self._slug_ids.get(slug)
+        if district_id is None:
+            district_id = await db.scalar(select(District.id).where(District.slug == slug))
+            if district_id is None:
+                raise DistrictNotFoundError(f"District '{slug}' not found")
+            self._slug_ids.set(slug, district_id)
+        return district_id
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+    async def list_with_counts(
+        self,
+        db: AsyncSession,
+        city: str | None = None,
+    ) -> list[tuple[Any, dict[LocationCategory, int]]]:
+        """
+        Districts with approved-location counts per category.
+
+        Counts come from one GROUP BY over the indexed `district_id` column.
+
+        Args:
+            db: Database session
+            city: Optional city filter
+
+        Returns:
+            List of (district row with id/slug/name/city, {category: count})
+        """
+        stmt = select(District.id, District.slug, District.name, District.city).order_by(
+            District.name
+        )
+        if city:
+            stmt = stmt.where(District.city == city)
+        districts = (await db.execute(stmt)).all()
+
+        counts_stmt = (
+            select(Location.district_id, Location.category, func.count())
+            .where(
+                Location.status == LocationStatus.approved,
+                Location.district_id.in_([d.id for d in districts]),
+            )
+            .group_by(Location.district_id, Location.category)
+        )
+        counts: dict[int, dict[LocationCategory, int]] = {}
+        for district_id, category, count in await db.execute(counts_stmt):
+            counts.setdefault(district_id, {})[category] = count
+
+        return [(district, counts.get(district.id, {})) for district in districts]
+
+    # =========================================================================
+    # Boundary loading
+    # =========================================================================
+    async def load_geojson(
+        self,
+        db: AsyncSession,
+        feature_collection: dict,
+        city: str | None = None,
+        name_property: str = "name",
+    ) -> int:
+        """
+        Upsert district boundaries from a GeoJSON FeatureCollection.
+
+        Polygons are repaired with ST_MakeValid and stored as MULTIPOLYGON.
+        Does not commit; call `assign_locations` afterwards.
+
+        Args:
+            db: Database session
+            feature_collection: Parsed GeoJSON
+            city: City stored on every district
+            name_property: Feature property holding the district name
+
+        Returns:
+            Number of districts upserted
+        """
+        loaded = 0
+        for feature in feature_collection.get("features", []):
+            properties = feature.get("properties") or {}
+            name = properties.get(name_property)
+            if not name or not feature.get("geometry"):
+                logger.warning(f"Skipping district feature without name/geometry: {properties}")
+                continue
+
+            geojson = json.dumps(feature["geometry"])
+            raw_geom = func.ST_SetSRID(func.ST_GeomFromGeoJSON(geojson), 4326)
+            geom = func.ST_Multi(func.ST_CollectionExtract(func.ST_MakeValid(raw_geom), 3))
+            stmt = insert(District).values(
+                slug=properties.get("slug") or district_slug(name),
+                name=name,
+                city=city,
+                geom=geom,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[District.slug],
+                set_={
+                    "name": stmt.excluded.name,
+                    "city": stmt.excluded.city,
+                    "geom": stmt.excluded.geom,
+                    "updated_at": func.now(),
+                },
+            )
+            await db.execute(stmt)
+            loaded += 1
+
+        self._slug_ids.clear()
+        logger.info(f"Loaded {loaded} district boundaries (city={city})")
+        return loaded
+
+    async def assign_locations(self, db: AsyncSession) -> int:
+        """
+        Recompute `district_id` for every location in one set-based UPDATE.
+
+        Needed after boundaries change; normal writes resolve it inline.
+
+        Returns:
+            Number of locations updated
+        """
+        stmt = update(Location).values(
+            district_id=self._covering_district(func.Geometry(Location.geom)),
+            updated_at=Location.updated_at,  # Not a content change
+        )
+        result = await db.execute(stmt, execution_options={"synchronize_session": False})
+        return result.rowcount
+
+
+# Singleton instance
+district_service = DistrictService()
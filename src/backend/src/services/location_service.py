@@ -11,9 +11,17 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.core.http_cache import ResourceVersion, latest
+from src.models.image import Image
 from src.models.location import Location, LocationStatus
+from src.models.location_change import LocationChangeOp
 from src.models.moderation_log import ModerationAction, ModerationLog
 from src.schemas.location import LocationCreate, LocationUpdate
+from src.services.change_feed_service import change_feed_service
+from src.services.dashboard_service import dashboard_service
+from src.services.district_service import district_service
+from src.services.realtime_service import LocationEvent, LocationEventType, realtime_service
+from src.services.search_service import search_service
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +38,12 @@ class LocationNotFoundError(LocationServiceError):
     pass
 
 
+class LocationClaimedError(LocationServiceError):
+    """Raised when another moderator holds the location's queue lease."""
+
+    pass
+
+
 class LocationService:
     """Service for Location CRUD operations with transaction management."""
 
@@ -71,6 +85,7 @@ class LocationService:
                 phone=data.phone,
                 website=data.website,
                 geom=geom,
+                district_id=district_service.district_id_expr(data.latitude, data.longitude),
                 status=LocationStatus.pending,
             )
 
@@ -86,6 +101,10 @@ class LocationService:
             )
             db.add(log)
 
+            # Record in change feed (same transaction)
+            await change_feed_service.record(db, location, position=(data.latitude, data.longitude))
+            await dashboard_service.location_created(db)
+
             await db.commit()
             await db.refresh(location)
 
@@ -137,6 +156,62 @@ class LocationService:
 
         return location
 
+    async def get_version(
+        self,
+        db: AsyncSession,
+        location_id: int,
+        include_pending: bool = False,
+    ) -> ResourceVersion | None:
+        """
+        Version of a location's detail response, without loading it.
+
+        One aggregate query over the location row and its images.
+
+        Args:
+            db: Database session
+            location_id: Location ID
+            include_pending: Whether to include pending/rejected locations
+
+        Returns:
+            ResourceVersion, or None if not found
+        """
+        stmt = (
+            select(
+                Location.updated_at,
+                func.count(Image.id).label("image_count"),
+                func.max(Image.id).label("last_image_id"),
+                func.max(Image.created_at).label("last_image_at"),
+            )
+            .outerjoin(Image, Image.location_id == Location.id)
+            .where(Location.id == location_id)
+            .group_by(Location.id)
+        )
+        if not include_pending:
+            stmt = stmt.where(Location.status == LocationStatus.approved)
+
+        row = (await db.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        return ResourceVersion(
+            last_modified=latest(row.updated_at, row.last_image_at),
+            has_children=True,
+            fingerprint=(row.updated_at, row.image_count, row.last_image_id),
+        )
+
+    @staticmethod
+    def version_of(location: Location) -> ResourceVersion:
+        """Version of a loaded location (images loaded); matches `get_version`."""
+        images = location.images
+        return ResourceVersion(
+            last_modified=latest(location.updated_at, *(image.created_at for image in images)),
+            has_children=True,
+            fingerprint=(
+                location.updated_at,
+                len(images),
+                max((image.id for image in images), default=None),
+            ),
+        )
+
     # =========================================================================
     # BE-3.13: Update Location
     # =========================================================================
@@ -167,6 +242,8 @@ class LocationService:
             LocationNotFoundError: If location not found
         """
         location = await self.get_by_id(db, location_id, include_pending=True)
+        prev_lat, prev_lng = location.latitude, location.longitude
+        new_lat, new_lng = prev_lat, prev_lng
 
         # Update only provided fields
         update_data = data.model_dump(exclude_unset=True)
@@ -178,6 +255,8 @@ class LocationService:
 
             if lat is not None and lng is not None:
                 location.geom = func.ST_SetSRID(ST_MakePoint(lng, lat), 4326)
+                location.district_id = district_service.district_id_expr(lat, lng)
+                new_lat, new_lng = lat, lng
 
         # Apply other updates
         for field, value in update_data.items():
@@ -193,7 +272,30 @@ class LocationService:
         )
         db.add(log)
 
+        seq = await change_feed_service.record(db, location, position=(new_lat, new_lng))
+
+        # Push to live map subscribers (delivered on commit)
+        if location.status == LocationStatus.approved:
+            moved = (new_lat, new_lng) != (prev_lat, prev_lng)
+            await realtime_service.notify(
+                db,
+                LocationEvent(
+                    type=LocationEventType.edited,
+                    id=location.id,
+                    latitude=new_lat,
+                    longitude=new_lng,
+                    category=location.category.value,
+                    change_seq=seq,
+                    prev_latitude=prev_lat if moved else None,
+                    prev_longitude=prev_lng if moved else None,
+                ),
+            )
+
+        await dashboard_service.location_edited(db)
+
         await db.commit()
+        if location.status == LocationStatus.approved:
+            search_service.invalidate()
         await db.refresh(location)
 
         logger.info(f"Updated location: {location.id}")
@@ -234,8 +336,29 @@ class LocationService:
             f"(by moderator: {moderator_id or 'unknown'})"
         )
 
+        status, position = location.status, (location.latitude, location.longitude)
         await db.delete(location)
+
+        # Tombstone survives the delete (no FK on the change log); recorded
+        # after the DELETE is flushed, so the row lock precedes the feed lock
+        seq = await change_feed_service.record(db, location.id, LocationChangeOp.delete, position)
+
+        if status == LocationStatus.approved:
+            await realtime_service.notify(
+                db,
+                LocationEvent(
+                    type=LocationEventType.deleted,
+                    id=location.id,
+                    latitude=position[0],
+                    longitude=position[1],
+                    change_seq=seq,
+                ),
+            )
+
+        await dashboard_service.location_deleted(db)
         await db.commit()
+        if status == LocationStatus.approved:
+            search_service.invalidate()
 
         return True
 
@@ -264,20 +387,41 @@ class LocationService:
 
         Returns:
             Updated Location object
+
+        Raises:
+            LocationNotFoundError: If location not found
+            LocationClaimedError: If another moderator holds an unexpired lease
         """
+        # Lock the row first so a concurrent claim cannot slip in before the decision
+        lease = (
+            await db.execute(
+                select(Location.claimed_by, Location.claim_expires_at > func.now())
+                .where(Location.id == location_id)
+                .with_for_update()
+            )
+        ).one_or_none()
+        if lease is not None:
+            claimed_by, lease_active = lease
+            if claimed_by is not None and lease_active and str(claimed_by) != moderator_id:
+                raise LocationClaimedError(
+                    f"Location {location_id} is claimed by another moderator"
+                )
+
         location = await self.get_by_id(db, location_id, include_pending=True)
         old_status = location.status
 
-        # Update status
+        # Update status (a decision also ends any moderation queue lease)
         location.status = new_status
+        location.claimed_by = None
+        location.claim_expires_at = None
 
         # Determine action type
         if new_status == LocationStatus.approved:
-            action = (ModerationAction.approved,)
+            action = ModerationAction.approved
         elif new_status == LocationStatus.rejected:
-            action = (ModerationAction.rejected,)
+            action = ModerationAction.rejected
         else:
-            action = ModerationAction.EDITED
+            action = ModerationAction.edited
 
         # Create moderation log
         log = ModerationLog(
@@ -289,7 +433,32 @@ class LocationService:
         )
         db.add(log)
 
+        seq = await change_feed_service.record(db, location)
+
+        # Push visibility changes to live map subscribers (delivered on commit)
+        event_type = None
+        if new_status == LocationStatus.approved and old_status != LocationStatus.approved:
+            event_type = LocationEventType.approved
+        elif old_status == LocationStatus.approved and new_status != LocationStatus.approved:
+            event_type = LocationEventType.deleted
+        if event_type is not None:
+            await realtime_service.notify(
+                db,
+                LocationEvent(
+                    type=event_type,
+                    id=location.id,
+                    latitude=location.latitude,
+                    longitude=location.longitude,
+                    category=location.category.value,
+                    change_seq=seq,
+                ),
+            )
+
+        await dashboard_service.location_status_changed(db, old_status, new_status)
+
         await db.commit()
+        if event_type is not None:
+            search_service.invalidate()
         await db.refresh(location)
 
         logger.info(f"Location {location.id} status: {old_status.value} → {new_status.value}")
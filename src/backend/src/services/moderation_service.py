@@ -0,0 +1,264 @@
+"""
+SatVach Moderation Service
+Claim-based moderation queue and set-based bulk moderation.
+
+Moderators claim batches of pending locations with `FOR UPDATE SKIP LOCKED`,
+so concurrent moderators never receive the same rows. A claim is a lease:
+unfinished items return to the queue once `claim_expires_at` passes.
+Bulk approve/reject runs a fixed number of statements whatever the batch size.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.core.config import settings
+from src.models.location import Location, LocationStatus
+from src.models.moderation_log import ModerationAction, ModerationLog
+from src.services.change_feed_service import change_feed_service
+from src.services.dashboard_service import dashboard_service
+from src.services.realtime_service import LocationEvent, LocationEventType, realtime_service
+from src.services.search_service import search_service
+
+logger = logging.getLogger(__name__)
+
+_STATUS_ACTIONS = {
+    LocationStatus.approved: ModerationAction.approved,
+    LocationStatus.rejected: ModerationAction.rejected,
+}
+
+
+@dataclass
+class BulkModerationResult:
+    """Outcome of a bulk status change."""
+
+    updated: list[int]
+    skipped: list[int]  # Missing, already in the status, or leased to another moderator
+
+
+def _claimable_by(moderator_id: int):
+    """Unclaimed, lease expired, or already held by this moderator."""
+    return or_(
+        Location.claimed_by.is_(None),
+        Location.claim_expires_at < func.now(),
+        Location.claimed_by == moderator_id,
+    )
+
+
+class ModerationService:
+    """Moderation queue claims and bulk status changes."""
+
+    # =========================================================================
+    # Queue
+    # =========================================================================
+    async def claim(
+        self,
+        db: AsyncSession,
+        moderator_id: int,
+        limit: int = 20,
+    ) -> tuple[list[Location], datetime | None]:
+        """
+        Lease the oldest available pending locations to a moderator.
+
+        Rows locked by a concurrent claim are skipped rather than waited on.
+        Items the moderator already holds are re-leased first in queue order.
+
+        Args:
+            db: Database session (committed here)
+            moderator_id: Claiming user's ID
+            limit: Max items to claim
+
+        Returns:
+            Tuple of (claimed locations oldest first, lease expiry or None)
+        """
+        lease = timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+        available = (
+            select(Location.id)
+            .where(Location.status == LocationStatus.pending, _claimable_by(moderator_id))
+            .order_by(Location.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Location)
+            .where(Location.id.in_(available))
+            .values(
+                claimed_by=moderator_id,
+                claim_expires_at=func.now() + lease,
+                updated_at=Location.updated_at,  # A lease is not an edit
+            )
+            .returning(Location.id, Location.claim_expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+        if not rows:
+            return [], None
+
+        locations = await db.execute(
+            select(Location)
+            .options(selectinload(Location.images))
+            .where(Location.id.in_([row.id for row in rows]))
+            .order_by(Location.created_at)
+        )
+        return list(locations.scalars().all()), rows[0].claim_expires_at
+
+    async def release(
+        self,
+        db: AsyncSession,
+        moderator_id: int,
+        location_ids: list[int] | None = None,
+    ) -> int:
+        """
+        Return a moderator's claimed items to the queue.
+
+        Args:
+            db: Database session (committed here)
+            moderator_id: Moderator whose claims to release
+            location_ids: Only these items (default: all of the moderator's claims)
+
+        Returns:
+            Number of claims released
+        """
+        stmt = (
+            update(Location)
+            .where(Location.claimed_by == moderator_id)
+            .values(claimed_by=None, claim_expires_at=None, updated_at=Location.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if location_ids is not None:
+            stmt = stmt.where(Location.id.in_(location_ids))
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount
+
+    # =========================================================================
+    # Bulk approve / reject
+    # =========================================================================
+    async def bulk_update_status(
+        self,
+        db: AsyncSession,
+        location_ids: list[int],
+        new_status: LocationStatus,
+        moderator_id: int,
+        reason: str | None = None,
+        moderator_ip: str | None = None,
+    ) -> BulkModerationResult:
+        """
+        Change the status of many locations in one transaction.
+
+        One UPDATE (with the previous status from a locking CTE), one
+        INSERT ... SELECT of audit logs, one change-feed insert and one
+        NOTIFY statement, regardless of the batch size.
+
+        Args:
+            db: Database session (committed here)
+            location_ids: Locations to moderate
+            new_status: approved or rejected
+            moderator_id: Acting moderator's user ID
+            reason: Reason recorded in every log entry
+            moderator_ip: Moderator IP
+
+        Returns:
+            BulkModerationResult with updated and skipped IDs
+        """
+        action = _STATUS_ACTIONS[new_status]
+        requested = list(dict.fromkeys(location_ids))
+
+        previous = (
+            select(Location.id, Location.status)
+            .where(
+                Location.id.in_(requested),
+                Location.status != new_status,
+                _claimable_by(moderator_id),
+            )
+            .with_for_update()
+            .cte("previous")
+        )
+        stmt = (
+            update(Location)
+            .where(Location.id == previous.c.id)
+            .values(
+                status=new_status,
+                claimed_by=None,
+                claim_expires_at=None,
+            )
+            .returning(
+                Location.id,
+                previous.c.status.label("old_status"),
+                Location.category,
+                Location.latitude.label("latitude"),
+                Location.longitude.label("longitude"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        updated_ids = [row.id for row in rows]
+
+        if rows:
+            log_rows = select(
+                Location.id,
+                literal(action, ModerationLog.action.type),
+                literal(reason or f"Bulk {action.value}", ModerationLog.reason.type),
+                literal(str(moderator_id), ModerationLog.moderator_id.type),
+                literal(moderator_ip, ModerationLog.moderator_ip.type),
+            ).where(Location.id.in_(updated_ids))
+            await db.execute(
+                ModerationLog.__table__.insert().from_select(
+                    ["location_id", "action", "reason", "moderator_id", "moderator_ip"], log_rows
+                )
+            )
+            # Last statement before the NOTIFYs: the feed's writer lock is held until commit
+            seqs = await change_feed_service.record_many(db, updated_ids)
+            await realtime_service.notify_many(db, self._visibility_events(rows, seqs, new_status))
+            await dashboard_service.location_statuses_changed(
+                db, [(row.old_status, new_status) for row in rows]
+            )
+
+        await db.commit()
+
+        if rows:
+            search_service.invalidate()
+
+        updated = set(updated_ids)
+        logger.info(
+            f"Bulk {action.value} by moderator {moderator_id}: "
+            f"{len(updated)} updated, {len(requested) - len(updated)} skipped"
+        )
+        return BulkModerationResult(
+            updated=updated_ids,
+            skipped=[loc_id for loc_id in requested if loc_id not in updated],
+        )
+
+    @staticmethod
+    def _visibility_events(
+        rows, seqs: dict[int, int], new_status: LocationStatus
+    ) -> list[LocationEvent]:
+        """Realtime events for rows that became visible or stopped being visible."""
+        events = []
+        for row in rows:
+            if new_status == LocationStatus.approved:
+                event_type = LocationEventType.approved
+            elif row.old_status == LocationStatus.approved:
+                event_type = LocationEventType.deleted
+            else:
+                continue
+            events.append(
+                LocationEvent(
+                    type=event_type,
+                    id=row.id,
+                    latitude=row.latitude,
+                    longitude=row.longitude,
+                    category=row.category.value,
+                    change_seq=seqs.get(row.id),
+                )
+            )
+        return events
+
+
+# Singleton instance
+moderation_service = ModerationService()
@@ -0,0 +1,283 @@
+"""
+SatVach Offline Bundle Service
+Builds compact per-region snapshots of approved locations for offline map use.
+
+Bundle format (gzip-compressed, little-endian):
+    header:  b"SVB1" | version (uint64) | count (uint32) | n_categories (uint8)
+             followed by n_categories length-prefixed (uint8) category names
+    record:  id (uint32) | lat_e6 (int32) | lng_e6 (int32) | category index (uint8)
+             | title length (uint16) | title (utf-8)
+
+The version is the highest change-log sequence covered by the snapshot, so a
+client can later ask for a delta of everything that changed after it.
+"""
+
+import gzip
+import logging
+import struct
+from dataclasses import dataclass
+
+from geoalchemy2.functions import ST_MakeEnvelope
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.location import Location, LocationCategory, LocationStatus
+from src.models.location_change import LocationChange, LocationChangeOp
+from src.services.change_feed_service import change_feed_service
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b"SVB1"
+BUNDLE_CONTENT_TYPE = "application/octet-stream"
+COORD_SCALE = 1_000_000  # Micro-degrees (~11cm precision)
+MAX_TITLE_BYTES = 0xFFFF
+
+# Region name -> (min_lng, min_lat, max_lng, max_lat)
+BUNDLE_REGIONS: dict[str, tuple[float, float, float, float]] = {
+    "hanoi": (105.70, 20.90, 106.00, 21.15),
+    "hcmc": (106.55, 10.65, 106.85, 10.95),
+    "danang": (108.10, 15.95, 108.30, 16.15),
+}
+
+_HEADER = struct.Struct("<4sQIB")
+_RECORD = struct.Struct("<IiiBH")
+_CATEGORIES = list(LocationCategory)
+
+
+class UnknownRegionError(Exception):
+    """Raised when a bundle region is not configured."""
+
+    pass
+
+
+@dataclass(slots=True)
+class BundlePoint:
+    """Compact location record stored in offline bundles."""
+
+    id: int
+    latitude: float
+    longitude: float
+    category: LocationCategory
+    title: str
+
+
+def encode_bundle(version: int, points: list[BundlePoint]) -> bytes:
+    """
+    Encode points into the compressed binary bundle format.
+
+    Args:
+        version: Change sequence the snapshot is consistent with
+        points: Location records to include
+
+    Returns:
+        Gzip-compressed bundle bytes
+    """
+    parts = [_HEADER.pack(BUNDLE_MAGIC, version, len(points), len(_CATEGORIES))]
+    for category in _CATEGORIES:
+        name = category.value.encode()
+        parts.append(struct.pack("<B", len(name)) + name)
+
+    category_index = {category: i for i, category in enumerate(_CATEGORIES)}
+    for point in points:
+        title = point.title.encode()[:MAX_TITLE_BYTES]
+        parts.append(
+            _RECORD.pack(
+                point.id,
+                round(point.latitude * COORD_SCALE),
+                round(point.longitude * COORD_SCALE),
+                category_index[point.category],
+                len(title),
+            )
+        )
+        parts.append(title)
+
+    return gzip.compress(b"".join(parts), compresslevel=9)
+
+
+def decode_bundle(data: bytes) -> tuple[int, list[BundlePoint]]:
+    """
+    Decode a bundle produced by `encode_bundle`.
+
+    Args:
+        data: Gzip-compressed bundle bytes
+
+    Returns:
+        Tuple of (version, points)
+
+    Raises:
+        ValueError: If the payload is not a SatVach bundle
+    """
+    raw = gzip.decompress(data)
+    magic, version, count, n_categories = _HEADER.unpack_from(raw, 0)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("Not a SatVach offline bundle")
+
+    offset = _HEADER.size
+    categories = []
+    for _ in range(n_categories):
+        length = raw[offset]
+        categories.append(LocationCategory(raw[offset + 1 : offset + 1 + length].decode()))
+        offset += 1 + length
+
+    points = []
+    for _ in range(count):
+        loc_id, lat, lng, cat, title_len = _RECORD.unpack_from(raw, offset)
+        offset += _RECORD.size
+        title = raw[offset : offset + title_len].decode(errors="ignore")
+        offset += title_len
+        points.append(
+            BundlePoint(
+                id=loc_id,
+                latitude=lat / COORD_SCALE,
+                longitude=lng / COORD_SCALE,
+                category=categories[cat],
+                title=title,
+            )
+        )
+
+    return version, points
+
+
+class OfflineBundleService:
+    """Service for building offline snapshots and region deltas."""
+
+    def get_region_bounds(self, region: str) -> tuple[float, float, float, float]:
+        """
+        Get the bounding box for a configured region.
+
+        Raises:
+            UnknownRegionError: If the region is not configured
+        """
+        try:
+            return BUNDLE_REGIONS[region]
+        except KeyError:
+            raise UnknownRegionError(f"Unknown bundle region: {region}")
+
+    def bundle_key(self, region: str, version: int | None = None) -> str:
+        """S3 key for a region bundle (versioned, or the `latest` alias)."""
+        name = version if version is not None else "latest"
+        return f"bundles/{region}/{name}.bin.gz"
+
+    def _region_stmt(self, region: str):
+        """Select compact columns of locations inside a region."""
+        min_lng, min_lat, max_lng, max_lat = self.get_region_bounds(region)
+        envelope = ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+        return select(
+            Location.id,
+            Location.latitude,
+            Location.longitude,
+            Location.category,
+            Location.title,
+        ).where(func.ST_Intersects(Location.geom, envelope))
+
+    async def build_snapshot(self, db: AsyncSession, region: str) -> tuple[int, bytes]:
+        """
+        Build the compressed snapshot of approved locations in a region.
+
+        The version is read before the rows, so rows changed while the snapshot
+        is being built are simply re-delivered by the next delta.
+
+        Args:
+            db: Database session
+            region: Region name
+
+        Returns:
+            Tuple of (version, bundle bytes)
+        """
+        version = await change_feed_service.current_version(db)
+
+        stmt = (
+            self._region_stmt(region)
+            .where(Location.status == LocationStatus.approved)
+            .order_by(Location.id)
+        )
+        result = await db.execute(stmt)
+        points = [
+            BundlePoint(
+                id=row.id,
+                latitude=row.latitude,
+                longitude=row.longitude,
+                category=row.category,
+                title=row.title,
+            )
+            for row in result
+        ]
+
+        data = encode_bundle(version, points)
+        logger.info(
+            f"Built offline bundle: region={region} version={version} "
+            f"points={len(points)} size={len(data)}B"
+        )
+        return version, data
+
+    async def get_delta(
+        self,
+        db: AsyncSession,
+        region: str,
+        since: int,
+        limit: int = 1000,
+    ) -> tuple[list[BundlePoint], list[int], int, bool]:
+        """
+        Get region changes after a client's bundle version.
+
+        Reads the location change log: approved rows inside the region are
+        upserts; deleted, unapproved or moved-out rows are removals, but only
+        if the log ever placed them inside the region (a client of this region
+        cannot hold locations that never were in it).
+
+        Args:
+            db: Database session
+            region: Region name
+            since: Client's current version
+            limit: Max log entries to scan
+
+        Returns:
+            Tuple of (upserts, removed ids, new version, has_more)
+        """
+        latest, version, has_more = await change_feed_service.read(db, since, limit)
+
+        upsert_ids = [loc_id for loc_id, op in latest.items() if op == LocationChangeOp.upsert]
+        upserts: list[BundlePoint] = []
+        if upsert_ids:
+            stmt = self._region_stmt(region).where(
+                Location.id.in_(upsert_ids),
+                Location.status == LocationStatus.approved,
+            )
+            upserts = [
+                BundlePoint(
+                    id=row.id,
+                    latitude=row.latitude,
+                    longitude=row.longitude,
+                    category=row.category,
+                    title=row.title,
+                )
+                for row in await db.execute(stmt)
+            ]
+
+        visible = {point.id for point in upserts}
+        candidates = [loc_id for loc_id in latest if loc_id not in visible]
+        removed: list[int] = []
+        if candidates:
+            min_lng, min_lat, max_lng, max_lat = self.get_region_bounds(region)
+            stmt = (
+                select(LocationChange.location_id)
+                .distinct()
+                .where(
+                    LocationChange.location_id.in_(candidates),
+                    or_(
+                        # Logged before positions were recorded: may have been here
+                        LocationChange.latitude.is_(None),
+                        and_(
+                            LocationChange.latitude.between(min_lat, max_lat),
+                            LocationChange.longitude.between(min_lng, max_lng),
+                        ),
+                    ),
+                )
+            )
+            was_here = set((await db.scalars(stmt)).all())
+            removed = [loc_id for loc_id in candidates if loc_id in was_here]
+        return upserts, removed, version, has_more
+
+
+# Singleton instance
+offline_bundle_service = OfflineBundleService()
@@ -0,0 +1,286 @@
+"""
+SatVach Realtime Service
+Pushes location moderation events to map clients subscribed to a viewport.
+
+Events are emitted with Postgres NOTIFY inside the writing transaction, so they
+are only delivered on commit and reach every API worker. Each worker LISTENs on
+the channel and fans events out through an in-memory grid of subscriptions,
+so an event only touches subscribers whose bounding box can contain it.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+
+import asyncpg
+from sqlalchemy import Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOCATION_EVENTS_CHANNEL = "location_events"
+GRID_CELL_DEGREES = 0.05  # ~5.5km cells
+MAX_SUBSCRIPTION_CELLS = 400  # Wider boxes are matched linearly instead
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_DELAY_SECONDS = 5
+
+BBox = tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+
+
+class LocationEventType(str, Enum):
+    """Kinds of events pushed to map clients."""
+
+    approved = "approved"
+    edited = "edited"
+    deleted = "deleted"  # Deleted, or no longer publicly visible
+
+
+@dataclass(slots=True)
+class LocationEvent:
+    """Location event payload (also the NOTIFY payload, as JSON)."""
+
+    type: LocationEventType
+    id: int
+    latitude: float
+    longitude: float
+    category: str | None = None
+    change_seq: int | None = None
+    # Previous position when an edit moved the location
+    prev_latitude: float | None = None
+    prev_longitude: float | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "LocationEvent":
+        data = json.loads(payload)
+        data["type"] = LocationEventType(data["type"])
+        return cls(**data)
+
+    def points(self) -> list[tuple[float, float]]:
+        """(lng, lat) points the event is relevant to."""
+        pts = [(self.longitude, self.latitude)]
+        if self.prev_latitude is not None and self.prev_longitude is not None:
+            pts.append((self.prev_longitude, self.prev_latitude))
+        return pts
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A connected client's viewport subscription."""
+
+    bbox: BBox
+    queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    )
+    dropped: int = 0
+
+    def contains(self, lng: float, lat: float) -> bool:
+        min_lng, min_lat, max_lng, max_lat = self.bbox
+        return min_lng <= lng <= max_lng and min_lat <= lat <= max_lat
+
+    def push(self, event: LocationEvent) -> None:
+        """Queue an event without blocking; slow consumers lose events."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class SubscriptionGrid:
+    """
+    Uniform grid index of subscriptions.
+
+    A subscription is registered in every cell its bbox overlaps, so matching an
+    event is one dict lookup per point plus an exact bbox check.
+    """
+
+    def __init__(self, cell_size: float = GRID_CELL_DEGREES):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], set[Subscription]] = {}
+        self._wide: set[Subscription] = set()
+        self._index: dict[Subscription, list[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _cell(self, lng: float, lat: float) -> tuple[int, int]:
+        return math.floor(lng / self.cell_size), math.floor(lat / self.cell_size)
+
+    def add(self, sub: Subscription) -> None:
+        min_lng, min_lat, max_lng, max_lat = sub.bbox
+        x0, y0 = self._cell(min_lng, min_lat)
+        x1, y1 = self._cell(max_lng, max_lat)
+
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_SUBSCRIPTION_CELLS:
+            self._wide.add(sub)
+            self._index[sub] = []
+            return
+
+        cells = [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(sub)
+        self._index[sub] = cells
+
+    def remove(self, sub: Subscription) -> None:
+        cells = self._index.pop(sub, None)
+        if cells is None:
+            return
+        self._wide.discard(sub)
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(sub)
+                if not bucket:
+                    del self._cells[cell]
+
+    def match(self, event: LocationEvent) -> set[Subscription]:
+        """Subscriptions whose bbox contains any of the event's points."""
+        matched: set[Subscription] = set()
+        for lng, lat in event.points():
+            for sub in self._cells.get(self._cell(lng, lat), ()):
+                if sub.contains(lng, lat):
+                    matched.add(sub)
+            for sub in self._wide:
+                if sub.contains(lng, lat):
+                    matched.add(sub)
+        return matched
+
+
+class RealtimeService:
+    """LISTEN/NOTIFY bridge and per-worker subscription fan-out."""
+
+    def __init__(self):
+        self.grid = SubscriptionGrid()
+        self._handlers: list[Callable[[LocationEvent], None]] = []
+        self._channels: dict[str, Callable[[str], None]] = {}
+        self._listener_task: asyncio.Task | None = None
+
+    # =========================================================================
+    # Producer side (called inside write transactions)
+    # =========================================================================
+    async def notify(self, db: AsyncSession, event: LocationEvent) -> None:
+        """
+        Queue an event with pg_notify in the caller's transaction.
+
+        Postgres delivers it to all listeners only if the transaction commits.
+        """
+        await db.execute(select(func.pg_notify(LOCATION_EVENTS_CHANNEL, event.to_json())))
+
+    async def notify_many(self, db: AsyncSession, events: list[LocationEvent]) -> None:
+        """Queue several events with a single statement (bulk moderation)."""
+        if not events:
+            return
+        payloads = func.unnest(
+            bindparam("payloads", [event.to_json() for event in events], type_=ARRAY(Text))
+        ).table_valued("payload").render_derived()
+        await db.execute(
+            select(func.pg_notify(LOCATION_EVENTS_CHANNEL, payloads.c.payload)).select_from(
+                payloads
+            )
+        )
+
+    # =========================================================================
+    # Consumer side (per worker)
+    # =========================================================================
+    def add_handler(self, handler: Callable[[LocationEvent], None]) -> None:
+        """Register an in-process consumer (e.g. the spatial replica) for every event."""
+        self._handlers.append(handler)
+
+    def listen(self, channel: str, callback: Callable[[str], None]) -> None:
+        """
+        Also LISTEN on another channel with the same connection (call before `start`).
+
+        Args:
+            channel: NOTIFY channel name
+            callback: Called with each raw payload
+        """
+        self._channels[channel] = callback
+
+    def publish(self, event: LocationEvent) -> int:
+        """Fan an event out to matching local subscribers. Returns the match count."""
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Location event handler failed: {e}")
+
+        subs = self.grid.match(event)
+        for sub in subs:
+            sub.push(event)
+        return len(subs)
+
+    @asynccontextmanager
+    async def subscribe(self, bbox: BBox) -> AsyncIterator[Subscription]:
+        """Register a viewport subscription for the lifetime of the context."""
+        sub = Subscription(bbox=bbox)
+        self.grid.add(sub)
+        try:
+            yield sub
+        finally:
+            self.grid.remove(sub)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = LocationEvent.from_json(payload)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring malformed location event: {e}")
+            return
+        self.publish(event)
+
+    def _on_channel_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self._channels[channel](payload)
+        except Exception as e:
+            logger.error(f"{channel} handler failed: {e}")
+
+    async def _listen_forever(self) -> None:
+        """Hold a dedicated LISTEN connection, reconnecting if it drops."""
+        dsn = settings.DATABASE_URL.replace("+asyncpg", "")
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: closed.set())
+                await conn.add_listener(LOCATION_EVENTS_CHANNEL, self._on_notify)
+                for channel in self._channels:
+                    await conn.add_listener(channel, self._on_channel_notify)
+                logger.info(f"Listening for {LOCATION_EVENTS_CHANNEL} notifications")
+                await closed.wait()
+                logger.warning("Realtime listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+                raise
+            except Exception as e:
+                logger.error(f"Realtime listener failed: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def start(self) -> None:
+        """Start the LISTEN task (idempotent)."""
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        """Stop the LISTEN task."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+
+# Singleton instance
+realtime_service = RealtimeService()
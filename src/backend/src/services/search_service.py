@@ -4,25 +4,81 @@ Handles location searches with PostGIS spatial queries and full-text search.
 """
 
 import logging
+import time
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from geoalchemy2.functions import ST_Distance, ST_DWithin, ST_MakeEnvelope, ST_MakePoint
-from sqlalchemy import func, or_, select
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Float,
+    Integer,
+    any_,
+    bindparam,
+    column,
+    func,
+    lambda_stmt,
+    null,
+    or_,
+    select,
+    true,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.models.location import Location, LocationCategory, LocationStatus
-from src.schemas.location import LocationSearchParams
+from src.core.cache import CoalescingCache
+from src.core.config import settings
+from src.core.metrics import search_cache_requests_total
+from src.db.routing import next_read_session_maker, primary_session_maker
+from src.models.location import MERCATOR_MAX_LAT, Location, LocationCategory, LocationStatus
+from src.schemas.location import LocationResponse, LocationSearchParams
+from src.services.realtime_service import LocationEvent
+from src.services.spatial_index import spatial_replica
 
 if TYPE_CHECKING:
     from sqlalchemy.sql import Select
+    from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 logger = logging.getLogger(__name__)
 
+# Built once: `= ANY(:ids)` keeps one statement shape for any number of ids,
+# where IN (...) would render (and prepare) a new statement per list length.
+_LOCATIONS_BY_IDS = (
+    select(Location)
+    .options(selectinload(Location.images))
+    .where(Location.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+)
+
+_location_list = TypeAdapter(list[LocationResponse])
+
+# Generated web-mercator copy of geom (not mapped on Location)
+_GEOM_3857 = Location.__table__.c.geom_3857
+
+# Coordinates in cache keys: 6 decimals is ~0.1 m, well below what changes a result
+_KEY_PRECISION = 6
+
 
 class SearchService:
     """Service for spatial and text-based location searches."""
 
+    def __init__(
+        self,
+        session_maker_factory: Callable = next_read_session_maker,
+        primary_session_maker_factory: Callable = primary_session_maker,
+    ):
+        self._session_maker_factory = session_maker_factory
+        self._primary_session_maker_factory = primary_session_maker_factory
+        # Loads run on the primary until then (replicas may predate the write)
+        self._primary_until = 0.0
+        self._cache = CoalescingCache(
+            maxsize=settings.SEARCH_CACHE_SIZE,
+            ttl=settings.SEARCH_CACHE_SECONDS,
+            stale_ttl=settings.SEARCH_STALE_SECONDS,
+        )
+
     # =========================================================================
     # BE-3.6: ST_DWithin for Radius Search
     # =========================================================================
@@ -111,6 +167,106 @@ class SearchService:
             )
         )
 
+    # =========================================================================
+    # In-process replica helpers
+    # =========================================================================
+    def _replica_can_serve(self, status: LocationStatus | None, query: str | None = None) -> bool:
+        """The replica holds approved points only and has no text index."""
+        return spatial_replica.ready and status == LocationStatus.approved and not query
+
+    async def _load_by_ids(self, db: AsyncSession, ids: list[int]) -> list[Location]:
+        """Hydrate locations by primary key, preserving the given order."""
+        if not ids:
+            return []
+        result = await db.execute(_LOCATIONS_BY_IDS, {"ids": ids})
+        by_id = {location.id: location for location in result.scalars()}
+        # Rows approved in the replica but changed since are skipped until the next sync
+        return [
+            by_id[loc_id]
+            for loc_id in ids
+            if loc_id in by_id and by_id[loc_id].status == LocationStatus.approved
+        ]
+
+    # =========================================================================
+    # Cached statement shapes for the hot search paths
+    # =========================================================================
+    def _search_statements(
+        self, params: LocationSearchParams
+    ) -> tuple["StatementLambdaElement", "StatementLambdaElement"]:
+        """
+        Build the (count, page) statements for `search` as lambda statements.
+
+        Each lambda is cached by its code location, so the select() tree is
+        built, cache-keyed and compiled once per shape; later requests only
+        extract parameter values. The optional filters give a small fixed set
+        of shapes, which keeps asyncpg's per-connection prepared statement
+        cache warm. Predicates mirror `_apply_radius_filter` and
+        `_apply_text_filter`.
+
+        Args:
+            params: Search parameters
+
+        Returns:
+            Tuple of (count statement, page statement)
+        """
+        lat, lng, radius = params.latitude, params.longitude, params.radius
+        filters: list[Callable[[Select], Select]] = []
+
+        # BE-3.6: radius filter (GIST index)
+        if params.has_center:
+            filters.append(
+                lambda s: s.where(
+                    ST_DWithin(Location.geom, func.ST_SetSRID(ST_MakePoint(lng, lat), 4326), radius)
+                )
+            )
+
+        # District mode: precomputed district_id (B-Tree index), no polygon test
+        if params.district_id is not None:
+            district_id = params.district_id
+            filters.append(lambda s: s.where(Location.district_id == district_id))
+
+        if params.category:
+            category = params.category
+            filters.append(lambda s: s.where(Location.category == category))
+
+        # Default: approved only
+        if params.status:
+            status = params.status
+            filters.append(lambda s: s.where(Location.status == status))
+
+        # BE-3.8: text filter (pg_trgm GIN index)
+        if params.query:
+            pattern = f"%{params.query}%"
+            filters.append(
+                lambda s: s.where(
+                    or_(Location.title.ilike(pattern), Location.description.ilike(pattern))
+                )
+            )
+
+        count_stmt = lambda_stmt(lambda: select(func.count(Location.id)))
+        # BE-3.10: selectinload avoids N+1 queries on images
+        stmt = lambda_stmt(lambda: select(Location).options(selectinload(Location.images)))
+        for apply_filter in filters:
+            count_stmt += apply_filter
+            stmt += apply_filter
+
+        if params.has_center:
+            # Nearest first
+            stmt += lambda s: s.add_columns(
+                ST_Distance(
+                    Location.geom, func.ST_SetSRID(ST_MakePoint(lng, lat), 4326)
+                ).label("distance_meters")
+            ).order_by("distance_meters")
+        else:
+            # District-only search: newest first
+            stmt += lambda s: s.add_columns(null().label("distance_meters")).order_by(
+                Location.created_at.desc(), Location.id.desc()
+            )
+
+        skip, limit = params.skip, params.limit
+        stmt += lambda s: s.offset(skip).limit(limit)
+        return count_stmt, stmt
+
     # =========================================================================
     # BE-3.9: Combined Spatial + Text + Category Filters
     # =========================================================================
@@ -123,11 +279,16 @@ class SearchService:
         Combined search with spatial, text, and category filters.
 
         Applies all filters efficiently using PostGIS indexes:
-        - Radius filter (GIST index via ST_DWithin)
+        - Radius filter (GIST index via ST_DWithin), when a center is given
+        - District filter (B-Tree index on precomputed district_id)
         - Text filter (GIN index via pg_trgm)
         - Category filter (B-Tree index)
         - Status filter (B-Tree index)
 
+        When the in-process replica is enabled, radius-only searches over
+        approved locations are ranked in memory and only the page is read by
+        primary key.
+
         Args:
             db: Database session
             params: Search parameters
@@ -135,43 +296,26 @@ class SearchService:
         Returns:
             Tuple of (list of locations, total count)
         """
-        # BE-3.10: Use selectinload to avoid N+1 queries
-        stmt = select(Location).options(selectinload(Location.images))
-
-        # Apply radius filter (BE-3.6)
-        stmt = self._apply_radius_filter(
-            stmt,
-            params.latitude,
-            params.longitude,
-            params.radius,
-        )
-
-        # Apply category filter if specified
-        if params.category:
-            stmt = stmt.where(Location.category == params.category)
-
-        # Apply status filter (default: approved only)
-        if params.status:
-            stmt = stmt.where(Location.status == params.status)
+        if (
+            self._replica_can_serve(params.status, params.query)
+            and params.district_id is None
+        ):
+            ids, distances = spatial_replica.index.radius(
+                params.latitude, params.longitude, params.radius, params.category
+            )
+            page = slice(params.skip, params.skip + params.limit)
+            distance_by_id = dict(zip(ids[page].tolist(), distances[page].tolist(), strict=True))
+            locations = await self._load_by_ids(db, list(distance_by_id))
+            for location in locations:
+                location.distance_meters = distance_by_id[location.id]  # type: ignore
+            return locations, len(ids)
 
-        # Apply text filter if specified (BE-3.8)
-        if params.query:
-            stmt = self._apply_text_filter(stmt, params.query)
+        # Fixed statement shapes (cached, prepared by asyncpg)
+        count_stmt, stmt = self._search_statements(params)
 
         # Get total count before pagination
-        count_stmt = select(func.count()).select_from(stmt.subquery())
         total = await db.scalar(count_stmt) or 0
 
-        # Add distance column for sorting
-        center_point = func.ST_SetSRID(ST_MakePoint(params.longitude, params.latitude), 4326)
-        stmt = stmt.add_columns(ST_Distance(Location.geom, center_point).label("distance_meters"))
-
-        # Order by distance (nearest first)
-        stmt = stmt.order_by("distance_meters")
-
-        # Apply pagination
-        stmt = stmt.offset(params.skip).limit(params.limit)
-
         # Execute query
         result = await db.execute(stmt)
         rows = result.all()
@@ -185,7 +329,8 @@ class SearchService:
 
         logger.info(
             f"Search: {len(locations)}/{total} locations found "
-            f"(radius={params.radius}m, category={params.category})"
+            f"(radius={params.radius}m, district={params.district_id}, "
+            f"category={params.category})"
         )
 
         return locations, total
@@ -222,19 +367,42 @@ class SearchService:
         Returns:
             List of locations within viewport
         """
-        # BE-3.10: Use selectinload to avoid N+1
-        stmt = select(Location).options(selectinload(Location.images))
+        if self._replica_can_serve(status):
+            ids = spatial_replica.index.viewport(
+                min_lng, min_lat, max_lng, max_lat, category, limit
+            )
+            return await self._load_by_ids(db, ids.tolist())
+
+        # BE-3.10: Use selectinload to avoid N+1 (cached lambda statement, two shapes)
+        stmt = lambda_stmt(lambda: select(Location).options(selectinload(Location.images)))
 
         # Apply viewport filter (BE-3.7)
-        stmt = self._apply_viewport_filter(stmt, min_lng, min_lat, max_lng, max_lat)
+        if settings.VIEWPORT_PLANAR_FILTER:
+            # Bounding-box overlap (`&&`, GiST) in the map's projection; latitudes
+            # are clamped to the mercator range like the column itself
+            south, north = (
+                max(-MERCATOR_MAX_LAT, min(MERCATOR_MAX_LAT, lat)) for lat in (min_lat, max_lat)
+            )
+            stmt += lambda s: s.where(
+                _GEOM_3857.intersects(
+                    func.ST_Transform(ST_MakeEnvelope(min_lng, south, max_lng, north, 4326), 3857)
+                ),
+                Location.status == status,
+            )
+        else:
+            stmt += lambda s: s.where(
+                func.ST_Intersects(
+                    Location.geom, ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+                ),
+                Location.status == status,
+            )
 
         # Apply filters
         if category:
-            stmt = stmt.where(Location.category == category)
-        stmt = stmt.where(Location.status == status)
+            stmt += lambda s: s.where(Location.category == category)
 
         # Limit results
-        stmt = stmt.limit(limit)
+        stmt += lambda s: s.limit(limit)
 
         result = await db.execute(stmt)
         locations = list(result.scalars().all())
@@ -243,6 +411,265 @@ class SearchService:
 
         return locations
 
+    # =========================================================================
+    # Shared results for the public search and viewport endpoints
+    # =========================================================================
+    @staticmethod
+    def _search_key(params: LocationSearchParams) -> tuple:
+        """Normalized search parameters: equal keys always give equal results."""
+        has_center = params.has_center
+        return (
+            "search",
+            round(params.latitude, _KEY_PRECISION) if has_center else None,
+            round(params.longitude, _KEY_PRECISION) if has_center else None,
+            params.radius if has_center else None,  # Ignored without a center
+            params.district_id,
+            params.category,
+            params.status,
+            params.query.lower() if params.query else None,  # ILIKE ignores case
+            params.skip,
+            params.limit,
+        )
+
+    async def _shared(
+        self, endpoint: str, key: tuple, load: Callable, db: AsyncSession | None = None
+    ):
+        if db is not None:
+            # Read-your-writes client: its own primary session, nothing shared
+            search_cache_requests_total.inc(1, endpoint, "bypass")
+            return await load(db)
+
+        # Shared loads outlive any one caller (a cancelled or finished request
+        # closes its session), so each opens its own. Right after a visible
+        # write, a lagging replica would cache the old page, so use the primary.
+        async def load_with_session():
+            if time.monotonic() < self._primary_until:
+                session_maker = self._primary_session_maker_factory()
+            else:
+                session_maker = self._session_maker_factory()
+            async with session_maker() as session:
+                return await load(session)
+
+        value, outcome = await self._cache.get(key, load_with_session, load_with_session)
+        search_cache_requests_total.inc(1, endpoint, outcome)
+        return value
+
+    async def search_shared(
+        self, params: LocationSearchParams, db: AsyncSession | None = None
+    ) -> tuple[list[LocationResponse], int]:
+        """
+        `search`, with identical concurrent requests sharing one execution.
+
+        Results are cached per worker for SEARCH_CACHE_SECONDS, then served
+        stale for up to SEARCH_STALE_SECONDS while a single background refresh
+        replaces them. Queries run on their own read session (next replica, or
+        the primary), not the caller's. Location writes that change what public
+        searches see call `invalidate`; loads then use the primary for
+        READ_YOUR_WRITES_SECONDS so a lagging replica cannot refill the cache.
+
+        Args:
+            params: Search parameters
+            db: Primary session of a client that wrote recently (sticky); its
+                query runs there directly, bypassing the shared results
+
+        Returns:
+            Tuple of (list of location responses, total count); treat as read-only
+        """
+
+        async def load(session: AsyncSession) -> tuple[list[LocationResponse], int]:
+            locations, total = await self.search(session, params)
+            return _location_list.validate_python(locations, from_attributes=True), total
+
+        return await self._shared("search", self._search_key(params), load, db)
+
+    async def search_viewport_shared(
+        self,
+        min_lng: float,
+        min_lat: float,
+        max_lng: float,
+        max_lat: float,
+        category: LocationCategory | None = None,
+        status: LocationStatus = LocationStatus.approved,
+        limit: int = 100,
+        db: AsyncSession | None = None,
+    ) -> list[LocationResponse]:
+        """
+        `search_viewport`, with identical concurrent requests sharing one execution.
+
+        Caching (and `db` for sticky clients) is as for `search_shared`.
+
+        Returns:
+            List of location responses within the viewport; treat as read-only
+        """
+        bounds = tuple(round(v, _KEY_PRECISION) for v in (min_lng, min_lat, max_lng, max_lat))
+
+        async def load(session: AsyncSession) -> list[LocationResponse]:
+            locations = await self.search_viewport(session, *bounds, category, status, limit)
+            return _location_list.validate_python(locations, from_attributes=True)
+
+        key = ("viewport", *bounds, category, status, limit)
+        return await self._shared("viewport", key, load, db)
+
+    def invalidate(self) -> None:
+        """Drop shared results (and detach in-flight queries) after a visible change."""
+        self._cache.clear()
+        self._primary_until = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+    def apply_event(self, event: LocationEvent) -> None:
+        """Realtime handler: writes committed by any worker invalidate this one's results."""
+        self.invalidate()
+
+    # =========================================================================
+    # Batch Search: many centre points in one statement
+    # =========================================================================
+    async def search_batch(
+        self,
+        db: AsyncSession,
+        points: list[tuple[float, float]],
+        radius_meters: int = 1000,
+        category: LocationCategory | None = None,
+        limit_per_point: int = 10,
+    ) -> list[tuple[Location, dict[int, float]]]:
+        """
+        Nearest locations around many centre points, deduplicated.
+
+        PostGIS path: the centres are a VALUES list joined LATERAL to a
+        per-centre ST_DWithin/KNN subquery, so N centres cost one statement
+        (plus the images selectin) instead of N searches.
+
+        Args:
+            db: Database session
+            points: Centre points as (latitude, longitude)
+            radius_meters: Search radius around each centre
+            category: Optional category filter
+            limit_per_point: Max hits per centre
+
+        Returns:
+            List of (location, {point index: distance in meters}), nearest first
+        """
+        hits: dict[int, dict[int, float]] = {}
+
+        if self._replica_can_serve(LocationStatus.approved):
+            for idx, (lat, lng) in enumerate(points):
+                ids, distances = spatial_replica.index.radius(lat, lng, radius_meters, category)
+                for loc_id, distance in zip(
+                    ids[:limit_per_point].tolist(),
+                    distances[:limit_per_point].tolist(),
+                    strict=True,
+                ):
+                    hits.setdefault(loc_id, {})[idx] = distance
+            by_id = {loc.id: loc for loc in await self._load_by_ids(db, list(hits))}
+        else:
+            centres = values(
+                column("idx", Integer),
+                column("lat", Float),
+                column("lng", Float),
+                name="centres",
+            ).data([(idx, lat, lng) for idx, (lat, lng) in enumerate(points)])
+            centre_point = func.ST_SetSRID(ST_MakePoint(centres.c.lng, centres.c.lat), 4326)
+
+            nearby = select(
+                Location.id.label("location_id"),
+                ST_Distance(Location.geom, centre_point).label("distance"),
+            ).where(
+                ST_DWithin(Location.geom, centre_point, radius_meters),
+                Location.status == LocationStatus.approved,
+            )
+            if category:
+                nearby = nearby.where(Location.category == category)
+            nearby = (
+                nearby.order_by(ST_Distance(Location.geom, centre_point))
+                .limit(limit_per_point)
+                .correlate(centres)
+                .lateral("nearby")
+            )
+
+            stmt = (
+                select(centres.c.idx, nearby.c.distance, Location)
+                .select_from(centres)
+                .join(nearby, true())
+                .join(Location, Location.id == nearby.c.location_id)
+                .options(selectinload(Location.images))
+            )
+            by_id = {}
+            for idx, distance, location in (await db.execute(stmt)).all():
+                hits.setdefault(location.id, {})[idx] = distance
+                by_id[location.id] = location
+
+        results = [
+            (by_id[loc_id], per_point) for loc_id, per_point in hits.items() if loc_id in by_id
+        ]
+        results.sort(key=lambda item: min(item[1].values()))
+
+        logger.info(
+            f"Batch search: {len(results)} unique locations around {len(points)} points "
+            f"(radius={radius_meters}m, category={category})"
+        )
+        return results
+
+    # =========================================================================
+    # Corridor Search: locations along a route
+    # =========================================================================
+    async def search_corridor(
+        self,
+        db: AsyncSession,
+        points: list[tuple[float, float]],
+        buffer_meters: int = 200,
+        category: LocationCategory | None = None,
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+    ) -> tuple[list[tuple[Location, float, float]], tuple[float, int] | None]:
+        """
+        Approved locations within `buffer_meters` of a route, in route order.
+
+        The route is bound as a single WKT parameter; ST_DWithin against its
+        geography uses the GIST index on locations.geom, and results are ordered
+        by ST_LineLocatePoint (fraction 0..1 along the route). Paging is keyset
+        on (fraction, id), so later pages cost the same as the first.
+
+        Args:
+            db: Database session
+            points: Route vertices as (latitude, longitude), at least two
+            buffer_meters: Corridor half-width in meters
+            category: Optional category filter
+            limit: Page size
+            after: Cursor (fraction, id) of the last item of the previous page
+
+        Returns:
+            Tuple of ([(location, route fraction, distance in meters)], next cursor or None)
+        """
+        wkt = "LINESTRING(" + ",".join(f"{lng} {lat}" for lat, lng in points) + ")"
+        route = func.ST_GeomFromText(wkt, 4326)
+        route_geog = func.Geography(route)
+        fraction = func.ST_LineLocatePoint(route, func.Geometry(Location.geom))
+        distance = ST_Distance(Location.geom, route_geog)
+
+        stmt = (
+            select(Location, fraction.label("fraction"), distance.label("distance"))
+            .options(selectinload(Location.images))
+            .where(
+                ST_DWithin(Location.geom, route_geog, buffer_meters),
+                Location.status == LocationStatus.approved,
+            )
+        )
+        if category:
+            stmt = stmt.where(Location.category == category)
+        if after is not None:
+            stmt = stmt.where(tuple_(fraction, Location.id) > tuple_(*after))
+
+        stmt = stmt.order_by(fraction, Location.id).limit(limit + 1)
+        rows = (await db.execute(stmt)).all()
+
+        has_more = len(rows) > limit
+        results = [(row[0], row[1], row[2]) for row in rows[:limit]]
+        next_cursor = (results[-1][1], results[-1][0].id) if has_more else None
+
+        logger.info(
+            f"Corridor search: {len(results)} locations along {len(points)}-point route "
+            f"(buffer={buffer_meters}m, category={category}, more={has_more})"
+        )
+        return results, next_cursor
+
     # =========================================================================
     # BE-3.6: Simple Radius Search (convenience method)
     # =========================================================================
@@ -0,0 +1,302 @@
+"""
+SatVach In-Process Spatial Index
+Optional in-memory replica of approved locations for fast radius, viewport and
+KNN queries without a PostGIS round trip.
+
+Points live in NumPy arrays sorted by grid cell; a query scans only the cell
+rows overlapping its bounding box and computes haversine distances vectorized.
+The replica is loaded once from the database, then kept fresh by realtime
+events (NOTIFY) and a periodic catch-up read of the location change feed.
+
+Distances are spherical (haversine) while PostGIS geography uses the WGS84
+spheroid; results can differ by ~0.3% at the radius boundary.
+"""
+
+import asyncio
+import logging
+import math
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.location import Location, LocationCategory, LocationStatus
+from src.models.location_change import LocationChangeOp
+from src.services.change_feed_service import change_feed_service
+from src.services.realtime_service import LocationEvent, LocationEventType
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE_LAT = 111_320.0
+_GRID_ROW_STRIDE = 1 << 32  # Cell key = ix * stride + iy (iy offset to stay positive)
+_GRID_IY_OFFSET = 1 << 31
+MAX_GRID_ROWS_PER_QUERY = 2048
+_CATEGORIES = list(LocationCategory)
+_CATEGORY_CODES = {category: code for code, category in enumerate(_CATEGORIES)}
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Vectorized great-circle distance in meters from one point to many."""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lngs - lng)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Grid-indexed point set backed by NumPy arrays.
+
+    Writes go to a dict and mark the arrays dirty; arrays are rebuilt lazily
+    on the next query, so a burst of events costs one rebuild.
+    """
+
+    def __init__(self, cell_size: float = 0.01):
+        self.cell_size = cell_size
+        self._points: dict[int, tuple[float, float, int]] = {}
+        self._dirty = True
+        self.ids = np.empty(0, dtype=np.int64)
+        self.lats = np.empty(0, dtype=np.float64)
+        self.lngs = np.empty(0, dtype=np.float64)
+        self.categories = np.empty(0, dtype=np.int8)
+        self._keys = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+    def upsert(self, location_id: int, lat: float, lng: float, category: LocationCategory) -> None:
+        self._points[location_id] = (lat, lng, _CATEGORY_CODES[category])
+        self._dirty = True
+
+    def remove(self, location_id: int) -> None:
+        if self._points.pop(location_id, None) is not None:
+            self._dirty = True
+
+    def replace_all(self, points: dict[int, tuple[float, float, LocationCategory]]) -> None:
+        self._points = {
+            loc_id: (lat, lng, _CATEGORY_CODES[category])
+            for loc_id, (lat, lng, category) in points.items()
+        }
+        self._dirty = True
+
+    # =========================================================================
+    # Grid
+    # =========================================================================
+    def _cell_keys(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        ix = np.floor(lngs / self.cell_size).astype(np.int64)
+        iy = np.floor(lats / self.cell_size).astype(np.int64) + _GRID_IY_OFFSET
+        return ix * _GRID_ROW_STRIDE + iy
+
+    def _rebuild(self) -> None:
+        if not self._dirty:
+            return
+        n = len(self._points)
+        ids = np.fromiter(self._points.keys(), dtype=np.int64, count=n)
+        values = np.array(list(self._points.values()), dtype=np.float64).reshape(n, 3)
+        lats, lngs = values[:, 0], values[:, 1]
+        keys = self._cell_keys(lats, lngs)
+
+        order = np.argsort(keys, kind="stable")
+        self.ids = ids[order]
+        self.lats = np.ascontiguousarray(lats[order])
+        self.lngs = np.ascontiguousarray(lngs[order])
+        self.categories = values[order, 2].astype(np.int8)
+        self._keys = keys[order]
+        self._dirty = False
+
+    def _candidates(
+        self, min_lng: float, min_lat: float, max_lng: float, max_lat: float
+    ) -> np.ndarray:
+        """Indices of points in grid cells overlapping the bbox."""
+        self._rebuild()
+        x0 = math.floor(min_lng / self.cell_size)
+        x1 = math.floor(max_lng / self.cell_size)
+        y0 = math.floor(min_lat / self.cell_size) + _GRID_IY_OFFSET
+        y1 = math.floor(max_lat / self.cell_size) + _GRID_IY_OFFSET
+
+        if x1 - x0 >= MAX_GRID_ROWS_PER_QUERY:
+            return np.arange(len(self.ids))  # Very wide box: a full scan is cheaper
+
+        rows = np.arange(x0, x1 + 1, dtype=np.int64) * _GRID_ROW_STRIDE
+        starts = np.searchsorted(self._keys, rows + y0, side="left")
+        ends = np.searchsorted(self._keys, rows + y1, side="right")
+        slices = [np.arange(s, e) for s, e in zip(starts, ends, strict=True) if e > s]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def _filter_category(
+        self, idx: np.ndarray, category: LocationCategory | None
+    ) -> np.ndarray:
+        if category is None:
+            return idx
+        return idx[self.categories[idx] == _CATEGORY_CODES[category]]
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+    def radius(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        category: LocationCategory | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Points within `radius_m`, nearest first.
+
+        Returns:
+            Tuple of (ids, distances in meters)
+        """
+        dlat = radius_m / METERS_PER_DEGREE_LAT
+        dlng = radius_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        idx = self._candidates(lng - dlng, lat - dlat, lng + dlng, lat + dlat)
+        idx = self._filter_category(idx, category)
+
+        dist = haversine_m(lat, lng, self.lats[idx], self.lngs[idx])
+        inside = dist <= radius_m
+        idx, dist = idx[inside], dist[inside]
+
+        order = np.argsort(dist, kind="stable")
+        return self.ids[idx[order]], dist[order]
+
+    def viewport(
+        self,
+        min_lng: float,
+        min_lat: float,
+        max_lng: float,
+        max_lat: float,
+        category: LocationCategory | None = None,
+        limit: int = 100,
+    ) -> np.ndarray:
+        """IDs of points inside the bbox (at most `limit`)."""
+        idx = self._candidates(min_lng, min_lat, max_lng, max_lat)
+        idx = self._filter_category(idx, category)
+        lats, lngs = self.lats[idx], self.lngs[idx]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+        return self.ids[idx[inside]][:limit]
+
+    def knn(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        category: LocationCategory | None = None,
+        max_radius_m: float = 50_000,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The `k` nearest points within `max_radius_m`, growing the search ring
+        until enough candidates are found.
+
+        Returns:
+            Tuple of (ids, distances in meters)
+        """
+        radius_m = min(1_000.0, max_radius_m)
+        while True:
+            ids, dist = self.radius(lat, lng, radius_m, category)
+            if len(ids) >= k or radius_m >= max_radius_m:
+                return ids[:k], dist[:k]
+            radius_m = min(radius_m * 4, max_radius_m)
+
+
+class SpatialReplica:
+    """Keeps a `SpatialIndex` in sync with approved locations in the database."""
+
+    def __init__(self):
+        self.index = SpatialIndex(cell_size=settings.SPATIAL_INDEX_CELL_DEGREES)
+        self.version = 0
+        self.ready = False
+        self._sync_task: asyncio.Task | None = None
+
+    async def load(self, db: AsyncSession) -> None:
+        """Full load of approved locations (version read first, see bundles)."""
+        version = await change_feed_service.current_version(db)
+        stmt = select(
+            Location.id, Location.latitude, Location.longitude, Location.category
+        ).where(Location.status == LocationStatus.approved)
+        rows = await db.execute(stmt)
+        self.index.replace_all(
+            {row.id: (row.latitude, row.longitude, row.category) for row in rows}
+        )
+        self.version = version
+        self.ready = True
+        logger.info(f"Spatial replica loaded: {len(self.index)} points @ version {version}")
+
+    async def sync(self, db: AsyncSession) -> int:
+        """
+        Apply change-feed entries after the replica's version.
+
+        Returns:
+            Number of log entries applied
+        """
+        applied = 0
+        while True:
+            latest, next_since, has_more = await change_feed_service.read(db, self.version)
+            if not latest:
+                return applied
+
+            upsert_ids = [i for i, op in latest.items() if op == LocationChangeOp.upsert]
+            visible: set[int] = set()
+            if upsert_ids:
+                stmt = select(
+                    Location.id, Location.latitude, Location.longitude, Location.category
+                ).where(Location.id.in_(upsert_ids), Location.status == LocationStatus.approved)
+                for row in await db.execute(stmt):
+                    self.index.upsert(row.id, row.latitude, row.longitude, row.category)
+                    visible.add(row.id)
+            for loc_id in latest:
+                if loc_id not in visible:
+                    self.index.remove(loc_id)
+
+            applied += len(latest)
+            self.version = next_since
+            if not has_more:
+                return applied
+
+    def apply_event(self, event: LocationEvent) -> None:
+        """Realtime handler: apply NOTIFY events ahead of the next sync."""
+        if event.type == LocationEventType.deleted:
+            self.index.remove(event.id)
+        elif event.category is not None:
+            self.index.upsert(
+                event.id, event.latitude, event.longitude, LocationCategory(event.category)
+            )
+
+    async def _sync_forever(self, session_factory) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    if not self.ready:
+                        await self.load(db)
+                    else:
+                        await self.sync(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Spatial replica sync failed: {e}")
+            await asyncio.sleep(settings.SPATIAL_INDEX_SYNC_SECONDS)
+
+    async def start(self, session_factory) -> None:
+        """Start the background load/sync task (idempotent)."""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_forever(session_factory))
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+
+# Singleton instance
+spatial_replica = SpatialReplica()
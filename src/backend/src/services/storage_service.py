@@ -252,6 +252,51 @@ class StorageService:
             "filename": f"{uuid4()}.{ext}",
         }
 
+    # =========================================================================
+    # Utility: Upload Raw Bytes (generated artifacts, e.g. offline bundles)
+    # =========================================================================
+    async def upload_bytes(
+        self,
+        s3_key: str,
+        content: bytes,
+        content_type: str,
+        cache_control: str | None = None,
+    ) -> str:
+        """
+        Upload pre-built bytes to S3/MinIO under a fixed key.
+
+        Args:
+            s3_key: Target S3 object key
+            content: Object body
+            content_type: Content-type to store
+            cache_control: Optional Cache-Control header for the object
+
+        Returns:
+            Public URL of the object
+
+        Raises:
+            StorageServiceError: If upload fails
+        """
+        extra = {"CacheControl": cache_control} if cache_control else {}
+        try:
+            async with await self._get_client() as s3:
+                await s3.put_object(
+                    Bucket=self.bucket,
+                    Key=s3_key,
+                    Body=content,
+                    ContentType=content_type,
+                    **extra,
+                )
+        except ClientError as e:
+            logger.error(f"S3 upload failed: {e}")
+            raise StorageServiceError(f"Upload failed: {e}")
+
+        return self.public_url(s3_key)
+
+    def public_url(self, s3_key: str) -> str:
+        """Build the public (browser-facing) URL for an object key."""
+        return f"{self.public_endpoint}/{self.bucket}/{s3_key}"
+
     # =========================================================================
     # BE-3.4: Delete Image
     # =========================================================================
@@ -5,6 +5,7 @@ User Service
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.principal import principal_cache
 from src.models.user import User
 from src.schemas.user import UserUpdate
 
@@ -38,6 +39,7 @@ class UserService:
 
         db.add(db_obj)
         await db.commit()
+        principal_cache.invalidate(db_obj.id)
         await db.refresh(db_obj)
         return db_obj
 
@@ -49,6 +51,7 @@ class UserService:
         user.is_active = is_active
         db.add(user)
         await db.commit()
+        principal_cache.invalidate(id)
         await db.refresh(user)
         return user
 
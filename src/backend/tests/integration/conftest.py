@@ -1,10 +1,16 @@
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from src.core.config import settings
-from src.core.deps import get_db, get_s3_client
+from src.core.deps import get_db, get_read_db, get_s3_client
+from src.core.principal import principal_cache
+from src.core.rate_limit import limiter
 from src.main import app
+from src.services.search_service import search_service
 
 
 @pytest.fixture
@@ -47,11 +53,16 @@ async def async_client(db_session):
     Fixture for AsyncClient with overridden DB dependency.
     """
 
+    # Buckets are shared across runs (tmpfs); start each test with full ones
+    limiter.reset()
+
     # Override get_db to use our rollback-session
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Reads see the uncommitted test data only through the same session
+    app.dependency_overrides[get_read_db] = override_get_db
 
     async def override_get_s3():
         # Mock S3 client using a simple async mock that mimics aioboto3 client
@@ -75,8 +86,20 @@ async def async_client(db_session):
 
     app.dependency_overrides[get_s3_client] = override_get_s3
 
+    # Shared searches open their own sessions; hand them the rollback session too
+    @asynccontextmanager
+    async def test_session():
+        yield db_session
+
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        yield client
+    with (
+        patch.object(search_service, "_session_maker_factory", lambda: test_session),
+        patch.object(search_service, "_primary_session_maker_factory", lambda: test_session),
+    ):
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
 
     app.dependency_overrides.clear()
+    # Rolled-back rows must not survive in the per-worker caches
+    principal_cache.clear()
+    search_service.invalidate()
@@ -0,0 +1,84 @@
+"""
+Query budget harness for integration tests.
+
+Counts the SQL statements an engine executes and the ORM instances loaded while
+a block runs, so endpoint tests can fail when a model or query change adds
+queries (N+1 through lazy/eager relationships) or loads more rows than the
+response needs.
+"""
+
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.db.base import Base
+
+# Transaction bookkeeping from the rollback fixtures, not endpoint work
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Upper bounds for one request."""
+
+    max_queries: int
+    max_rows: int  # ORM instances loaded (all mapped classes)
+
+
+@dataclass
+class QueryCounter:
+    """Statements and loaded instances recorded by `count_queries`."""
+
+    statements: list[str] = field(default_factory=list)
+    rows: Counter = field(default_factory=Counter)
+
+    @property
+    def query_count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def row_count(self) -> int:
+        return sum(self.rows.values())
+
+    def report(self) -> str:
+        lines = [f"{self.query_count} queries, {self.row_count} rows {dict(self.rows)}"]
+        lines += [f"  [{i}] {' '.join(sql.split())[:300]}" for i, sql in enumerate(self.statements)]
+        return "\n".join(lines)
+
+    def assert_within(self, budget: QueryBudget, label: str) -> None:
+        assert self.query_count <= budget.max_queries, (
+            f"{label}: {self.query_count} queries > budget {budget.max_queries}\n{self.report()}"
+        )
+        assert self.row_count <= budget.max_rows, (
+            f"{label}: {self.row_count} rows > budget {budget.max_rows}\n{self.report()}"
+        )
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Iterator[QueryCounter]:
+    """
+    Record statements executed on `engine` and ORM loads while the block runs.
+
+    Instances already in a session's identity map are not reloaded (and not
+    counted), so expunge seeded objects before measuring.
+    """
+    counter = QueryCounter()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(_IGNORED_PREFIXES):
+            counter.statements.append(statement)
+
+    def on_load(target, context):
+        counter.rows[type(target).__name__] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(Base, "load", on_load, propagate=True)
+    try:
+        yield counter
+    finally:
+        event.remove(Base, "load", on_load)
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
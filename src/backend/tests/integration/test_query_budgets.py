@@ -0,0 +1,285 @@
+"""
+Query-count regression guard for hot endpoints.
+
+Each endpoint is measured twice, before and after seeding more data: the
+statement count must not change with the data size (no N+1), and both runs
+must stay within the declared budget of queries and loaded ORM rows.
+
+Needs the seeded local PostGIS used by the other integration tests.
+"""
+
+import itertools
+
+import pytest
+from httpx import AsyncClient
+from query_budget import QueryBudget, count_queries
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.security import create_access_token
+from src.models.image import Image
+from src.models.location import Location, LocationCategory, LocationStatus
+from src.models.moderation_log import ModerationAction, ModerationLog
+from src.models.post import Post, PostComment, PostImage, PostLike
+from src.models.user import User
+from src.services.dashboard_service import dashboard_service
+from src.services.location_service import location_service
+from src.services.search_service import search_service
+
+CENTER = (21.0285, 105.8544)  # Hanoi (lat, lng)
+PAGE = 10
+
+# Declared budgets. Raising one needs a reason in the commit that does it.
+BUDGETS = {
+    # count, page, Location.images (Location.user is raise_on_sql)
+    "search": QueryBudget(max_queries=3, max_rows=40),
+    # page, Location.images
+    "viewport": QueryBudget(max_queries=2, max_rows=40),
+    # count, page, author, likes (+user joined), comments, comment users, images
+    "posts": QueryBudget(max_queries=7, max_rows=90),
+    # page, author, likes (+user joined), comments, comment users, images
+    "post_detail": QueryBudget(max_queries=6, max_rows=20),
+    # current user, grouped counts, recent locations page + images
+    "dashboard": QueryBudget(max_queries=4, max_rows=20),
+    # current user only: aggregates served from the cache
+    "dashboard_cached": QueryBudget(max_queries=1, max_rows=1),
+}
+
+_seq = itertools.count()
+
+
+# =============================================================================
+# Seeding
+# =============================================================================
+def _user(superuser: bool = False) -> User:
+    n = next(_seq)
+    return User(
+        email=f"budget{n}@example.com",
+        username=f"budget{n}",
+        hashed_password="not-a-real-hash",
+        is_active=True,
+        is_superuser=superuser,
+    )
+
+
+async def _seed_users(db: AsyncSession) -> dict:
+    users = {
+        "author": _user(),
+        "admin": _user(superuser=True),
+        "others": [_user() for _ in range(3)],
+    }
+    db.add_all([users["author"], users["admin"], *users["others"]])
+    await db.flush()
+    return users
+
+
+async def _seed_locations(db: AsyncSession, owner: User, count: int) -> None:
+    """Approved locations around CENTER, two images and two log entries each."""
+    lat, lng = CENTER
+    for _ in range(count):
+        n = next(_seq)
+        location = Location(
+            title=f"Budget place {n}",
+            category=LocationCategory.cafe,
+            status=LocationStatus.approved,
+            geom=f"SRID=4326;POINT({lng + (n % 50) * 0.0005} {lat + (n % 40) * 0.0005})",
+            user_id=owner.id,
+        )
+        db.add(location)
+        await db.flush()
+        db.add_all(
+            [
+                Image(
+                    location_id=location.id,
+                    filename=f"{n}-{i}.webp",
+                    s3_key=f"budget/{n}-{i}.webp",
+                    url=f"http://minio/budget/{n}-{i}.webp",
+                    content_type="image/webp",
+                    size_bytes=1024,
+                    display_order=i + 1,
+                )
+                for i in range(2)
+            ]
+        )
+        db.add_all(
+            [
+                ModerationLog(location_id=location.id, action=ModerationAction.submitted),
+                ModerationLog(location_id=location.id, action=ModerationAction.approved),
+            ]
+        )
+    await db.flush()
+
+
+async def _seed_posts(db: AsyncSession, author: User, others: list[User], count: int) -> Post:
+    """Published posts with a like per other user, two comments and an image each."""
+    post = None
+    for _ in range(count):
+        n = next(_seq)
+        post = Post(author_id=author.id, title=f"Budget post {n}", content="<p>Hi</p>")
+        db.add(post)
+        await db.flush()
+        db.add_all([PostLike(post_id=post.id, user_id=u.id) for u in others])
+        db.add_all(
+            [PostComment(post_id=post.id, user_id=u.id, content="Nice") for u in others[:2]]
+        )
+        db.add(PostImage(post_id=post.id, image_url=f"http://minio/posts/{n}.webp"))
+    await db.flush()
+    return post
+
+
+async def _measure(client: AsyncClient, engine, db: AsyncSession, url: str, **kwargs):
+    """Request `url` with a cold identity map and return the response and counter."""
+    db.expunge_all()
+    with count_queries(engine) as counter:
+        response = await client.get(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response, counter
+
+
+def _assert_budget(name: str, small, large) -> None:
+    assert small.query_count == large.query_count, (
+        f"{name}: query count grows with data ({small.query_count} -> {large.query_count})\n"
+        f"{large.report()}"
+    )
+    small.assert_within(BUDGETS[name], name)
+    large.assert_within(BUDGETS[name], name)
+
+
+# =============================================================================
+# Budgets
+# =============================================================================
+@pytest.mark.asyncio
+async def test_search_query_budget(async_client: AsyncClient, db_session, test_engine):
+    users = await _seed_users(db_session)
+    params = {"latitude": CENTER[0], "longitude": CENTER[1], "radius": 5000, "limit": PAGE}
+
+    # Seeding bypasses the service hooks, so drop shared pages before each measurement
+    await _seed_locations(db_session, users["author"], 3)
+    search_service.invalidate()
+    _, small = await _measure(
+        async_client, test_engine, db_session, "/api/v1/locations/search", params=params
+    )
+    await _seed_locations(db_session, users["author"], 25)
+    search_service.invalidate()
+    response, large = await _measure(
+        async_client, test_engine, db_session, "/api/v1/locations/search", params=params
+    )
+
+    assert len(response.json()["items"]) == PAGE
+    _assert_budget("search", small, large)
+
+
+@pytest.mark.asyncio
+async def test_viewport_query_budget(async_client: AsyncClient, db_session, test_engine):
+    users = await _seed_users(db_session)
+    lat, lng = CENTER
+    params = {
+        "min_lng": lng - 0.05,
+        "min_lat": lat - 0.05,
+        "max_lng": lng + 0.05,
+        "max_lat": lat + 0.05,
+        "limit": PAGE,
+    }
+
+    # Seeding bypasses the service hooks, so drop shared pages before each measurement
+    await _seed_locations(db_session, users["author"], 3)
+    search_service.invalidate()
+    _, small = await _measure(
+        async_client, test_engine, db_session, "/api/v1/locations/viewport", params=params
+    )
+    await _seed_locations(db_session, users["author"], 25)
+    search_service.invalidate()
+    response, large = await _measure(
+        async_client, test_engine, db_session, "/api/v1/locations/viewport", params=params
+    )
+
+    assert len(response.json()) == PAGE
+    _assert_budget("viewport", small, large)
+
+
+@pytest.mark.asyncio
+async def test_posts_query_budget(async_client: AsyncClient, db_session, test_engine):
+    users = await _seed_users(db_session)
+    # Authors with many locations must not drag them into post responses
+    await _seed_locations(db_session, users["author"], 10)
+    params = {"limit": PAGE}
+
+    await _seed_posts(db_session, users["author"], users["others"], 3)
+    _, small = await _measure(async_client, test_engine, db_session, "/api/v1/posts", params=params)
+    await _seed_posts(db_session, users["author"], users["others"], 25)
+    response, large = await _measure(
+        async_client, test_engine, db_session, "/api/v1/posts", params=params
+    )
+
+    assert len(response.json()["items"]) == PAGE
+    _assert_budget("posts", small, large)
+
+
+@pytest.mark.asyncio
+async def test_post_detail_query_budget(async_client: AsyncClient, db_session, test_engine):
+    users = await _seed_users(db_session)
+    await _seed_locations(db_session, users["author"], 10)
+
+    post = await _seed_posts(db_session, users["author"], users["others"], 1)
+    _, small = await _measure(async_client, test_engine, db_session, f"/api/v1/posts/{post.id}")
+    await _seed_posts(db_session, users["author"], users["others"], 10)
+    _, large = await _measure(async_client, test_engine, db_session, f"/api/v1/posts/{post.id}")
+
+    _assert_budget("post_detail", small, large)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_query_budget(async_client: AsyncClient, db_session, test_engine):
+    users = await _seed_users(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(users['admin'].id)}"}
+
+    url = "/api/v1/admin/dashboard/stats"
+
+    # Seeding bypasses the service hooks, so measure the uncached path explicitly
+    await _seed_locations(db_session, users["author"], 3)
+    dashboard_service.invalidate()
+    _, small = await _measure(async_client, test_engine, db_session, url, headers=headers)
+    await _seed_locations(db_session, users["author"], 25)
+    dashboard_service.invalidate()
+    _, large = await _measure(async_client, test_engine, db_session, url, headers=headers)
+    _assert_budget("dashboard", small, large)
+
+    _, cached = await _measure(async_client, test_engine, db_session, url, headers=headers)
+    cached.assert_within(BUDGETS["dashboard_cached"], "dashboard_cached")
+    dashboard_service.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_raise_on_sql_relationships_stay_unloaded_on_writes(
+    async_client: AsyncClient, db_session
+):
+    """Moderation, bans and deletes must not touch User.locations/Location.moderation_logs."""
+    users = await _seed_users(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(users['admin'].id)}"}
+    await _seed_locations(db_session, users["author"], 2)
+    location_ids = (
+        await db_session.scalars(select(Location.id).where(Location.user_id == users["author"].id))
+    ).all()
+    db_session.expunge_all()
+
+    response = await async_client.patch(
+        f"/api/v1/admin/locations/{location_ids[0]}/status",
+        json={"status": "rejected", "reason": "Duplicate"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    response = await async_client.patch(
+        f"/api/v1/admin/users/{users['author'].id}/status",
+        json={"is_active": False},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    # Logs go with the location via ON DELETE CASCADE (passive_deletes)
+    db_session.expunge_all()
+    assert await location_service.delete(db_session, location_ids[1])
+    remaining = await db_session.scalar(
+        select(func.count(ModerationLog.id)).where(ModerationLog.location_id == location_ids[1])
+    )
+    assert remaining == 0
@@ -0,0 +1,384 @@
+"""
+Reproducible API benchmark suite.
+
+Seeds a deterministic dataset (see datasets.py), replays fixed scenarios against
+a running API and writes latency percentiles and throughput as JSON, so results
+from two commits can be compared on the same data.
+
+Usage (from src/backend, against a dedicated benchmark database):
+    python tests/performance/benchmark.py seed --size 100k
+    RATE_LIMIT_ENABLED=false uvicorn src.main:app --workers 4    # separate shell
+    # (also LOAD_SHED_ENABLED=false to measure past the point where 503s start)
+    python tests/performance/benchmark.py run --size 100k --out before.json
+    python tests/performance/benchmark.py compare before.json after.json
+
+Scenarios are generated from the dataset seed, so every run sends the same
+requests in the same order. `image_optimize` and `rate_limit_*` run in-process
+(no server); the latter measure the limiter's per-request overhead.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+sys.path.append(os.getcwd())
+sys.path.append(os.path.dirname(__file__))
+
+import httpx  # noqa: E402
+from datasets import (  # noqa: E402
+    DEFAULT_SEED,
+    SEARCH_TERMS,
+    SIZES,
+    DatasetSpec,
+    hotspots,
+    load_dataset,
+    table_is_empty,
+)
+
+API = "/api/v1"
+
+Request = tuple[str, dict]  # (path, query params)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A named request generator; `make` is called once per request."""
+
+    name: str
+    make: Callable[[random.Random], Request]
+
+
+def _near_hotspot(rng: random.Random, spots) -> tuple[float, float]:
+    """A query point drawn like the data: popular hotspots get more traffic."""
+    spot = rng.choices(spots, weights=[s.weight for s in spots])[0]
+    jitter = 0.002
+    return spot.lat + rng.uniform(-jitter, jitter), spot.lng + rng.uniform(-jitter, jitter)
+
+
+def _viewport(rng: random.Random, spots, zoom: int) -> Request:
+    """Bounding box of a ~1024x768 px map at a web-mercator zoom level."""
+    lat, lng = _near_hotspot(rng, spots)
+    width = 360 / 2**zoom * 4  # 4 tiles of 256 px
+    height = width * 0.75 * math.cos(math.radians(lat))
+    return f"{API}/locations/viewport", {
+        "min_lng": round(lng - width / 2, 6),
+        "min_lat": round(lat - height / 2, 6),
+        "max_lng": round(lng + width / 2, 6),
+        "max_lat": round(lat + height / 2, 6),
+        "limit": 100,
+    }
+
+
+def build_scenarios(seed: int, size: str = "10k") -> list[Scenario]:
+    spots = hotspots(seed)
+
+    def radius(meters: int) -> Callable[[random.Random], Request]:
+        def make(rng):
+            lat, lng = _near_hotspot(rng, spots)
+            return f"{API}/locations/search", {"latitude": lat, "longitude": lng, "radius": meters}
+
+        return make
+
+    def text_search(rng):
+        lat, lng = _near_hotspot(rng, spots)
+        params = {"latitude": lat, "longitude": lng, "radius": 5000}
+        return f"{API}/locations/search", {**params, "query": rng.choice(SEARCH_TERMS)}
+
+    def deep_pagination(rng):
+        lat, lng = _near_hotspot(rng, spots)
+        skip = rng.choice([200, 500, 1000, 2000])
+        params = {"latitude": lat, "longitude": lng, "radius": 20000}
+        return f"{API}/locations/search", {**params, "skip": skip, "limit": 20}
+
+    def location_detail(rng):
+        # Seeded into an empty database, so IDs run 1..N
+        return f"{API}/locations/{rng.randint(1, SIZES[size])}", {}
+
+    def post_feed(rng):
+        return f"{API}/posts", {"skip": rng.choice([0, 0, 0, 20, 40, 100]), "limit": 20}
+
+    return [
+        Scenario("health", lambda rng: ("/health", {})),
+        Scenario("location_detail", location_detail),
+        Scenario("radius_500m", radius(500)),
+        Scenario("radius_2km", radius(2000)),
+        Scenario("radius_10km", radius(10000)),
+        Scenario("text_search", text_search),
+        Scenario("deep_pagination", deep_pagination),
+        Scenario("viewport_z12", lambda rng: _viewport(rng, spots, 12)),
+        Scenario("viewport_z14", lambda rng: _viewport(rng, spots, 14)),
+        Scenario("viewport_z16", lambda rng: _viewport(rng, spots, 16)),
+        Scenario("post_feed", post_feed),
+    ]
+
+
+# =============================================================================
+# Statistics
+# =============================================================================
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int, statuses: dict) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": _ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "p50_ms": _ms(percentile(ordered, 50)),
+        "p95_ms": _ms(percentile(ordered, 95)),
+        "p99_ms": _ms(percentile(ordered, 99)),
+        "max_ms": _ms(ordered[-1]) if ordered else 0.0,
+    }
+
+
+# =============================================================================
+# Runners
+# =============================================================================
+async def run_http_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    seed: int,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    planned = [scenario.make(rng) for _ in range(warmup + requests)]
+    for path, params in planned[:warmup]:
+        await client.get(path, params=params)
+
+    queue = iter(planned[warmup:])
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for path, params in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                code = str(response.status_code)
+            except httpx.HTTPError:
+                code = "error"
+            latencies.append(time.perf_counter() - start)
+            statuses[code] = statuses.get(code, 0) + 1
+            if code == "error" or int(code) >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors, statuses)
+
+
+def _sample_photo(seed: int, size: tuple[int, int] = (4032, 3024)) -> bytes:
+    """A phone-sized JPEG with noise, so encoders can't shortcut flat colour."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    width, height = size[0] // 16, size[1] // 16
+    small = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    buffer = io.BytesIO()
+    small.resize(size).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run_image_optimize(seed: int, requests: int, warmup: int) -> dict:
+    from src.services.storage_service import storage_service
+
+    photo = _sample_photo(seed)
+    for _ in range(warmup):
+        storage_service.optimize_image(photo)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        storage_service.optimize_image(photo)
+        latencies.append(time.perf_counter() - t0)
+    result = summarize(latencies, time.perf_counter() - start, 0, {})
+    result["input_bytes"] = len(photo)
+    return result
+
+
+def run_rate_limit_check(storage: str, seed: int, requests: int) -> dict:
+    """Per-request cost of one token-bucket check across 10k client keys."""
+    import tempfile
+
+    from src.core.rate_limit import MemoryBucketStore, RateLimit, SharedBucketStore
+
+    limit = RateLimit.parse("100/minute")
+    with tempfile.TemporaryDirectory() as tmp:
+        if storage == "shared":
+            store = SharedBucketStore(os.path.join(tmp, "buckets"), slots=65536)
+        else:
+            store = MemoryBucketStore(maxsize=65536)
+        rng = random.Random(seed)
+        keys = [f"search:10.0.{rng.randrange(40)}.{rng.randrange(256)}" for _ in range(requests)]
+
+        latencies = []
+        start = time.perf_counter()
+        for key in keys:
+            t0 = time.perf_counter()
+            store.hit(key, limit)
+            latencies.append(time.perf_counter() - t0)
+        result = summarize(latencies, time.perf_counter() - start, 0, {})
+        if storage == "shared":
+            store.close()
+    return result
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    scenarios = build_scenarios(args.seed, args.size)
+    wanted = set(args.scenarios.split(",")) if args.scenarios else None
+    if wanted:
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        for scenario in scenarios:
+            results[scenario.name] = await run_http_scenario(
+                client, scenario, args.seed, args.requests, args.concurrency, args.warmup
+            )
+            print(f"{scenario.name:>16}: {_fmt(results[scenario.name])}")
+
+    if not wanted or "image_optimize" in wanted:
+        results["image_optimize"] = run_image_optimize(
+            args.seed, max(1, args.requests // 20), warmup=2
+        )
+        print(f"{'image_optimize':>16}: {_fmt(results['image_optimize'])}")
+
+    for storage in ("memory", "shared"):
+        name = f"rate_limit_{storage}"
+        if not wanted or name in wanted:
+            results[name] = run_rate_limit_check(storage, args.seed, args.requests * 100)
+            print(f"{name:>16}: {_fmt(results[name])}")
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "dataset": args.size,
+            "seed": args.seed,
+            "base_url": args.base_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": results,
+    }
+
+
+def _fmt(result: dict) -> str:
+    return (
+        f"p50 {result['p50_ms']:8.2f} ms | p95 {result['p95_ms']:8.2f} ms | "
+        f"p99 {result['p99_ms']:8.2f} ms | {result['throughput_rps']:8.1f} rps | "
+        f"errors {result['errors']}"
+    )
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Print per-scenario percentile and throughput changes (after vs before)."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"{before['meta'].get('revision')} -> {after['meta'].get('revision')}")
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{key} {old[key]:.2f} -> {new[key]:.2f} ({change:+.1f}%)")
+        print(f"{name:>16}: " + " | ".join(cells))
+
+
+async def seed(args) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from src.core.config import settings
+
+    engine = create_async_engine(args.database_url or settings.DATABASE_URL)
+    try:
+        if not args.append and not await table_is_empty(engine):
+            sys.exit("locations is not empty; seed a dedicated database or pass --append")
+        spec = DatasetSpec.from_name(args.size, args.seed)
+        start = time.perf_counter()
+        counts = await load_dataset(engine, spec)
+        print(f"Seeded {counts} in {time.perf_counter() - start:.0f}s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_cmd = sub.add_parser("seed", help="Load a deterministic dataset")
+    seed_cmd.add_argument("--size", choices=SIZES, default="10k")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    seed_cmd.add_argument("--append", action="store_true", help="Allow a non-empty database")
+
+    run_cmd = sub.add_parser("run", help="Run scenarios against a live API")
+    run_cmd.add_argument("--base-url", default="http://localhost:8000")
+    run_cmd.add_argument("--size", choices=SIZES, default="10k", help="Dataset that was seeded")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--requests", type=int, default=500, help="Per scenario")
+    run_cmd.add_argument("--concurrency", type=int, default=16)
+    run_cmd.add_argument("--warmup", type=int, default=50)
+    run_cmd.add_argument("--scenarios", help="Comma-separated subset")
+    run_cmd.add_argument("--out", help="Write JSON results here")
+
+    compare_cmd = sub.add_parser("compare", help="Compare two result files")
+    compare_cmd.add_argument("before")
+    compare_cmd.add_argument("after")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        asyncio.run(seed(args))
+    elif args.command == "run":
+        report = asyncio.run(run(args))
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {args.out}")
+    else:
+        compare(args.before, args.after)
@@ -0,0 +1,328 @@
+"""
+Deterministic benchmark datasets.
+
+Locations are clustered the way real listings are: most of them in a few cities,
+concentrated around hotspots of very different popularity, with a thin uniform
+background. Titles and descriptions come from a small vocabulary so text search
+has realistic hit rates, and image counts follow a geometric distribution.
+Posts get heavy-tailed (Pareto) like and comment counts.
+
+The same (size, seed) always yields the same rows, and the benchmark scenarios
+draw their query points from the same hotspots, so runs against different
+commits are comparable.
+"""
+
+import itertools
+import math
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.models.image import Image
+from src.models.location import Location, LocationCategory, LocationStatus
+from src.models.post import Post, PostComment, PostLike
+from src.models.user import User
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SEED = 20240601
+BATCH_SIZE = 5_000
+METERS_PER_DEGREE = 111_320.0
+EPOCH = datetime(2025, 1, 1, tzinfo=UTC)  # Timestamps are fixed offsets before this
+
+# (name, lat, lng, share of locations, city radius in degrees)
+CITIES = [
+    ("hanoi", 21.0285, 105.8542, 0.42, 0.15),
+    ("hcmc", 10.7769, 106.7009, 0.38, 0.18),
+    ("danang", 16.0544, 108.2022, 0.10, 0.08),
+    ("haiphong", 20.8449, 106.6881, 0.05, 0.06),
+    ("cantho", 10.0452, 105.7469, 0.05, 0.06),
+]
+HOTSPOTS_PER_CITY = 40
+BACKGROUND_SHARE = 0.1  # Uniform within the city radius
+
+CATEGORY_WEIGHTS = {
+    LocationCategory.food: 30,
+    LocationCategory.cafe: 20,
+    LocationCategory.shop: 15,
+    LocationCategory.service: 10,
+    LocationCategory.entertainment: 7,
+    LocationCategory.health: 5,
+    LocationCategory.education: 5,
+    LocationCategory.travel: 5,
+    LocationCategory.other: 3,
+}
+STATUS_WEIGHTS = {
+    LocationStatus.approved: 90,
+    LocationStatus.pending: 7,
+    LocationStatus.rejected: 3,
+}
+
+NAMES = {
+    LocationCategory.food: ["Pho", "Bun Cha", "Banh Mi", "Com Tam", "Bun Bo", "Lau", "Oc"],
+    LocationCategory.cafe: ["Cafe", "Ca Phe Trung", "Tra Sua", "Coffee House", "Tiem Tra"],
+    LocationCategory.shop: ["Tap Hoa", "Shop", "Cua Hang", "Market", "Boutique"],
+    LocationCategory.service: ["Sua Xe", "Giat Ui", "Cat Toc", "Spa", "Tiem May"],
+    LocationCategory.entertainment: ["Karaoke", "Bida", "Cinema", "Game Center"],
+    LocationCategory.health: ["Nha Thuoc", "Phong Kham", "Nha Khoa", "Gym"],
+    LocationCategory.education: ["Trung Tam Tieng Anh", "Thu Vien", "Lop Ve"],
+    LocationCategory.travel: ["Homestay", "Khach San", "Hostel", "Tour"],
+    LocationCategory.other: ["Dia Diem", "Cho", "Cong Vien"],
+}
+QUALIFIERS = ["Ba", "Co", "Chu", "Anh", "Chi", "Gia Truyen", "Ngon", "Re", "24h", "Xanh"]
+STREETS = [
+    "Hang Bac",
+    "Ly Thuong Kiet",
+    "Tran Hung Dao",
+    "Nguyen Hue",
+    "Le Loi",
+    "Hai Ba Trung",
+    "Pham Ngu Lao",
+    "Bach Dang",
+]
+PHRASES = [
+    "Quan nho, phuc vu nhanh.",
+    "Mo cua tu sang som den khuya.",
+    "Khong gian rong, co cho de xe may.",
+    "Gia ca hop ly, chu quan than thien.",
+    "Noi tieng voi mon dac san dia phuong.",
+    "Co wifi va dieu hoa.",
+    "Nhan dat ban qua dien thoai.",
+]
+
+# Search terms with a mix of hit rates (common to rare)
+SEARCH_TERMS = ["pho", "cafe", "banh mi", "spa", "karaoke", "homestay", "nha khoa"]
+
+
+@dataclass(frozen=True)
+class Hotspot:
+    """A cluster centre; `sigma_m` is the cluster's spread in meters."""
+
+    city: str
+    lat: float
+    lng: float
+    sigma_m: float
+    weight: float
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Row counts derived from a size name."""
+
+    name: str
+    locations: int
+    users: int
+    posts: int
+    seed: int = DEFAULT_SEED
+
+    @classmethod
+    def from_name(cls, name: str, seed: int = DEFAULT_SEED) -> "DatasetSpec":
+        locations = SIZES[name]
+        return cls(
+            name=name,
+            locations=locations,
+            users=max(100, locations // 100),
+            posts=max(200, locations // 20),
+            seed=seed,
+        )
+
+
+def hotspots(seed: int = DEFAULT_SEED) -> list[Hotspot]:
+    """Cluster centres with Pareto-distributed popularity, per city."""
+    rng = random.Random(seed)
+    spots = []
+    for city, lat, lng, share, radius in CITIES:
+        weights = [rng.paretovariate(1.16) for _ in range(HOTSPOTS_PER_CITY)]
+        total = sum(weights)
+        for w in weights:
+            spots.append(
+                Hotspot(
+                    city=city,
+                    lat=lat + rng.uniform(-radius, radius),
+                    lng=lng + rng.uniform(-radius, radius),
+                    sigma_m=rng.choice([150.0, 300.0, 600.0, 1200.0]),
+                    weight=share * w / total,
+                )
+            )
+    return spots
+
+
+def _offset(lat: float, lng: float, north_m: float, east_m: float) -> tuple[float, float]:
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    return lat + north_m / METERS_PER_DEGREE, lng + east_m / (METERS_PER_DEGREE * cos_lat)
+
+
+def _pick(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _batched(rows: Iterator[dict], size: int = BATCH_SIZE) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# =============================================================================
+# Row generators
+# =============================================================================
+def generate_users(spec: DatasetSpec) -> Iterator[dict]:
+    for i in range(spec.users):
+        yield {
+            "email": f"bench{i}@example.com",
+            "username": f"bench{i}",
+            # Not a valid hash: benchmark users never log in
+            "hashed_password": "!",
+            "is_active": True,
+            "is_superuser": False,
+        }
+
+
+def generate_locations(spec: DatasetSpec, user_ids: list[int]) -> Iterator[dict]:
+    """Location rows; `image_count` is popped by the loader."""
+    rng = random.Random(spec.seed + 1)
+    spots = hotspots(spec.seed)
+    # Cumulative weights keep each draw O(log n) at 1M rows
+    spot_weights = list(itertools.accumulate(s.weight for s in spots))
+    # Zipf-ish ownership: a few heavy contributors
+    owner_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(user_ids))))
+    city_centres = {name: (lat, lng, radius) for name, lat, lng, _, radius in CITIES}
+
+    for i in range(spec.locations):
+        spot = rng.choices(spots, cum_weights=spot_weights)[0]
+        if rng.random() < BACKGROUND_SHARE:
+            c_lat, c_lng, radius = city_centres[spot.city]
+            lat = c_lat + rng.uniform(-radius, radius)
+            lng = c_lng + rng.uniform(-radius, radius)
+        else:
+            lat, lng = _offset(
+                spot.lat, spot.lng, rng.gauss(0, spot.sigma_m), rng.gauss(0, spot.sigma_m)
+            )
+
+        category = _pick(rng, CATEGORY_WEIGHTS)
+        name = rng.choice(NAMES[category])
+        street = rng.choice(STREETS)
+        created = EPOCH - timedelta(seconds=rng.randint(0, 2 * 365 * 86400))
+        yield {
+            "title": f"{name} {rng.choice(QUALIFIERS)} {i}",
+            "description": " ".join(rng.sample(PHRASES, rng.randint(1, 4))),
+            "address": f"{rng.randint(1, 300)} {street}, {spot.city}",
+            "category": category,
+            "status": _pick(rng, STATUS_WEIGHTS),
+            "geom": f"SRID=4326;POINT({lng:.6f} {lat:.6f})",
+            "user_id": rng.choices(user_ids, cum_weights=owner_weights)[0],
+            "created_at": created,
+            "updated_at": created,
+            # Geometric: ~45% without images, long tail up to 5
+            "image_count": min(5, int(math.log(1 - rng.random()) / math.log(0.55))),
+        }
+
+
+def generate_images(location_id: int, count: int) -> Iterator[dict]:
+    for order in range(count):
+        key = f"bench/{location_id}/{order}.webp"
+        yield {
+            "location_id": location_id,
+            "filename": f"{order}.webp",
+            "s3_key": key,
+            "url": f"http://localhost:9000/satvach-items/{key}",
+            "content_type": "image/webp",
+            "size_bytes": 80_000 + (location_id * 7919 + order) % 400_000,
+            "display_order": order + 1,
+        }
+
+
+def generate_posts(spec: DatasetSpec, user_ids: list[int]) -> Iterator[dict]:
+    """Post rows; `likes` / `comments` (user id lists) are popped by the loader."""
+    rng = random.Random(spec.seed + 2)
+    for i in range(spec.posts):
+        # Heavy tail: most posts get a handful of likes, a few go viral
+        likes = min(len(user_ids), int(rng.paretovariate(1.1)) - 1)
+        comments = min(len(user_ids), int(rng.paretovariate(1.5)) - 1)
+        created = EPOCH - timedelta(seconds=rng.randint(0, 365 * 86400))
+        yield {
+            "author_id": rng.choice(user_ids),
+            "title": f"Bench post {i}",
+            "content": "<p>" + " ".join(rng.sample(PHRASES, 3)) + "</p>",
+            "is_published": rng.random() < 0.95,
+            "created_at": created,
+            "updated_at": created,
+            "likes": rng.sample(user_ids, likes),
+            "comments": [rng.choice(user_ids) for _ in range(comments)],
+        }
+
+
+# =============================================================================
+# Loader
+# =============================================================================
+async def load_dataset(engine: AsyncEngine, spec: DatasetSpec, log=print) -> dict[str, int]:
+    """
+    Insert the dataset in batches. Expects an empty benchmark database.
+
+    Returns:
+        Row counts per table
+    """
+    counts = {"users": 0, "locations": 0, "images": 0, "posts": 0, "likes": 0, "comments": 0}
+
+    async with engine.begin() as conn:
+        user_ids = []
+        for batch in _batched(generate_users(spec)):
+            result = await conn.execute(insert(User).returning(User.id), batch)
+            user_ids.extend(result.scalars())
+        counts["users"] = len(user_ids)
+
+    for batch in _batched(generate_locations(spec, user_ids)):
+        image_counts = [row.pop("image_count") for row in batch]
+        async with engine.begin() as conn:
+            result = await conn.execute(insert(Location).returning(Location.id), batch)
+            location_ids = list(result.scalars())
+            images = [
+                image
+                for location_id, n in zip(location_ids, image_counts, strict=True)
+                for image in generate_images(location_id, n)
+            ]
+            if images:
+                await conn.execute(insert(Image), images)
+        counts["locations"] += len(batch)
+        counts["images"] += len(images)
+        log(f"locations: {counts['locations']}/{spec.locations}")
+
+    for batch in _batched(generate_posts(spec, user_ids)):
+        likes = [row.pop("likes") for row in batch]
+        comments = [row.pop("comments") for row in batch]
+        async with engine.begin() as conn:
+            result = await conn.execute(insert(Post).returning(Post.id), batch)
+            like_rows, comment_rows = [], []
+            post_ids = list(result.scalars())
+            for post_id, liked_by, commented_by in zip(post_ids, likes, comments, strict=True):
+                like_rows += [{"post_id": post_id, "user_id": uid} for uid in liked_by]
+                comment_rows += [
+                    {"post_id": post_id, "user_id": uid, "content": "Hay qua!"}
+                    for uid in commented_by
+                ]
+            if like_rows:
+                await conn.execute(insert(PostLike), like_rows)
+            if comment_rows:
+                await conn.execute(insert(PostComment), comment_rows)
+        counts["posts"] += len(batch)
+        counts["likes"] += len(like_rows)
+        counts["comments"] += len(comment_rows)
+
+    async with engine.begin() as conn:
+        # Fresh statistics so the first benchmark run gets the final plans
+        for table in ("users", "locations", "images", "posts", "post_likes", "post_comments"):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+
+    return counts
+
+
+async def table_is_empty(engine: AsyncEngine) -> bool:
+    async with engine.connect() as conn:
+        return (await conn.scalar(select(func.count()).select_from(Location))) == 0
@@ -1,7 +1,9 @@
 import pytest
 from pydantic import ValidationError
 
+from src.models.location import LocationStatus
 from src.schemas.location import LocationCategory, LocationCreate, LocationSearchParams
+from src.schemas.moderation import BulkModerationRequest
 
 
 class TestLocationSchemas:
@@ -66,3 +68,31 @@ class TestLocationSchemas:
         # Valid
         params = LocationSearchParams(latitude=10, longitude=10, radius=1000)
         assert params.radius == 1000
+
+    def test_location_search_params_district_mode(self):
+        """Test a district replaces the center point, but one of them is required."""
+        params = LocationSearchParams(district_id=3)
+        assert params.district_id == 3
+        assert not params.has_center
+
+        with pytest.raises(ValidationError):
+            LocationSearchParams()
+
+        with pytest.raises(ValidationError):
+            LocationSearchParams(latitude=10.0, district_id=3)
+
+
+class TestModerationSchemas:
+    def test_bulk_moderation_request(self):
+        """Test bulk moderation only approves or rejects, with a bounded batch."""
+        request = BulkModerationRequest(location_ids=[1, 2], status=LocationStatus.approved)
+        assert request.location_ids == [1, 2]
+
+        with pytest.raises(ValidationError):
+            BulkModerationRequest(location_ids=[1], status=LocationStatus.pending)
+
+        with pytest.raises(ValidationError):
+            BulkModerationRequest(location_ids=[], status=LocationStatus.rejected)
+
+        with pytest.raises(ValidationError):
+            BulkModerationRequest(location_ids=list(range(501)), status=LocationStatus.rejected)
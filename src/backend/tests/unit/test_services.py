@@ -1,9 +1,37 @@
+import json
 from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.models.location import Location, LocationStatus
+from src.models.location_change import LocationChangeOp
+from src.models.moderation_log import ModerationAction
 from src.schemas.location import LocationCategory, LocationCreate
+from src.services.change_feed_service import ChangeFeedService
+from src.services.dashboard_service import DashboardService
+from src.services.district_service import (
+    DistrictNotFoundError,
+    DistrictService,
+    district_slug,
+)
 from src.services.location_service import LocationService
+from src.services.moderation_service import ModerationService
+from src.services.offline_bundle_service import (
+    BundlePoint,
+    OfflineBundleService,
+    UnknownRegionError,
+    decode_bundle,
+    encode_bundle,
+)
+from src.services.realtime_service import (
+    LocationEvent,
+    LocationEventType,
+    RealtimeService,
+    Subscription,
+    SubscriptionGrid,
+)
+from src.services.search_service import SearchService
+from src.services.spatial_index import SpatialIndex, haversine_m
 from src.services.storage_service import StorageService
 
 
@@ -25,11 +53,48 @@ class TestLocationService:
 
         # Verify
         assert result.title == "New Café"
-        # Check that we added the location and the log
+        # Location and moderation log; the change-feed entry is one INSERT ... RETURNING
         assert mock_db_session.add.call_count == 2
         mock_db_session.commit.assert_called_once()
         mock_db_session.refresh.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_update_status_logs_action_and_ends_claim(self, mock_db_session):
+        """Test approval logs the approved action and releases a queue lease."""
+        service = LocationService()
+        location = Location(
+            id=1, title="Queued", category=LocationCategory.cafe, status=LocationStatus.pending
+        )
+        location.claimed_by = 9
+        location.latitude, location.longitude = 10.0, 106.0
+        # Moderator 9's lease has expired
+        mock_db_session.execute.return_value.one_or_none.return_value = (9, False)
+
+        with (
+            patch.object(service, "get_by_id", AsyncMock(return_value=location)),
+            patch("src.services.location_service.change_feed_service.record", AsyncMock()),
+            patch("src.services.location_service.realtime_service.notify", AsyncMock()),
+        ):
+            await service.update_status(mock_db_session, 1, LocationStatus.approved)
+
+        log = mock_db_session.add.call_args.args[0]
+        assert log.action == ModerationAction.approved
+        assert location.claimed_by is None
+
+    @pytest.mark.asyncio
+    async def test_update_status_refuses_location_claimed_by_another(self, mock_db_session):
+        """Test a live lease held by another moderator blocks the decision."""
+        from src.services.location_service import LocationClaimedError
+
+        service = LocationService()
+        mock_db_session.execute.return_value.one_or_none.return_value = (9, True)
+
+        with pytest.raises(LocationClaimedError):
+            await service.update_status(
+                mock_db_session, 1, LocationStatus.approved, moderator_id="7"
+            )
+        mock_db_session.add.assert_not_called()
+
 
 class TestStorageService:
     @pytest.mark.asyncio
@@ -87,3 +152,570 @@ class TestStorageService:
                                 Body=b"optimized",
                                 ContentType="image/webp",
                             )
+
+
+class TestOfflineBundleService:
+    def test_bundle_round_trip(self):
+        """Test encoded bundles decode back to the same points."""
+        points = [
+            BundlePoint(
+                id=1,
+                latitude=21.028511,
+                longitude=105.804817,
+                category=LocationCategory.cafe,
+                title="Cà phê Giảng",
+            ),
+            BundlePoint(
+                id=42,
+                latitude=10.762622,
+                longitude=106.660172,
+                category=LocationCategory.food,
+                title="Phở",
+            ),
+        ]
+
+        version, decoded = decode_bundle(encode_bundle(17, points))
+
+        assert version == 17
+        assert decoded == points
+
+    def test_decode_rejects_foreign_payload(self):
+        """Test decoding a non-bundle payload fails."""
+        import gzip
+
+        with pytest.raises(ValueError):
+            decode_bundle(gzip.compress(b"XXXX" + bytes(16)))
+
+    def test_unknown_region(self):
+        """Test unknown regions raise a dedicated error."""
+        with pytest.raises(UnknownRegionError):
+            OfflineBundleService().get_region_bounds("atlantis")
+
+    @pytest.mark.asyncio
+    async def test_delta_removes_only_locations_that_were_in_region(self, mock_db_session):
+        """Test edits elsewhere do not become tombstones in this region's delta."""
+        from types import SimpleNamespace
+
+        upsert, delete = LocationChangeOp.upsert, LocationChangeOp.delete
+        latest = {1: upsert, 2: delete, 3: upsert}
+        mock_db_session.execute.return_value = [
+            SimpleNamespace(
+                id=1, latitude=21.0, longitude=105.8, category=LocationCategory.cafe, title="A"
+            )
+        ]
+        # Of the rest, only 2 was ever logged inside hanoi (3 was edited in hcmc)
+        mock_db_session.scalars.return_value = MagicMock(all=MagicMock(return_value=[2]))
+
+        with patch(
+            "src.services.offline_bundle_service.change_feed_service.read",
+            AsyncMock(return_value=(latest, 20, False)),
+        ):
+            upserts, removed, version, has_more = await OfflineBundleService().get_delta(
+                mock_db_session, "hanoi", since=10
+            )
+
+        assert [point.id for point in upserts] == [1]
+        assert removed == [2]
+        assert (version, has_more) == (20, False)
+        lookup = mock_db_session.scalars.await_args.args[0].compile().params
+        bounds = {v for v in lookup.values() if isinstance(v, float)}
+        assert bounds == {20.90, 21.15, 105.70, 106.00}
+
+
+class TestChangeFeedService:
+    @pytest.mark.asyncio
+    async def test_read_collapses_to_latest_op(self, mock_db_session):
+        """Test the log page keeps only the latest op per location."""
+        from types import SimpleNamespace
+
+        rows = [
+            SimpleNamespace(seq=11, location_id=1, op=LocationChangeOp.upsert),
+            SimpleNamespace(seq=12, location_id=2, op=LocationChangeOp.upsert),
+            SimpleNamespace(seq=13, location_id=1, op=LocationChangeOp.delete),
+            SimpleNamespace(seq=14, location_id=3, op=LocationChangeOp.upsert),
+        ]
+        mock_db_session.execute.return_value.all.return_value = rows
+
+        latest, next_since, has_more = await ChangeFeedService().read(
+            mock_db_session, since=10, limit=3
+        )
+
+        # limit=3 -> 4th row only signals there is more
+        assert latest == {1: LocationChangeOp.delete, 2: LocationChangeOp.upsert}
+        assert next_since == 13
+        assert has_more is True
+
+    @pytest.mark.asyncio
+    async def test_record_is_one_statement_under_the_writer_lock(self, mock_db_session):
+        """Test the lock, the seq and the log row go out together, lock first."""
+        from sqlalchemy.dialects import postgresql
+
+        mock_db_session.scalar.return_value = 42
+
+        seq = await ChangeFeedService().record(
+            mock_db_session, 7, LocationChangeOp.delete, (21.0, 105.8)
+        )
+
+        assert seq == 42
+        mock_db_session.execute.assert_not_awaited()
+        sql = str(mock_db_session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("INSERT INTO location_changes")
+        # nextval is in the SELECT list over the (volatile) lock subquery in FROM
+        assert sql.index("nextval") < sql.index("FROM") < sql.index("pg_advisory_xact_lock")
+
+
+class TestRealtimeService:
+    def test_grid_matches_only_overlapping_viewports(self):
+        """Test events fan out only to subscriptions containing the point."""
+        grid = SubscriptionGrid(cell_size=0.05)
+        hanoi = Subscription(bbox=(105.80, 21.00, 105.90, 21.05))
+        hcmc = Subscription(bbox=(106.60, 10.70, 106.75, 10.85))
+        world = Subscription(bbox=(-180, -90, 180, 90))
+        for sub in (hanoi, hcmc, world):
+            grid.add(sub)
+
+        event = LocationEvent(
+            type=LocationEventType.approved, id=1, latitude=21.02, longitude=105.85
+        )
+        assert grid.match(event) == {hanoi, world}
+
+        grid.remove(hanoi)
+        assert grid.match(event) == {world}
+        assert len(grid) == 2
+
+    def test_moved_location_notifies_old_and_new_viewports(self):
+        """Test an edit that moves a point reaches both viewports."""
+        service = RealtimeService()
+        old_area = Subscription(bbox=(105.80, 21.00, 105.82, 21.02))
+        new_area = Subscription(bbox=(105.90, 21.10, 105.92, 21.12))
+        service.grid.add(old_area)
+        service.grid.add(new_area)
+
+        event = LocationEvent(
+            type=LocationEventType.edited,
+            id=7,
+            latitude=21.11,
+            longitude=105.91,
+            prev_latitude=21.01,
+            prev_longitude=105.81,
+        )
+        service._on_notify(None, 0, "location_events", event.to_json())
+
+        assert old_area.queue.get_nowait() == event
+        assert new_area.queue.get_nowait() == event
+
+
+class TestSpatialIndex:
+    @staticmethod
+    def _build(n=2000, seed=7):
+        import random
+
+        rng = random.Random(seed)
+        index = SpatialIndex(cell_size=0.01)
+        points = {}
+        for i in range(1, n + 1):
+            lat = 20.95 + rng.random() * 0.15
+            lng = 105.75 + rng.random() * 0.15
+            category = rng.choice(list(LocationCategory))
+            index.upsert(i, lat, lng, category)
+            points[i] = (lat, lng, category)
+        return index, points
+
+    def test_radius_matches_brute_force(self):
+        """Test grid radius search returns the same points as a full scan, sorted."""
+        import numpy as np
+
+        index, points = self._build()
+        lat, lng, radius = 21.02, 105.83, 3000
+
+        ids, dist = index.radius(lat, lng, radius, LocationCategory.cafe)
+
+        cafes = [(i, p) for i, p in points.items() if p[2] == LocationCategory.cafe]
+        all_dist = haversine_m(
+            lat, lng, np.array([p[0] for _, p in cafes]), np.array([p[1] for _, p in cafes])
+        )
+        expected = {i for (i, _), d in zip(cafes, all_dist, strict=True) if d <= radius}
+        assert set(ids.tolist()) == expected
+        assert list(dist) == sorted(dist)
+
+    def test_viewport_and_removal(self):
+        """Test viewport search honours the bbox and sees removals."""
+        index, points = self._build()
+        bbox = (105.80, 21.00, 105.85, 21.03)
+
+        ids = set(index.viewport(*bbox, limit=10_000).tolist())
+        expected = {
+            i
+            for i, (lat, lng, _) in points.items()
+            if bbox[0] <= lng <= bbox[2] and bbox[1] <= lat <= bbox[3]
+        }
+        assert ids == expected
+
+        removed = next(iter(expected))
+        index.remove(removed)
+        assert removed not in set(index.viewport(*bbox, limit=10_000).tolist())
+
+    def test_knn_returns_k_nearest(self):
+        """Test KNN grows its ring until k points are found."""
+        index, _ = self._build(n=50)
+
+        ids, dist = index.knn(21.0, 105.8, k=5)
+
+        assert len(ids) == 5
+        assert list(dist) == sorted(dist)
+
+
+class TestSearchService:
+    @pytest.mark.asyncio
+    async def test_batch_search_dedupes_across_points(self, mock_db_session):
+        """Test a location near two centres is returned once with both distances."""
+        from types import SimpleNamespace
+
+        index = SpatialIndex(cell_size=0.01)
+        index.upsert(1, 21.004, 105.800, LocationCategory.cafe)  # ~445m from both centres
+        index.upsert(2, 21.009, 105.800, LocationCategory.cafe)  # ~111m from the second only
+        locations = {i: SimpleNamespace(id=i) for i in (1, 2)}
+
+        service = SearchService()
+        with (
+            patch("src.services.search_service.spatial_replica") as replica,
+            patch.object(service, "_load_by_ids", new_callable=AsyncMock) as load,
+        ):
+            replica.ready = True
+            replica.index = index
+            load.side_effect = lambda db, ids: [locations[i] for i in ids]
+
+            results = await service.search_batch(
+                mock_db_session, [(21.000, 105.800), (21.008, 105.800)], radius_meters=600
+            )
+
+        # Ranked by nearest centre; location 1 keeps both per-centre distances
+        assert [loc.id for loc, _ in results] == [2, 1]
+        assert set(results[0][1]) == {1}
+        assert set(results[1][1]) == {0, 1}
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_searches_share_one_query(self, mock_db_session):
+        """Test equal normalized searches run once until a write invalidates them.
+
+        Right after the write, loads use the primary; sticky clients bypass the cache.
+        """
+        import asyncio
+        from contextlib import asynccontextmanager
+        from datetime import datetime
+        from types import SimpleNamespace
+
+        from src.schemas.location import LocationSearchParams
+
+        location = SimpleNamespace(
+            id=1,
+            title="Pho 10",
+            category=LocationCategory.food,
+            status=LocationStatus.approved,
+            latitude=21.0,
+            longitude=105.8,
+            created_at=datetime(2024, 6, 1),
+            updated_at=datetime(2024, 6, 1),
+        )
+
+        sessions, primary_sessions = [], []
+
+        @asynccontextmanager
+        async def own_session():
+            sessions.append(mock_db_session)
+            yield mock_db_session
+
+        @asynccontextmanager
+        async def primary_session():
+            primary_sessions.append(mock_db_session)
+            yield mock_db_session
+
+        async def slow_search(db, params):
+            await asyncio.sleep(0.01)
+            return [location], 1
+
+        service = SearchService(
+            session_maker_factory=lambda: own_session,
+            primary_session_maker_factory=lambda: primary_session,
+        )
+        center = LocationSearchParams(latitude=21.0, longitude=105.8)
+        with patch.object(service, "search", side_effect=slow_search) as search:
+            # The first caller giving up does not fail the ones sharing its query
+            first = asyncio.create_task(service.search_shared(center))
+            await asyncio.sleep(0)
+            others = asyncio.gather(
+                service.search_shared(center),
+                service.search_shared(
+                    LocationSearchParams(latitude=21.0000000001, longitude=105.8)
+                ),
+            )
+            await asyncio.sleep(0)
+            first.cancel()
+            results = await others
+            assert first.cancelled()
+            assert search.await_count == 1 and len(sessions) == 1
+            assert results[0] is results[1]
+            items, total = results[0]
+            assert total == 1 and items[0].title == "Pho 10"
+
+            await service.search_shared(
+                LocationSearchParams(latitude=21.0, longitude=105.8, skip=20)
+            )
+            assert search.await_count == 2  # Different page, different key
+
+            service.invalidate()
+            await service.search_shared(center)
+            assert search.await_count == 3
+            assert len(sessions) == 2 and len(primary_sessions) == 1
+
+            sticky_db = MagicMock()
+            await service.search_shared(center, sticky_db)
+            assert search.await_count == 4
+            assert search.await_args.args[0] is sticky_db
+
+    def test_search_statements_share_shape_across_values(self):
+        """Test searches with the same filters reuse one cached statement shape."""
+        from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+        from src.schemas.location import LocationSearchParams
+
+        dialect = PGDialect_asyncpg()
+        service = SearchService()
+        first = LocationSearchParams(latitude=21.0, longitude=105.8, query="pho")
+        second = LocationSearchParams(latitude=10.7, longitude=106.6, query="bun", skip=20)
+
+        compiled = [
+            [stmt.compile(dialect=dialect) for stmt in service._search_statements(params)]
+            for params in (first, second)
+        ]
+        assert [c.string for c in compiled[0]] == [c.string for c in compiled[1]]
+        assert compiled[1][1].params["pattern_1"] == "%bun%"
+
+        # A different filter combination is a different shape
+        district_only = service._search_statements(LocationSearchParams(district_id=1))[1]
+        assert district_only.compile(dialect=dialect).string != compiled[0][1].string
+
+
+    @pytest.mark.asyncio
+    async def test_viewport_reads_stored_coordinates_and_filters_planar(self, mock_db_session):
+        """Test viewport rows need no per-row casts and the bbox is clamped to mercator."""
+        from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+        mock_db_session.execute = AsyncMock(return_value=MagicMock())
+        await SearchService().search_viewport(mock_db_session, 105.8, 20.9, 105.9, 89.0)
+
+        compiled = mock_db_session.execute.await_args.args[0].compile(dialect=PGDialect_asyncpg())
+        assert "ST_Y" not in compiled.string and "ST_AsBinary" not in compiled.string
+        assert "locations.geom_3857 && ST_Transform(ST_MakeEnvelope(" in compiled.string
+        assert compiled.params["north_1"] == pytest.approx(85.05112878)
+
+
+class TestDistrictService:
+    def test_district_slug_strips_diacritics(self):
+        """Test Vietnamese district names become ASCII slugs."""
+        assert district_slug("Hoàn Kiếm") == "hoan-kiem"
+        assert district_slug("Quận Đống Đa") == "quan-dong-da"
+
+    @pytest.mark.asyncio
+    async def test_get_id_by_slug_is_cached(self, mock_db_session):
+        """Test slug lookups hit the database once, and unknown slugs raise."""
+        service = DistrictService()
+        mock_db_session.scalar = AsyncMock(return_value=7)
+
+        assert await service.get_id_by_slug(mock_db_session, "ba-dinh") == 7
+        assert await service.get_id_by_slug(mock_db_session, "ba-dinh") == 7
+        mock_db_session.scalar.assert_awaited_once()
+
+        mock_db_session.scalar = AsyncMock(return_value=None)
+        with pytest.raises(DistrictNotFoundError):
+            await service.get_id_by_slug(mock_db_session, "nowhere")
+
+    @pytest.mark.asyncio
+    async def test_slug_ids_expire(self, mock_db_session):
+        """Test cached slug ids are looked up again after the TTL (re-imported districts)."""
+        from src.core.cache import TTLCache
+
+        now = [0.0]
+        service = DistrictService()
+        service._slug_ids = TTLCache(ttl=300, clock=lambda: now[0])
+        mock_db_session.scalar = AsyncMock(side_effect=[7, 12])
+
+        assert await service.get_id_by_slug(mock_db_session, "ba-dinh") == 7
+        now[0] = 300.0
+        assert await service.get_id_by_slug(mock_db_session, "ba-dinh") == 12
+
+
+class TestDashboardService:
+    @pytest.mark.asyncio
+    async def test_counts_are_cached_until_a_change_notice(self, mock_db_session):
+        """Test one count query serves later reads; a notice drops only what it affects."""
+        service = DashboardService()
+        row = MagicMock()
+        row._mapping = {"total_locations": 10, "pending_locations": 4, "total_users": 3}
+        mock_db_session.execute.return_value.one.return_value = row
+
+        assert (await service.get_counts(mock_db_session))["pending_locations"] == 4
+        await service.get_counts(mock_db_session)
+        mock_db_session.execute.assert_awaited_once()
+
+        service._cache.set("recent", (5, []))
+        service.apply_notification('{"counts": true, "recent": false}')
+        assert service._cache.get("recent") == (5, [])
+
+        # Recounted, never adjusted: a delta could double count (or miss) the write
+        await service.get_counts(mock_db_session)
+        assert mock_db_session.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_right_after_a_change_are_not_cached(self, mock_db_session):
+        """Test a possibly lagging replica read is not cached within the settle window."""
+        service = DashboardService()
+        mock_db_session.execute.return_value.one.return_value = MagicMock(_mapping={"n": 1})
+
+        service.apply_notification('{"counts": true, "recent": true}')
+        await service.get_counts(mock_db_session)
+        await service.get_counts(mock_db_session)
+        assert mock_db_session.execute.await_count == 2
+
+        service._settle_until = 0.0
+        await service.get_counts(mock_db_session)
+        await service.get_counts(mock_db_session)
+        assert mock_db_session.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_writes_only_queue_a_notice(self, mock_db_session):
+        """Test a write queues a NOTIFY and leaves the cache until the notice arrives."""
+        service = DashboardService()
+        service._cache.set("counts", {"pending_locations": 2})
+
+        await service.location_statuses_changed(
+            mock_db_session,
+            [
+                (LocationStatus.approved, LocationStatus.approved),
+                (LocationStatus.pending, LocationStatus.approved),
+            ],
+        )
+
+        mock_db_session.execute.assert_awaited_once()
+        assert service._cache.get("counts") == {"pending_locations": 2}
+        compiled = mock_db_session.execute.await_args.args[0].compile()
+        payload = next(v for v in compiled.params.values() if str(v).startswith("{"))
+        assert json.loads(payload) == {"counts": True, "recent": True}
+
+
+class TestModerationService:
+    @pytest.mark.asyncio
+    async def test_bulk_update_is_set_based(self, mock_db_session):
+        """Test bulk moderation runs a fixed number of statements and reports skips."""
+        service = ModerationService()
+        rows = [
+            MagicMock(
+                id=i,
+                old_status=LocationStatus.pending,
+                location_id=i,
+                seq=100 + i,
+                category=LocationCategory.cafe,
+                latitude=10.0,
+                longitude=106.0,
+            )
+            for i in range(1, 51)
+        ]
+        mock_db_session.execute.return_value.all.return_value = rows
+
+        result = await service.bulk_update_status(
+            mock_db_session, [*range(1, 51), 99, 99], LocationStatus.approved, moderator_id=7
+        )
+
+        assert result.updated == list(range(1, 51))
+        assert result.skipped == [99]
+        # UPDATE ... RETURNING, INSERT ... SELECT logs, change feed (lock, seqs, log), two NOTIFYs
+        assert mock_db_session.execute.await_count == 5
+        mock_db_session.commit.assert_awaited_once()
+        # Realtime events carry the seqs the change feed stamped
+        events = service._visibility_events(rows[:1], {1: 101}, LocationStatus.approved)
+        assert events[0].change_seq == 101
+
+
+class TestPrincipalCache:
+    @pytest.mark.asyncio
+    async def test_principal_cached_until_invalidated(self, mock_db_session):
+        """Test repeat lookups skip the database until the user is invalidated."""
+        from src.core.principal import Principal, PrincipalCache
+
+        row = MagicMock(id=7, is_active=True, is_superuser=False)
+        mock_db_session.execute.return_value = MagicMock(one_or_none=MagicMock(return_value=row))
+        cache = PrincipalCache(maxsize=10, ttl=60)
+
+        principal = await cache.get(mock_db_session, 7)
+        assert principal == Principal(id=7, is_active=True, is_superuser=False)
+        assert await cache.get(mock_db_session, 7) is principal
+        assert mock_db_session.execute.await_count == 1
+
+        row.is_active = False
+        cache.invalidate(7)
+        assert (await cache.get(mock_db_session, 7)).is_active is False
+        assert mock_db_session.execute.await_count == 2
+
+        mock_db_session.execute.return_value.one_or_none.return_value = None
+        assert await cache.get(mock_db_session, 8) is None
+
+
+class TestLocationVersion:
+    @pytest.mark.asyncio
+    async def test_query_and_loaded_versions_agree(self, mock_db_session):
+        """Test the 304 version query and the loaded object give the same ETag."""
+        from datetime import UTC, datetime
+
+        from src.services.location_service import LocationService
+
+        updated = datetime(2024, 6, 1, 12, 0, tzinfo=UTC)
+        image_at = datetime(2024, 6, 2, 9, 30, tzinfo=UTC)
+        location = MagicMock(
+            updated_at=updated,
+            images=[MagicMock(id=4, created_at=updated), MagicMock(id=9, created_at=image_at)],
+        )
+        row = MagicMock(
+            updated_at=updated, image_count=2, last_image_id=9, last_image_at=image_at
+        )
+        mock_db_session.execute.return_value = MagicMock(one_or_none=MagicMock(return_value=row))
+
+        service = LocationService()
+        queried = await service.get_version(mock_db_session, 1)
+        loaded = service.version_of(location)
+        assert queried.etag == loaded.etag
+        assert queried.last_modified == loaded.last_modified == image_at
+
+        mock_db_session.execute.return_value.one_or_none.return_value = None
+        assert await service.get_version(mock_db_session, 2) is None
+
+
+class TestPostVersion:
+    @pytest.mark.asyncio
+    async def test_profile_change_changes_etag(self, mock_db_session):
+        """Test author/commenter profile edits produce a new ETag in both version paths."""
+        from datetime import UTC, datetime
+        from types import SimpleNamespace
+
+        from src.api.v1.endpoints.posts import _get_post_version, _post_version
+
+        posted = datetime(2024, 6, 1, 12, 0, tzinfo=UTC)
+        commenter = SimpleNamespace(updated_at=posted)
+        post = SimpleNamespace(
+            updated_at=posted,
+            author=SimpleNamespace(updated_at=posted),
+            likes=[],
+            comments=[SimpleNamespace(id=3, updated_at=posted, user=commenter)],
+            images=[],
+        )
+        before = _post_version(post)
+
+        commenter.updated_at = datetime(2024, 6, 3, 8, 0, tzinfo=UTC)  # New avatar
+        after = _post_version(post)
+        assert after.etag != before.etag
+        assert after.last_modified == commenter.updated_at
+
+        # The 304 aggregate query yields the same version
+        row = (posted, True, 0, None, None, 1, 3, posted, 0, None, commenter.updated_at)
+        mock_db_session.execute.return_value = MagicMock(one_or_none=MagicMock(return_value=row))
+        queried, is_published = await _get_post_version(mock_db_session, 1)
+        assert queried.etag == after.etag and is_published
@@ -1,4 +1,8 @@
+import pytest
+
+from src.core.polyline import decode_polyline
 from src.core.security import sanitize_input
+from src.db.pool import PoolMetrics, pool_status
 
 
 class TestSecurityUtils:
@@ -33,3 +37,629 @@ class TestSecurityUtils:
     def test_sanitize_input_none(self):
         """Test handling None input."""
         assert sanitize_input(None) == ""
+
+
+class TestPolyline:
+    def test_decode_polyline(self):
+        """Test decoding the reference polyline from the format spec."""
+        points = decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+        assert points == [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+    def test_decode_polyline_truncated(self):
+        """Test a truncated polyline is rejected."""
+        with pytest.raises(ValueError):
+            decode_polyline("_p~iF~ps|U_ulL")
+
+
+class TestPoolMetrics:
+    def test_record_wait(self):
+        """Test checkout waits accumulate count, total, average and max."""
+        metrics = PoolMetrics()
+        metrics.record_wait(0.002)
+        metrics.record_wait(0.010)
+
+        assert metrics.checkouts == 2
+        assert metrics.wait_seconds_max == 0.010
+        assert abs(metrics.wait_seconds_avg - 0.006) < 1e-9
+
+    def test_pool_status_gauges(self):
+        """Test pool gauges clamp the pre-fill negative overflow to zero."""
+        from unittest.mock import MagicMock
+
+        pool = MagicMock(metrics=PoolMetrics())
+        pool.size.return_value = 5
+        pool.checkedout.return_value = 2
+        pool.checkedin.return_value = 1
+        pool.overflow.return_value = -2
+
+        status = pool_status(pool)
+        assert status["in_use"] == 2
+        assert status["overflow"] == 0
+        assert status["checkouts"] == 0
+
+
+class TestReadRouting:
+    def test_sticky_clients_read_from_primary(self):
+        """Test replicas serve reads unless the client wrote recently."""
+        from itertools import cycle
+        from unittest.mock import MagicMock, patch
+
+        from src.db import routing
+
+        replica = MagicMock()
+        with patch.object(routing, "_replica_cycle", cycle([replica])):
+            fresh = MagicMock(cookies={}, headers={})
+            sticky = MagicMock(cookies={routing.PRIMARY_STICKY_COOKIE: "1"}, headers={})
+            assert routing.choose_read_session_maker(fresh) is replica
+            assert routing.choose_read_session_maker(sticky) is routing.async_session_maker
+
+    def test_sticky_header_for_cookieless_clients(self):
+        """Test an echoed deadline pins reads only while it is running and plausible."""
+        import time
+        from itertools import cycle
+        from unittest.mock import MagicMock, patch
+
+        from src.db import routing
+
+        def request(deadline):
+            return MagicMock(cookies={}, headers={routing.PRIMARY_STICKY_HEADER: deadline})
+
+        now = time.time()
+        replica = MagicMock()
+        with patch.object(routing, "_replica_cycle", cycle([replica])):
+            running = request(str(now + 2))
+            assert routing.choose_read_session_maker(running) is routing.async_session_maker
+            assert routing.choose_read_session_maker(request(str(now - 1))) is replica
+            assert routing.choose_read_session_maker(request(str(now + 3600))) is replica
+            assert routing.choose_read_session_maker(request("soon")) is replica
+
+    def test_write_sets_sticky_cookie(self):
+        """Test a flush on a tracked session sets the cookie once, plus the header."""
+        import time
+
+        from fastapi import Response
+        from sqlalchemy.orm import Session
+
+        from src.db import routing
+
+        session, response = Session(), Response()
+        routing.track_writes(session, response)
+        routing._after_flush(session, None)
+        routing._after_flush(session, None)
+
+        cookies = response.headers.getlist("set-cookie")
+        assert len(cookies) == 1
+        assert cookies[0].startswith(f"{routing.PRIMARY_STICKY_COOKIE}=1")
+        assert int(response.headers[routing.PRIMARY_STICKY_HEADER]) > time.time()
+
+    def test_read_db_reuses_primary_session_without_replicas(self):
+        """Test reads share the request's primary session when replicas are off."""
+        from src.core import deps
+
+        assert deps.get_read_db is deps.get_db
+
+
+class TestMetrics:
+    def test_registry_renders_prometheus_text(self):
+        """Test counters and histograms render in the exposition format."""
+        from src.core.metrics import Counter, Histogram, MetricsRegistry
+
+        registry = MetricsRegistry()
+        requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+        latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+        requests.inc(1, "/a")
+        requests.inc(2, "/a")
+        latency.observe(0.5)
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3' in text
+        assert 'latency_seconds_bucket{le="0.1"} 0' in text
+        assert 'latency_seconds_bucket{le="1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+        assert "latency_seconds_count 1" in text
+
+    def test_server_timing_header(self):
+        """Test phases are reported in milliseconds with the query count."""
+        from src.core.timing import RequestTimings, server_timing_header
+
+        timings = RequestTimings(db_seconds=0.012, db_queries=3, app_seconds=0.02)
+        header = server_timing_header(timings, total=0.025)
+        assert 'db;dur=12.0;desc="3 queries"' in header
+        assert "app;dur=20.0" in header
+        assert header.endswith("total;dur=25.0")
+
+
+class TestTTLCache:
+    def test_entries_expire_and_evict_lru(self):
+        """Test entries expire after their TTL and the oldest is evicted when full."""
+        from src.core.cache import TTLCache
+
+        now = [0.0]
+        cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        now[0] = 10.0
+        assert cache.get("a") is None
+        assert cache.get("c", "missing") == "missing"
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_coalescing_cache_single_flight_and_stale_refresh(self):
+        """Test concurrent misses share one load and stale entries refresh in the background."""
+        import asyncio
+
+        from src.core.cache import CoalescingCache
+
+        now = [0.0]
+        cache = CoalescingCache(maxsize=8, ttl=5, stale_ttl=30, clock=lambda: now[0])
+        calls = []
+
+        async def load():
+            calls.append("load")
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(cache.get("k", load, load) for _ in range(5)))
+        assert calls == ["load"]
+        assert [outcome for _, outcome in results] == ["miss"] + ["coalesced"] * 4
+        assert await cache.get("k", load, load) == (1, "hit")
+
+        # Stale: the old value is served at once while one refresh runs
+        now[0] = 10.0
+        assert await cache.get("k", load, load) == (1, "stale")
+        assert await cache.get("k", load, load) == (1, "stale")
+        await asyncio.sleep(0.02)
+        assert calls == ["load", "load"]
+        assert await cache.get("k", load, load) == (2, "hit")
+
+        # Past the stale window, or after clear(), it is a miss again
+        now[0] = 50.0
+        assert await cache.get("k", load, load) == (3, "miss")
+        cache.clear()
+        assert await cache.get("k", load, load) == (4, "miss")
+
+
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_verify_rehashes_outdated_parameters(self):
+        """Test a correct password stored with other rounds gets a replacement hash."""
+        from passlib.hash import pbkdf2_sha256
+
+        from src.core.security import hash_password, verify_and_update_password
+
+        current = await hash_password("s3cret-pass")
+        assert await verify_and_update_password("s3cret-pass", current) == (True, None)
+        assert await verify_and_update_password("wrong", current) == (False, None)
+
+        outdated = pbkdf2_sha256.using(rounds=1000).hash("s3cret-pass")
+        verified, new_hash = await verify_and_update_password("s3cret-pass", outdated)
+        assert verified and new_hash and new_hash != outdated
+        assert await verify_and_update_password("wrong", outdated) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected(self):
+        """Test requests beyond the wait queue fail fast instead of piling up."""
+        import asyncio
+        import threading
+
+        from src.core.security import PasswordHasher, PasswordHasherBusy
+
+        hasher = PasswordHasher(workers=1, max_waiting=1)
+        gate = threading.Event()
+        running = asyncio.create_task(hasher.run("hash", gate.wait))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(hasher.run("hash", lambda: "queued"))
+        await asyncio.sleep(0.01)
+        assert (hasher.running, hasher.waiting) == (1, 1)
+
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run("hash", lambda: "rejected")
+
+        gate.set()
+        assert await running is True
+        assert await queued == "queued"
+        assert (hasher.running, hasher.waiting) == (0, 0)
+        hasher.shutdown()
+
+
+class TestRateLimit:
+    def test_token_bucket_refills_over_time(self):
+        """Test a bucket allows a burst, then one request per refill interval."""
+        from src.core.rate_limit import MemoryBucketStore, RateLimit
+
+        limit = RateLimit.parse("2/minute")
+        now = [0.0]
+        store = MemoryBucketStore(maxsize=10, clock=lambda: now[0])
+        assert store.hit("a", limit) == (True, 0.0)
+        assert store.hit("a", limit) == (True, 0.0)
+        assert store.hit("a", limit) == (False, 30.0)
+        assert store.hit("b", limit)[0] is True  # Separate client
+
+        now[0] = 30.0
+        assert store.hit("a", limit)[0] is True
+        assert store.hit("a", limit)[0] is False
+
+    def test_shared_store_is_one_limit_across_processes(self, tmp_path):
+        """Test two mappings of the same table (two workers) share buckets."""
+        from src.core.rate_limit import RateLimit, SharedBucketStore
+
+        limit = RateLimit.parse("3/minute")
+        path = str(tmp_path / "buckets")
+        now = [100.0]
+        worker_a = SharedBucketStore(path, slots=64, clock=lambda: now[0])
+        worker_b = SharedBucketStore(path, slots=64, clock=lambda: now[0])
+
+        assert worker_a.hit("search:1.2.3.4", limit)[0] is True
+        assert worker_b.hit("search:1.2.3.4", limit)[0] is True
+        assert worker_a.hit("search:1.2.3.4", limit)[0] is True
+        allowed, retry_after = worker_b.hit("search:1.2.3.4", limit)
+        assert allowed is False and retry_after == pytest.approx(20.0)
+
+        worker_a.reset()
+        assert worker_b.hit("search:1.2.3.4", limit)[0] is True
+        worker_a.close()
+        worker_b.close()
+
+    def test_shared_store_memory_is_bounded(self, tmp_path):
+        """Test many clients evict the least recently used bucket instead of growing."""
+        import os
+
+        from src.core.rate_limit import RateLimit, SharedBucketStore
+
+        limit = RateLimit.parse("1/hour")
+        now = [1.0]
+        store = SharedBucketStore(str(tmp_path / "buckets"), slots=8, ways=8, clock=lambda: now[0])
+        for i in range(9):
+            now[0] += 1
+            assert store.hit(f"client-{i}", limit)[0] is True
+        assert os.path.getsize(tmp_path / "buckets") == 8 * 24
+
+        now[0] += 1
+        assert store.hit("client-8", limit)[0] is False  # Still tracked
+        assert store.hit("client-0", limit)[0] is True  # Evicted, so it starts full
+        store.close()
+
+    def test_limiter_raises_429_with_retry_after(self):
+        """Test an exhausted bucket raises an HTTP 429 with Retry-After."""
+        from unittest.mock import MagicMock
+
+        from src.core.rate_limit import Limiter, RateLimit, RateLimitExceeded
+
+        limiter = Limiter(key_func=lambda request: "1.2.3.4")
+        request = MagicMock()
+        limiter.check(request, "upload", RateLimit.parse("1/minute"))
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            limiter.check(request, "upload", RateLimit.parse("1/minute"))
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "60"
+
+    def test_rate_limit_body_matches_slowapi(self):
+        """Test the 429 body keeps slowapi's {"error": ...} format."""
+        import json
+
+        from src.core.rate_limit import RateLimit, RateLimitExceeded, rate_limit_exceeded_handler
+
+        response = rate_limit_exceeded_handler(
+            None, RateLimitExceeded(RateLimit.parse("10/minute"), 6)
+        )
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "6"
+        assert json.loads(response.body) == {"error": "Rate limit exceeded: 10 per 1 minute"}
+
+    def test_shared_store_fails_open_when_set_is_held(self, tmp_path):
+        """Test a set held by another worker is skipped instead of blocking."""
+        import subprocess
+        import sys
+        import time
+
+        from src.core.rate_limit import RateLimit, SharedBucketStore
+
+        path = str(tmp_path / "buckets")
+        store = SharedBucketStore(path, slots=8, ways=8, clock=lambda: 1000.0)
+        limit = RateLimit.parse("1/minute")
+        assert store.hit("k", limit)[0] is True
+        assert store.hit("k", limit)[0] is False
+
+        holder = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import fcntl, os, sys, time; fd = os.open(sys.argv[1], os.O_RDWR); "
+                "fcntl.lockf(fd, fcntl.LOCK_EX); print('held', flush=True); time.sleep(30)",
+                path,
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert holder.stdout.readline().strip() == "held"
+            started = time.perf_counter()
+            assert store.hit("k", limit) == (True, 0.0)
+            assert time.perf_counter() - started < 0.5
+        finally:
+            holder.kill()
+            holder.wait()
+        assert store.hit("k", limit)[0] is False
+
+    def test_memory_store_without_fcntl(self):
+        """Test platforms without fcntl (Windows) fall back to the memory store."""
+        from unittest.mock import patch
+
+        from src.core import rate_limit
+
+        with patch.object(rate_limit, "fcntl", None):
+            assert isinstance(rate_limit._default_storage(), rate_limit.MemoryBucketStore)
+            with pytest.raises(RuntimeError):
+                rate_limit.SharedBucketStore("unused", slots=8)
+
+
+class TestMiddleware:
+    @pytest.mark.asyncio
+    async def test_headers_added_without_buffering_streams(self):
+        """Test security and Server-Timing headers are added and streamed bodies pass through."""
+        import httpx
+        from starlette.applications import Starlette
+        from starlette.responses import StreamingResponse
+        from starlette.routing import Route
+
+        from src.core.middleware import RequestTimingMiddleware, SecurityHeadersMiddleware
+
+        async def chunks():
+            for part in (b"a", b"b", b"c"):
+                yield part
+
+        async def stream(request):
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        app = Starlette(routes=[Route("/stream", stream)])
+        app.add_middleware(RequestTimingMiddleware)
+        app.add_middleware(SecurityHeadersMiddleware)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/stream")
+
+        assert response.text == "abc"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert "content-security-policy" in response.headers
+        assert response.headers["server-timing"].startswith("db;dur=")
+
+
+class TestConcurrencyLimit:
+    def test_aimd_limit_backs_off_once_per_window_and_recovers(self):
+        """Test slow requests cut the limit once per window and fast ones grow it back."""
+        from src.core.concurrency import AIMDLimit
+
+        now = [0.0]
+        limit = AIMDLimit(
+            10, min_limit=4, max_limit=20, latency_threshold=1.0, clock=lambda: now[0]
+        )
+
+        limit.on_sample(2.0, inflight=10)
+        limit.on_sample(2.0, inflight=10)  # Same slow burst
+        assert limit.limit == 9.0
+        now[0] = 1.0
+        limit.on_sample(0.1, inflight=9, dropped=True)
+        assert limit.limit == 8.1
+
+        limit.on_sample(0.1, inflight=1)  # Limit not in use: no growth
+        assert limit.limit == 8.1
+        for _ in range(100):
+            limit.on_sample(0.1, inflight=int(limit.limit))
+        assert 15 < limit.limit <= 20
+
+    @pytest.mark.asyncio
+    async def test_low_priority_requests_are_shed_first(self):
+        """Test writes are rejected with 503 before reads, and admin traffic last."""
+        from starlette.types import Message
+
+        from src.core.concurrency import AIMDLimit, ConcurrencyLimiter
+        from src.core.middleware import ConcurrencyLimitMiddleware
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limiter = ConcurrencyLimiter(AIMDLimit(10, 1, 10, latency_threshold=1.0))
+        middleware = ConcurrencyLimitMiddleware(
+            app, limiter=limiter, exempt_paths=("/locations/stream",)
+        )
+
+        async def call(method: str, path: str) -> list[Message]:
+            sent: list[Message] = []
+
+            async def send(message: Message) -> None:
+                sent.append(message)
+
+            scope = {"type": "http", "method": method, "path": path, "headers": []}
+            await middleware(scope, None, send)
+            return sent
+
+        limiter.inflight = 7  # 70% of the limit in use
+        rejected = await call("POST", "/api/v1/locations/")
+        assert rejected[0]["status"] == 503
+        assert (b"retry-after", b"1") in rejected[0]["headers"]
+        assert (await call("GET", "/api/v1/locations/viewport"))[0]["status"] == 200
+
+        limiter.inflight = 9
+        assert (await call("GET", "/api/v1/locations/viewport"))[0]["status"] == 503
+        assert (await call("POST", "/api/v1/auth/login"))[0]["status"] == 200
+        assert (await call("GET", "/api/v1/locations/stream"))[0]["status"] == 200
+        assert (await call("GET", "/health"))[0]["status"] == 200
+        assert limiter.inflight == 9  # Every admitted request released its slot
+
+    @pytest.mark.asyncio
+    async def test_error_responses_shrink_the_limit(self):
+        """Test handled 5xx responses count as drops, not only escaped exceptions."""
+        from src.core.concurrency import AIMDLimit, ConcurrencyLimiter
+        from src.core.middleware import ConcurrencyLimitMiddleware
+
+        async def app(scope, receive, send):
+            status = 503 if scope["path"].endswith("/busy") else 404
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        limiter = ConcurrencyLimiter(AIMDLimit(10, 1, 10, latency_threshold=1.0))
+        middleware = ConcurrencyLimitMiddleware(app, limiter=limiter)
+        scope = {"type": "http", "method": "GET", "headers": []}
+
+        await middleware({**scope, "path": "/api/v1/locations/1"}, None, send)
+        assert limiter.limit.limit == 10.0  # 4xx is not overload
+        await middleware({**scope, "path": "/api/v1/auth/busy"}, None, send)
+        assert limiter.limit.limit == 9.0
+
+
+class TestModelResponse:
+    def test_renders_models_and_adapters(self):
+        """Test models and adapted lists render as the same JSON FastAPI would produce."""
+        import json
+        from datetime import datetime
+
+        from fastapi.encoders import jsonable_encoder
+        from pydantic import TypeAdapter
+
+        from src.core.responses import ModelResponse
+        from src.schemas.location import LocationListResponse, LocationResponse
+
+        item = LocationResponse(
+            id=1,
+            title="Cafe",
+            category="cafe",
+            status="approved",
+            latitude=10.5,
+            longitude=106.7,
+            created_at=datetime(2024, 6, 1, 12, 0),
+            updated_at=datetime(2024, 6, 1, 12, 0),
+        )
+        page = LocationListResponse(items=[item], total=1, skip=0, limit=20)
+
+        response = ModelResponse(page)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == jsonable_encoder(page)
+
+        adapter = TypeAdapter(list[LocationResponse])
+        assert json.loads(ModelResponse([item], adapter=adapter).body) == jsonable_encoder([item])
+
+        with pytest.raises(TypeError):
+            ModelResponse({"plain": "dict"})
+
+
+class TestHttpCache:
+    def test_conditional_request_matching(self):
+        """Test If-None-Match (weak, lists, *) wins over If-Modified-Since (no children)."""
+        from datetime import UTC, datetime, timedelta, timezone
+        from unittest.mock import MagicMock
+
+        from src.core.http_cache import ResourceVersion, cache_headers, is_not_modified
+
+        modified = datetime(2024, 6, 1, 12, 0, 0, 500000, tzinfo=UTC)
+        version = ResourceVersion(last_modified=modified, fingerprint=(modified, 2, 17))
+        other_tz = modified.astimezone(timezone(timedelta(hours=7)))
+        assert ResourceVersion(modified, (other_tz, 2, 17)).etag == version.etag
+        assert ResourceVersion(modified, (modified, 3, 18)).etag != version.etag
+
+        def request(**headers):
+            return MagicMock(headers=headers)
+
+        opaque = version.etag.removeprefix("W/")
+        assert is_not_modified(request(**{"if-none-match": version.etag}), version)
+        assert is_not_modified(request(**{"if-none-match": f'"x", {opaque}'}), version)
+        assert is_not_modified(request(**{"if-none-match": "*"}), version)
+        later, earlier = "Sat, 01 Jun 2024 13:00:00 GMT", "Sat, 01 Jun 2024 11:59:59 GMT"
+        assert not is_not_modified(
+            request(**{"if-none-match": '"stale"', "if-modified-since": later}), version
+        )
+        assert is_not_modified(request(**{"if-modified-since": later}), version)
+        assert is_not_modified(
+            request(**{"if-modified-since": "Sat, 01 Jun 2024 12:00:00 GMT"}), version
+        )
+        assert not is_not_modified(request(**{"if-modified-since": earlier}), version)
+        assert not is_not_modified(request(**{"if-modified-since": "garbage"}), version)
+        assert not is_not_modified(request(), version)
+
+        # A deleted child does not move last_modified: only the ETag is trusted
+        with_children = ResourceVersion(modified, (modified, 1, 17), has_children=True)
+        assert not is_not_modified(request(**{"if-modified-since": later}), with_children)
+        assert is_not_modified(request(**{"if-none-match": with_children.etag}), with_children)
+
+        headers = cache_headers(version)
+        assert headers["Last-Modified"] == "Sat, 01 Jun 2024 12:00:00 GMT"
+        assert headers["Cache-Control"].startswith("public, max-age=")
+        assert cache_headers(version, public=False)["Cache-Control"] == "private, no-cache"
+
+
+class TestCompression:
+    @pytest.mark.asyncio
+    async def test_negotiates_compresses_and_caches(self):
+        """Test br/gzip negotiation, size threshold, streaming passthrough and the body cache."""
+        import gzip
+        from unittest.mock import MagicMock
+
+        import brotli
+        import httpx
+        from starlette.applications import Starlette
+        from starlette.responses import JSONResponse, StreamingResponse
+        from starlette.routing import Route
+
+        from src.core import middleware
+        from src.core.middleware import CompressionMiddleware
+
+        payload = {"items": [{"id": i, "title": f"Place {i}"} for i in range(200)]}
+
+        async def big(request):
+            return JSONResponse(payload)
+
+        async def small(request):
+            return JSONResponse({"ok": True})
+
+        async def stream(request):
+            async def chunks():
+                yield b"data: 1\n\n" * 500
+
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        app = CompressionMiddleware(
+            Starlette(
+                routes=[Route("/big", big), Route("/small", small), Route("/stream", stream)]
+            ),
+            minimum_size=1024,
+            thread_threshold=4096,  # /big goes through the executor
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+            gzip_spy = app.compressors["gzip"] = MagicMock(wraps=middleware._gzip)
+            response = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["vary"] == "Accept-Encoding"
+            assert response.json() == payload
+            response = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+            assert response.json() == payload
+            assert gzip_spy.call_count == 1  # Second response came from the cache
+
+            response = await client.get("/big", headers={"Accept-Encoding": "gzip;q=0.5, br"})
+            assert response.headers["content-encoding"] == "br"
+            assert int(response.headers["content-length"]) < len(str(payload))
+
+            response = await client.get("/big", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in response.headers
+
+            response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+
+            response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+            assert response.text.startswith("data: 1")
+
+        assert gzip.decompress(middleware._gzip(b"x" * 100)) == b"x" * 100
+        assert brotli.decompress(middleware._brotli(b"x" * 100)) == b"x" * 100
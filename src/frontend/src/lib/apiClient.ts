@@ -5,6 +5,11 @@
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
+// Read-your-writes: after a write the API returns a deadline (unix seconds)
+// until which our reads must hit the primary; echo it back while it runs.
+const PRIMARY_STICKY_HEADER = "X-Primary-Until";
+let primaryUntil = 0;
+
 interface RequestOptions extends RequestInit {
   params?: Record<string, string | number | boolean | undefined>;
 }
@@ -48,6 +53,9 @@ async function request<T>(
   if (token) {
     authHeaders["Authorization"] = `Bearer ${token}`;
   }
+  if (Date.now() / 1000 < primaryUntil) {
+    authHeaders[PRIMARY_STICKY_HEADER] = String(primaryUntil);
+  }
 
   const config: RequestInit = {
     ...customConfig,
@@ -67,6 +75,11 @@ async function request<T>(
   try {
     const response = await fetch(url.toString(), config);
 
+    const stickyUntil = Number(response.headers.get(PRIMARY_STICKY_HEADER));
+    if (stickyUntil > primaryUntil) {
+      primaryUntil = stickyUntil;
+    }
+
     // 3. Response Interceptor / Error Handling
     if (!response.ok) {
       let errorMessage = `API Error: ${response.status} ${response.statusText}`;